@@ -12,6 +12,8 @@ from nonebot_plugin_saa.auto_select_bot import get_bot
 from nonebot_bison.apis import check_sub_target
 from nonebot_bison.config import NoSuchSubscribeException, NoSuchTargetException, NoSuchUserException, config
 from nonebot_bison.config.db_config import SubscribeDupException
+from nonebot_bison.config.subs_io.nbesf_model.base import SubReceipt
+from nonebot_bison.config.utils import get_user_key
 from nonebot_bison.platform import platform_manager
 from nonebot_bison.scheduler import scheduler_dict
 from nonebot_bison.types import Target as T_Target
@@ -23,6 +25,9 @@ from .jwt import load_jwt, pack_jwt
 from .token_manager import token_manager
 from .types import (
     AddSubscribeReq,
+    BulkSubscribeItem,
+    BulkSubscribeReq,
+    BulkSubscribeResp,
     Cookie,
     CookieTarget,
     GlobalConf,
@@ -132,12 +137,30 @@ async def auth(token: str) -> TokenResp:
 
 
 @router.get("/subs")
-async def get_subs_info(jwt_obj: dict = Depends(get_jwt_obj)) -> SubscribeResp:
+async def get_subs_info(
+    jwt_obj: dict = Depends(get_jwt_obj),
+    offset: int = 0,
+    limit: int | None = None,
+    platformName: str | None = None,
+    keyword: str | None = None,
+) -> SubscribeResp:
+    """获取可管理的群组的订阅
+
+    群组较多时可以用 offset 与 limit 分页，keyword 按群名或群号筛选群组，platformName 筛选订阅的平台
+    """
+    if offset < 0 or (limit is not None and limit <= 0):
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "invalid offset or limit")
     groups = jwt_obj["groups"]
+    if keyword:
+        groups = [group for group in groups if keyword in group["name"] or keyword in str(group["id"])]
+    groups = groups[offset : None if limit is None else offset + limit]
+
+    users = {group["id"]: TargetQQGroup(group_id=group["id"]) for group in groups}
+    subs_of_users = await config.list_subscribe_of_users(list(users.values()), platformName)
     res: SubscribeResp = {}
     for group in groups:
         group_id = group["id"]
-        raw_subs = await config.list_subscribe(TargetQQGroup(group_id=group_id))
+        raw_subs = subs_of_users.get(get_user_key(users[group_id]), [])
         subs = [
             SubscribeConfig(
                 platformName=sub.target.platform_name,
@@ -198,6 +221,39 @@ async def update_group_sub(groupNumber: int, req: AddSubscribeReq):
     return StatusResp(ok=True, msg="")
 
 
+@router.post("/subs/bulk")
+async def bulk_modify_group_subs(req: BulkSubscribeReq, jwt_obj: dict = Depends(get_jwt_obj)) -> BulkSubscribeResp:
+    """在一个事务中批量删除、更新、添加多个群组的订阅，任一操作失败时全部回滚"""
+    allowed_groups = {group["id"] for group in jwt_obj["groups"]}
+    if any(item.groupNumber not in allowed_groups for item in [*req.add, *req.update, *req.delete]):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+    def to_receipt(item: BulkSubscribeItem) -> SubReceipt:
+        return SubReceipt(
+            user=TargetQQGroup(group_id=item.groupNumber),
+            target=item.target,
+            target_name=item.targetName,
+            platform_name=item.platformName,
+            cats=item.cats,
+            tags=item.tags,
+        )
+
+    try:
+        added, updated, deleted = await config.bulk_modify_subscribe(
+            [to_receipt(item) for item in req.add],
+            [to_receipt(item) for item in req.update],
+            [
+                (TargetQQGroup(group_id=item.groupNumber), item.platformName, T_Target(item.target))
+                for item in req.delete
+            ],
+        )
+    except SubscribeDupException:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "subscribe duplicated")
+    except NoSuchSubscribeException:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "no such user or subscribe")
+    return BulkSubscribeResp(ok=True, msg="", added=added, updated=updated, deleted=deleted)
+
+
 @router.get("/weight", dependencies=[Depends(check_is_superuser)])
 async def get_weight_config():
     return await config.get_all_weight_config()
@@ -55,11 +55,33 @@ class AddSubscribeReq(BaseModel):
     tags: list[str]
 
 
+class BulkSubscribeItem(AddSubscribeReq):
+    groupNumber: int
+
+
+class BulkDelSubscribeItem(BaseModel):
+    groupNumber: int
+    platformName: str
+    target: str
+
+
+class BulkSubscribeReq(BaseModel):
+    add: list[BulkSubscribeItem] = []
+    update: list[BulkSubscribeItem] = []
+    delete: list[BulkDelSubscribeItem] = []
+
+
 class StatusResp(BaseModel):
     ok: bool
     msg: str
 
 
+class BulkSubscribeResp(StatusResp):
+    added: int
+    updated: int
+    deleted: int
+
+
 from datetime import datetime
 from typing import Any
 
@@ -1,12 +1,91 @@
+from nonebot.log import logger
+from nonebot_plugin_apscheduler import scheduler as aps_scheduler
+
+from .config import config
 from .platform import platform_manager
+from .plugin_config import plugin_config
 from .scheduler import scheduler_dict
+from .scheduler.shard import owns_target
 from .types import Target
+from .utils.ttl_cache import SingleFlightTTLCache
+
+TARGET_NOT_FOUND_TTL = 60
+"""查询不到 target 名称时结果的最长缓存时间（秒）"""
+
+_target_name_cache: SingleFlightTTLCache[tuple[str, Target], str | None] | None = None
+
 
+def get_target_name_cache() -> SingleFlightTTLCache[tuple[str, Target], str | None]:
+    global _target_name_cache
+    if _target_name_cache is None:
+        ttl = plugin_config.bison_target_name_cache_ttl
+        _target_name_cache = SingleFlightTTLCache(ttl, negative_ttl=min(ttl, TARGET_NOT_FOUND_TTL))
+    return _target_name_cache
 
-async def check_sub_target(platform_name: str, target: Target):
+
+def reset_target_name_cache():
+    """丢弃 target 名称缓存，下次使用时按当前配置重新创建"""
+    global _target_name_cache
+    _target_name_cache = None
+
+
+async def _query_target_name(platform_name: str, target: Target) -> str | None:
     platform = platform_manager[platform_name]
     scheduler_conf_class = platform.site
     scheduler = scheduler_dict[scheduler_conf_class]
     client = await scheduler.client_mgr.get_query_name_client()
 
-    return await platform_manager[platform_name].get_target_name(client, target)
+    return await platform.get_target_name(client, target)
+
+
+async def check_sub_target(platform_name: str, target: Target, use_cache: bool = True) -> str | None:
+    """查询 target 的名称，查询不到时返回 None
+
+    缓存有效期内相同的 (platform_name, target) 只请求一次上游，同时进行的查询共享同一个请求；
+    查询到的名称会同步到数据库中已存在的 target
+    """
+
+    async def load() -> str | None:
+        name = await _query_target_name(platform_name, target)
+        if name:
+            await config.update_target_names(platform_name, {target: name})
+        return name
+
+    return await get_target_name_cache().get_or_load((platform_name, target), load, use_cache)
+
+
+async def refresh_target_names():
+    """刷新所有已订阅 target 的名称并写入缓存与数据库，分片调度时只刷新本进程负责的 target"""
+    cache = get_target_name_cache()
+    for platform_name, platform in platform_manager.items():
+        if not platform.has_target or platform.site not in scheduler_dict:
+            continue
+        target_names: dict[Target, str] = {}
+        for db_target in await config.get_platform_target(platform_name):
+            target = Target(db_target.target)
+            if not owns_target(platform_name, target):
+                continue
+            # 逐个请求，避免刷新时集中请求上游
+            try:
+                name = await cache.get_or_load(
+                    (platform_name, target), lambda: _query_target_name(platform_name, target), use_cache=False
+                )
+            except Exception as e:
+                logger.warning(f"failed to refresh target name of {platform_name}:{target}: {e!r}")
+                continue
+            if name:
+                target_names[target] = name
+        if updated_count := await config.update_target_names(platform_name, target_names):
+            logger.info(f"refreshed {updated_count} target names of {platform_name}")
+
+
+def init_target_name_refresh():
+    if (interval := plugin_config.bison_target_name_refresh_interval) <= 0:
+        return
+    aps_scheduler.add_job(
+        refresh_target_names,
+        "interval",
+        hours=interval,
+        id="bison_refresh_target_names",
+        replace_existing=True,
+    )
@@ -1,10 +1,14 @@
+from nonebot import get_driver
+from nonebot.adapters import Bot
 from nonebot.log import logger
 from nonebot_plugin_datastore.db import get_engine, post_db_init, pre_db_init
 from sqlalchemy import inspect, text
 
+from .apis import init_target_name_refresh
 from .config.config_legacy import start_up as legacy_db_startup
 from .config.db_migration import data_migrate
-from .scheduler.manager import init_scheduler
+from .scheduler.manager import init_scheduler, scheduler_dict
+from .scheduler.shard import get_shard_manager
 
 
 @pre_db_init
@@ -46,4 +50,23 @@ async def post():
     await data_migrate()
     # init scheduler
     await init_scheduler()
+    init_target_name_refresh()
     logger.info("nonebot-bison bootstrap done")
+
+
+@get_driver().on_bot_connect
+async def unpark_targets(bot: Bot):
+    # saa 会在 Bot 连接时自行刷新可送达的 target 缓存，这里只恢复停放的 target
+    for scheduler in scheduler_dict.values():
+        scheduler.unpark_all()
+
+
+@get_driver().on_shutdown
+async def leave_shard():
+    if not (shard_manager := get_shard_manager()):
+        return
+    try:
+        await shard_manager.leave()
+    except Exception as e:
+        # 未能释放的租约会在到期后被其他进程接管
+        logger.warning(f"failed to leave shard: {e!r}")
@@ -2,19 +2,27 @@ import asyncio
 from collections import defaultdict
 from collections.abc import Awaitable, Callable, Sequence
 from datetime import datetime, time
+from typing import TYPE_CHECKING, TypeVar
 
 from nonebot.compat import model_dump
+from nonebot.log import logger
 from nonebot_plugin_datastore import create_session
 from nonebot_plugin_saa import PlatformTarget
-from sqlalchemy import delete, func, select
+from sqlalchemy import delete, func, insert, select, update
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager, selectinload
 
 from nonebot_bison.types import Category, PlatformWeightConfigResp, Tag, TimeWeightConfig, UserSubInfo, WeightConfig
 from nonebot_bison.types import Target as T_Target
 
 from .db_model import Cookie, CookieTarget, ScheduleTimeWeight, Subscribe, Target, User
-from .utils import DuplicateCookieTargetException, NoSuchTargetException
+from .utils import DuplicateCookieTargetException, NoSuchSubscribeException, NoSuchTargetException, get_user_key
+
+if TYPE_CHECKING:
+    from .subs_io.nbesf_model.base import SubReceipt
+
+_T = TypeVar("_T")
 
 
 def _get_time():
@@ -26,17 +34,35 @@ def _get_time():
 class SubscribeDupException(Exception): ...
 
 
+BULK_CHUNK_SIZE = 500
+"""批量操作时单条 SQL 中 IN 列表与 VALUES 的最大长度，避免超出 SQLite 的参数数量限制"""
+
+
+def _chunks(items: Sequence[_T]) -> list[Sequence[_T]]:
+    return [items[i : i + BULK_CHUNK_SIZE] for i in range(0, len(items), BULK_CHUNK_SIZE)]
+
+
 class DBConfig:
     def __init__(self):
         self.add_target_hook: list[Callable[[str, T_Target], Awaitable]] = []
+        self.add_targets_hook: list[Callable[[list[tuple[str, T_Target]]], Awaitable]] = []
         self.delete_target_hook: list[Callable[[str, T_Target], Awaitable]] = []
+        self.delete_targets_hook: list[Callable[[list[tuple[str, T_Target]]], Awaitable]] = []
 
     def register_add_target_hook(self, fun: Callable[[str, T_Target], Awaitable]):
         self.add_target_hook.append(fun)
 
+    def register_add_targets_hook(self, fun: Callable[[list[tuple[str, T_Target]]], Awaitable]):
+        """批量添加 target 时的 hook，参数为 [(platform_name, target)]"""
+        self.add_targets_hook.append(fun)
+
     def register_delete_target_hook(self, fun: Callable[[str, T_Target], Awaitable]):
         self.delete_target_hook.append(fun)
 
+    def register_delete_targets_hook(self, fun: Callable[[list[tuple[str, T_Target]]], Awaitable]):
+        """批量删除订阅后 target 不再被订阅时的 hook，参数为 [(platform_name, target)]"""
+        self.delete_targets_hook.append(fun)
+
     async def add_subscribe(
         self,
         user: PlatformTarget,
@@ -47,10 +73,10 @@ class DBConfig:
         tags: list[Tag],
     ):
         async with create_session() as session:
-            db_user_stmt = select(User).where(User.user_target == model_dump(user))
+            db_user_stmt = select(User).where(User.user_key == get_user_key(user))
             db_user: User | None = await session.scalar(db_user_stmt)
             if not db_user:
-                db_user = User(user_target=model_dump(user))
+                db_user = User(user_target=model_dump(user), user_key=get_user_key(user))
                 session.add(db_user)
             db_target_stmt = select(Target).where(Target.platform_name == platform_name).where(Target.target == target)
             db_target: Target | None = await session.scalar(db_target_stmt)
@@ -77,13 +103,38 @@ class DBConfig:
         async with create_session() as session:
             query_stmt = (
                 select(Subscribe)
-                .where(User.user_target == model_dump(user))
+                .where(User.user_key == get_user_key(user))
                 .join(User)
                 .options(selectinload(Subscribe.target))
             )
             subs = (await session.scalars(query_stmt)).all()
             return subs
 
+    async def list_subscribe_of_users(
+        self, users: Sequence[PlatformTarget], platform_name: str | None = None
+    ) -> dict[str, list[Subscribe]]:
+        """批量获取多个用户的订阅，返回 user_key 到订阅列表的映射，没有订阅的用户不在结果中
+
+        platform_name 不为空时只返回该平台的订阅
+        """
+        res: defaultdict[str, list[Subscribe]] = defaultdict(list)
+        user_keys = list({get_user_key(user) for user in users})
+        async with create_session() as session:
+            for chunk in _chunks(user_keys):
+                query_stmt = (
+                    select(Subscribe, User.user_key)
+                    .join(User)
+                    .join(Subscribe.target)
+                    .options(contains_eager(Subscribe.target))
+                    .where(User.user_key.in_(chunk))
+                    .order_by(Subscribe.id)
+                )
+                if platform_name:
+                    query_stmt = query_stmt.where(Target.platform_name == platform_name)
+                for sub, user_key in (await session.execute(query_stmt)).tuples():
+                    res[user_key].append(sub)
+        return dict(res)
+
     async def list_subs_with_all_info(self) -> Sequence[Subscribe]:
         """获取数据库中带有user、target信息的subscribe数据"""
         async with create_session() as session:
@@ -96,7 +147,7 @@ class DBConfig:
 
     async def del_subscribe(self, user: PlatformTarget, target: str, platform_name: str):
         async with create_session() as session:
-            user_obj = await session.scalar(select(User).where(User.user_target == model_dump(user)))
+            user_obj = await session.scalar(select(User).where(User.user_key == get_user_key(user)))
             target_obj = await session.scalar(
                 select(Target).where(Target.platform_name == platform_name, Target.target == target)
             )
@@ -122,7 +173,7 @@ class DBConfig:
             subscribe_obj: Subscribe = await sess.scalar(
                 select(Subscribe)
                 .where(
-                    User.user_target == model_dump(user),
+                    User.user_key == get_user_key(user),
                     Target.target == target,
                     Target.platform_name == platform_name,
                 )
@@ -135,6 +186,214 @@ class DBConfig:
             subscribe_obj.target.target_name = target_name
             await sess.commit()
 
+    async def bulk_add_subscribe(self, receipts: Sequence["SubReceipt"]) -> tuple[int, int]:
+        """在同一个事务中批量添加订阅，用户与 target 按集合查询，已存在的订阅会被跳过
+
+        返回 (新增的订阅数, 跳过的重复订阅数)，新增的 target 在提交后一次性通知调度器
+        """
+        if not receipts:
+            return 0, 0
+        async with create_session() as sess:
+            user_ids = await self._get_or_create_user_ids(sess, {get_user_key(r.user): r.user for r in receipts})
+            target_ids, new_targets = await self._get_or_create_targets(
+                sess, {(receipt.platform_name, receipt.target): receipt.target_name for receipt in receipts}
+            )
+
+            # 跳过已存在与文件内重复的订阅
+            existing_subs = set(await self._get_subscribe_ids(sess, list(set(target_ids.values()))))
+            new_subs = []
+            dup_count = 0
+            for receipt in receipts:
+                sub_key = (user_ids[get_user_key(receipt.user)], target_ids[(receipt.platform_name, receipt.target)])
+                if sub_key in existing_subs:
+                    logger.warning(f"！添加订阅条目 {receipt!r} 失败: 相同的订阅已存在")
+                    dup_count += 1
+                    continue
+                existing_subs.add(sub_key)
+                new_subs.append(
+                    {"user_id": sub_key[0], "target_id": sub_key[1], "categories": receipt.cats, "tags": receipt.tags}
+                )
+            for chunk in _chunks(new_subs):
+                await sess.execute(insert(Subscribe), chunk)
+            await sess.commit()
+
+        if new_targets:
+            await asyncio.gather(*[hook(new_targets) for hook in self.add_targets_hook])
+        return len(new_subs), dup_count
+
+    async def bulk_modify_subscribe(
+        self,
+        to_add: Sequence["SubReceipt"] = (),
+        to_update: Sequence["SubReceipt"] = (),
+        to_delete: Sequence[tuple[PlatformTarget, str, T_Target]] = (),
+    ) -> tuple[int, int, int]:
+        """在同一个事务中依次批量删除、更新、添加订阅，任一操作失败时全部回滚
+
+        to_delete 中的元素为 (user, platform_name, target)。
+        删除或更新不存在的订阅时抛出 NoSuchSubscribeException，添加已存在的订阅时抛出 SubscribeDupException。
+        新增与不再被订阅的 target 在提交后一次性通知调度器，返回 (添加数, 更新数, 删除数)
+        """
+        async with create_session() as sess:
+            # 删除与更新的订阅必须已存在，只需查询用户与 target
+            user_ids = await self._get_user_ids(
+                sess, list({get_user_key(user) for user, _, _ in to_delete} | {get_user_key(r.user) for r in to_update})
+            )
+            db_targets = await self._get_targets(
+                sess,
+                list({(p, t) for _, p, t in to_delete} | {(r.platform_name, T_Target(r.target)) for r in to_update}),
+            )
+            existing_subs = await self._get_subscribe_ids(sess, [db_target.id for db_target in db_targets.values()])
+
+            def get_subscribe_id(user: PlatformTarget, platform_name: str, target: T_Target) -> int:
+                user_id = user_ids.get(get_user_key(user))
+                db_target = db_targets.get((platform_name, target))
+                if user_id is None or db_target is None or (user_id, db_target.id) not in existing_subs:
+                    raise NoSuchSubscribeException(f"{user} 没有订阅 {platform_name}:{target}")
+                return existing_subs[(user_id, db_target.id)]
+
+            deleted_sub_ids = {get_subscribe_id(user, p, t) for user, p, t in to_delete}
+            for chunk in _chunks(list(deleted_sub_ids)):
+                await sess.execute(delete(Subscribe).where(Subscribe.id.in_(chunk)))
+
+            updated_subs = {
+                get_subscribe_id(r.user, r.platform_name, T_Target(r.target)): {"categories": r.cats, "tags": r.tags}
+                for r in to_update
+            }
+            if deleted_sub_ids & set(updated_subs):
+                raise NoSuchSubscribeException("不能更新同时被删除的订阅")
+            for chunk in _chunks([{"id": sub_id, **values} for sub_id, values in updated_subs.items()]):
+                await sess.execute(update(Subscribe), chunk)
+            renamed_targets = {
+                db_target.id: r.target_name
+                for r in to_update
+                if (db_target := db_targets[(r.platform_name, T_Target(r.target))]).target_name != r.target_name
+            }
+            for chunk in _chunks([{"id": key, "target_name": name} for key, name in renamed_targets.items()]):
+                await sess.execute(update(Target), chunk)
+
+            new_targets: list[tuple[str, T_Target]] = []
+            if to_add:
+                add_user_ids = await self._get_or_create_user_ids(sess, {get_user_key(r.user): r.user for r in to_add})
+                add_target_ids, new_targets = await self._get_or_create_targets(
+                    sess, {(r.platform_name, T_Target(r.target)): r.target_name for r in to_add}
+                )
+                subs_after_delete = set(await self._get_subscribe_ids(sess, list(set(add_target_ids.values()))))
+                new_subs = []
+                for receipt in to_add:
+                    sub_key = (
+                        add_user_ids[get_user_key(receipt.user)],
+                        add_target_ids[(receipt.platform_name, T_Target(receipt.target))],
+                    )
+                    if sub_key in subs_after_delete:
+                        raise SubscribeDupException()
+                    subs_after_delete.add(sub_key)
+                    new_subs.append(
+                        {
+                            "user_id": sub_key[0],
+                            "target_id": sub_key[1],
+                            "categories": receipt.cats,
+                            "tags": receipt.tags,
+                        }
+                    )
+                for chunk in _chunks(new_subs):
+                    await sess.execute(insert(Subscribe), chunk)
+
+            # 删除订阅后不再被任何用户订阅的 target
+            deleted_target_ids = {db_targets[(p, t)].id: (p, t) for _, p, t in to_delete}
+            still_subscribed: set[int] = set()
+            for chunk in _chunks(list(deleted_target_ids)):
+                stmt = select(Subscribe.target_id).distinct().where(Subscribe.target_id.in_(chunk))
+                still_subscribed.update((await sess.scalars(stmt)).all())
+            empty_targets = [key for target_id, key in deleted_target_ids.items() if target_id not in still_subscribed]
+            await sess.commit()
+
+        if new_targets:
+            await asyncio.gather(*[hook(new_targets) for hook in self.add_targets_hook])
+        if empty_targets:
+            await asyncio.gather(*[hook(empty_targets) for hook in self.delete_targets_hook])
+        return len(to_add), len(updated_subs), len(deleted_sub_ids)
+
+    async def _get_user_ids(self, sess: AsyncSession, user_keys: Sequence[str]) -> dict[str, int]:
+        res = {}
+        for chunk in _chunks(user_keys):
+            stmt = select(User.user_key, User.id).where(User.user_key.in_(chunk))
+            res.update((await sess.execute(stmt)).tuples().all())
+        return res
+
+    async def _get_or_create_user_ids(self, sess: AsyncSession, users: dict[str, PlatformTarget]) -> dict[str, int]:
+        """按 user_key 批量查询用户 id，不存在的用户批量创建"""
+        user_ids = await self._get_user_ids(sess, list(users))
+        new_users = [
+            {"user_target": model_dump(user), "user_key": key} for key, user in users.items() if key not in user_ids
+        ]
+        for chunk in _chunks(new_users):
+            await sess.execute(insert(User), chunk)
+        if new_users:
+            user_ids.update(await self._get_user_ids(sess, [user["user_key"] for user in new_users]))
+        return user_ids
+
+    async def _get_or_create_targets(
+        self, sess: AsyncSession, target_names: dict[tuple[str, T_Target], str]
+    ) -> tuple[dict[tuple[str, T_Target], int], list[tuple[str, T_Target]]]:
+        """批量查询 target id，已存在的 target 更新名称，不存在的批量创建
+
+        返回 ((platform_name, target) 到 id 的映射, 新建的 target)
+        """
+        db_targets = await self._get_targets(sess, list(target_names))
+        renamed_targets = [
+            {"id": db_target.id, "target_name": target_names[key]}
+            for key, db_target in db_targets.items()
+            if db_target.target_name != target_names[key]
+        ]
+        for chunk in _chunks(renamed_targets):
+            await sess.execute(update(Target), chunk)
+        new_targets = [key for key in target_names if key not in db_targets]
+        for chunk in _chunks(new_targets):
+            await sess.execute(
+                insert(Target),
+                [{"platform_name": p, "target": t, "target_name": target_names[(p, t)]} for p, t in chunk],
+            )
+        if new_targets:
+            db_targets.update(await self._get_targets(sess, new_targets))
+        return {key: db_target.id for key, db_target in db_targets.items()}, new_targets
+
+    async def _get_subscribe_ids(self, sess: AsyncSession, target_ids: Sequence[int]) -> dict[tuple[int, int], int]:
+        """查询订阅了 target_ids 的订阅，返回 (user_id, target_id) 到订阅 id 的映射"""
+        res = {}
+        for chunk in _chunks(target_ids):
+            stmt = select(Subscribe.user_id, Subscribe.target_id, Subscribe.id).where(Subscribe.target_id.in_(chunk))
+            res.update({(user_id, target_id): sub_id for user_id, target_id, sub_id in await sess.execute(stmt)})
+        return res
+
+    async def _get_targets(
+        self, sess: AsyncSession, keys: Sequence[tuple[str, T_Target]]
+    ) -> dict[tuple[str, T_Target], Target]:
+        """按 (platform_name, target) 批量查询 Target"""
+        res = {}
+        wanted = set(keys)
+        for chunk in _chunks(list({target for _, target in keys})):
+            for db_target in await sess.scalars(select(Target).where(Target.target.in_(chunk))):
+                key = (db_target.platform_name, T_Target(db_target.target))
+                if key in wanted:
+                    res[key] = db_target
+        return res
+
+    async def update_target_names(self, platform_name: str, target_names: dict[T_Target, str]) -> int:
+        """批量更新已存在的 target 的名称，返回名称发生变化的 target 数量"""
+        if not target_names:
+            return 0
+        async with create_session() as sess:
+            db_targets = await self._get_targets(sess, [(platform_name, target) for target in target_names])
+            renamed_targets = [
+                {"id": db_target.id, "target_name": target_names[target]}
+                for (_, target), db_target in db_targets.items()
+                if db_target.target_name != target_names[target]
+            ]
+            for chunk in _chunks(renamed_targets):
+                await sess.execute(update(Target), chunk)
+            await sess.commit()
+        return len(renamed_targets)
+
     async def get_platform_target(self, platform_name: str) -> Sequence[Target]:
         async with create_session() as sess:
             subq = select(Subscribe.target_id).distinct().subquery()
@@ -343,6 +602,45 @@ class DBConfig:
             sess.add(cookie_target)
             await sess.commit()
 
+    async def bulk_add_cookies(self, cookies: Sequence[tuple[Cookie, Sequence[tuple[str, T_Target]]]]) -> int:
+        """在同一个事务中批量添加 Cookie 及其关联的 [(platform_name, target)]，返回添加的 Cookie 数
+
+        已存在相同站点与内容的 Cookie 时跳过该 Cookie 及其关联，重复导入同一批 Cookie 不会产生重复数据；
+        关联的 target 不存在时跳过该关联
+        """
+        if not cookies:
+            return 0
+        async with create_session() as sess:
+            existing: set[tuple[str, str]] = set()
+            contents = list({cookie.content for cookie, _ in cookies})
+            for chunk in _chunks(contents):
+                rows = await sess.execute(select(Cookie.site_name, Cookie.content).where(Cookie.content.in_(chunk)))
+                existing.update((site_name, content) for site_name, content in rows)
+            new_cookies: list[tuple[Cookie, Sequence[tuple[str, T_Target]]]] = []
+            for cookie, keys in cookies:
+                if (cookie.site_name, cookie.content) in existing:
+                    logger.info(f"Cookie {cookie.cookie_name} 已存在，已跳过")
+                    continue
+                existing.add((cookie.site_name, cookie.content))
+                new_cookies.append((cookie, keys))
+            cookies = new_cookies
+            if not cookies:
+                return 0
+            sess.add_all([cookie for cookie, _ in cookies])
+            await sess.flush()
+            db_targets = await self._get_targets(sess, [key for _, keys in cookies for key in keys])
+            cookie_targets = []
+            for cookie, keys in cookies:
+                for key in dict.fromkeys(keys):
+                    if not (db_target := db_targets.get(key)):
+                        logger.warning(f"！Cookie {cookie.cookie_name} 关联的 target {key} 不存在，已跳过")
+                        continue
+                    cookie_targets.append({"cookie_id": cookie.id, "target_id": db_target.id})
+            for chunk in _chunks(cookie_targets):
+                await sess.execute(insert(CookieTarget), chunk)
+            await sess.commit()
+        return len(cookies)
+
     async def delete_cookie_target(self, target: T_Target, platform_name: str, cookie_id: int):
         async with create_session() as sess:
             target_obj = await sess.scalar(
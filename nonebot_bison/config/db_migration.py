@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio.session import AsyncSession
 
 from .config_legacy import Config, ConfigContent, drop
 from .db_model import Subscribe, Target, User
+from .utils import get_user_key
 
 
 async def data_migrate():
@@ -22,7 +23,7 @@ async def data_migrate():
                     user_target = TargetQQGroup(group_id=user["user"])
                 else:
                     user_target = TargetQQPrivate(user_id=user["user"])
-                db_user = User(user_target=model_dump(user_target))
+                db_user = User(user_target=model_dump(user_target), user_key=get_user_key(user_target))
                 user_to_create.append(db_user)
                 user_sub_set = set()
                 for sub in user["subs"]:
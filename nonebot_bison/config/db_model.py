@@ -18,6 +18,8 @@ get_plugin_data().set_migration_dir(Path(__file__).parent / "migrations")
 class User(Model):
     id: Mapped[int] = mapped_column(primary_key=True)
     user_target: Mapped[dict] = mapped_column(JSON().with_variant(JSONB, "postgresql"))
+    # user_target 的规范化哈希，见 config.utils.get_user_key
+    user_key: Mapped[str] = mapped_column(String(64), index=True, unique=True)
 
     subscribes: Mapped[list["Subscribe"]] = relationship(back_populates="user")
 
@@ -30,7 +32,7 @@ class Target(Model):
     __table_args__ = (UniqueConstraint("target", "platform_name", name="unique-target-constraint"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    platform_name: Mapped[str] = mapped_column(String(20))
+    platform_name: Mapped[str] = mapped_column(String(20), index=True)
     target: Mapped[str] = mapped_column(String(1024))
     target_name: Mapped[str] = mapped_column(String(1024))
     default_schedule_weight: Mapped[int] = mapped_column(default=10)
@@ -42,7 +44,7 @@ class Target(Model):
 
 class ScheduleTimeWeight(Model):
     id: Mapped[int] = mapped_column(primary_key=True)
-    target_id: Mapped[int] = mapped_column(ForeignKey("nonebot_bison_target.id"))
+    target_id: Mapped[int] = mapped_column(ForeignKey("nonebot_bison_target.id"), index=True)
     start_time: Mapped[datetime.time]
     end_time: Mapped[datetime.time]
     weight: Mapped[int]
@@ -61,8 +63,8 @@ class Subscribe(Model):
     __table_args__ = (UniqueConstraint("target_id", "user_id", name="unique-subscribe-constraint"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    target_id: Mapped[int] = mapped_column(ForeignKey("nonebot_bison_target.id"))
-    user_id: Mapped[int] = mapped_column(ForeignKey("nonebot_bison_user.id"))
+    target_id: Mapped[int] = mapped_column(ForeignKey("nonebot_bison_target.id"), index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("nonebot_bison_user.id"), index=True)
     categories: Mapped[list[Category]] = mapped_column(JSON)
     tags: Mapped[list[Tag]] = mapped_column(JSON)
 
@@ -107,3 +109,20 @@ class CookieTarget(Model):
 
     target: Mapped[Target] = relationship(back_populates="cookies")
     cookie: Mapped[Cookie] = relationship(back_populates="targets")
+
+
+class SchedulerNode(Model):
+    """分片调度模式下已注册的调度进程"""
+
+    id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    # 最后一次心跳的时刻（UTC）
+    heartbeat_at: Mapped[datetime.datetime] = mapped_column(DateTime)
+
+
+class ShardLease(Model):
+    """分片调度模式下分区的租约，只有租约持有者会抓取该分区内的 target"""
+
+    partition: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    owner: Mapped[str] = mapped_column(String(100))
+    # 租约到期的时刻（UTC），到期后可被其他进程接管
+    expires_at: Mapped[datetime.datetime] = mapped_column(DateTime)
@@ -0,0 +1,103 @@
+"""add user key
+
+Revision ID: e4c1f0a9d2b7
+Revises: b8e2d7a6c1f3
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+
+import hashlib
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "e4c1f0a9d2b7"
+down_revision = "b8e2d7a6c1f3"
+branch_labels = None
+depends_on = None
+
+
+def get_user_key(user_target: dict) -> str:
+    # 与 nonebot_bison.config.utils.get_user_key 保持一致
+    canonical = json.dumps(user_target, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("nonebot_bison_user", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("user_key", sa.String(length=64), nullable=True))
+
+    user_table = sa.table(
+        "nonebot_bison_user",
+        sa.column("id", sa.Integer),
+        sa.column("user_target", sa.JSON),
+        sa.column("user_key", sa.String),
+    )
+    subscribe_table = sa.table(
+        "nonebot_bison_subscribe",
+        sa.column("id", sa.Integer),
+        sa.column("target_id", sa.Integer),
+        sa.column("user_id", sa.Integer),
+    )
+    conn = op.get_bind()
+    users = conn.execute(sa.select(user_table.c.id, user_table.c.user_target).order_by(user_table.c.id)).all()
+
+    # 字段顺序不同的 user_target 规范化后相同，合并到 id 最小的用户，再创建唯一索引
+    kept_user_ids: dict[str, int] = {}
+    duplicate_user_ids: dict[int, int] = {}
+    for user in users:
+        user_key = get_user_key(user.user_target)
+        if user_key in kept_user_ids:
+            duplicate_user_ids[user.id] = kept_user_ids[user_key]
+        else:
+            kept_user_ids[user_key] = user.id
+
+    if duplicate_user_ids:
+        subscribed: set[tuple[int, int]] = set()
+        moved_subs: list[dict] = []
+        deleted_sub_ids: list[int] = []
+        subs = conn.execute(
+            sa.select(subscribe_table.c.id, subscribe_table.c.target_id, subscribe_table.c.user_id).order_by(
+                subscribe_table.c.id
+            )
+        ).all()
+        # 先记录保留用户的订阅，重复用户订阅了相同 target 时删除该订阅
+        for sub in subs:
+            if sub.user_id not in duplicate_user_ids:
+                subscribed.add((sub.user_id, sub.target_id))
+        for sub in subs:
+            if (kept_user_id := duplicate_user_ids.get(sub.user_id)) is None:
+                continue
+            if (kept_user_id, sub.target_id) in subscribed:
+                deleted_sub_ids.append(sub.id)
+            else:
+                subscribed.add((kept_user_id, sub.target_id))
+                moved_subs.append({"_id": sub.id, "_user_id": kept_user_id})
+        if deleted_sub_ids:
+            conn.execute(subscribe_table.delete().where(subscribe_table.c.id.in_(deleted_sub_ids)))
+        if moved_subs:
+            conn.execute(
+                subscribe_table.update()
+                .where(subscribe_table.c.id == sa.bindparam("_id"))
+                .values(user_id=sa.bindparam("_user_id")),
+                moved_subs,
+            )
+        conn.execute(user_table.delete().where(user_table.c.id.in_(list(duplicate_user_ids))))
+
+    if kept_user_ids:
+        conn.execute(
+            user_table.update().where(user_table.c.id == sa.bindparam("_id")).values(user_key=sa.bindparam("_key")),
+            [{"_id": user_id, "_key": user_key} for user_key, user_id in kept_user_ids.items()],
+        )
+
+    with op.batch_alter_table("nonebot_bison_user", schema=None) as batch_op:
+        batch_op.alter_column("user_key", existing_type=sa.String(length=64), nullable=False)
+        batch_op.create_index(batch_op.f("ix_nonebot_bison_user_user_key"), ["user_key"], unique=True)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("nonebot_bison_user", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_nonebot_bison_user_user_key"))
+        batch_op.drop_column("user_key")
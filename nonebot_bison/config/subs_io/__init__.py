@@ -1,3 +1,13 @@
-from .subs_io import subscribes_export, subscribes_import
+from .stream import ImportProgress, iter_json_items, iter_yaml_items, subscribes_import_stream
+from .subs_io import iter_cookies, iter_sub_packs, subscribes_export, subscribes_import
 
-__all__ = ["subscribes_export", "subscribes_import"]
+__all__ = [
+    "ImportProgress",
+    "iter_cookies",
+    "iter_json_items",
+    "iter_sub_packs",
+    "iter_yaml_items",
+    "subscribes_export",
+    "subscribes_import",
+    "subscribes_import_stream",
+]
@@ -1,9 +1,14 @@
 from abc import ABC
 
 from nonebot.compat import PYDANTIC_V2, ConfigDict
+from nonebot.log import logger
 from nonebot_plugin_saa.registries import AllSupportedPlatformTarget as UserInfo
 from pydantic import BaseModel
 
+from nonebot_bison.config.db_config import config
+from nonebot_bison.config.db_model import Target
+from nonebot_bison.config.utils import get_user_key
+from nonebot_bison.platform import platform_manager
 from nonebot_bison.types import Category, Tag
 
 
@@ -33,3 +38,41 @@ class SubReceipt(BaseModel):
     cats: list[Category]
     tags: list[Tag]
     # default_schedule_weight: int
+
+
+def _check_receipt(receipt: SubReceipt) -> str | None:
+    """返回收据无法导入的原因，可以导入时返回 None"""
+    if receipt.platform_name not in platform_manager:
+        return f"不支持的平台 {receipt.platform_name}"
+    for field in ("target", "target_name"):
+        max_length = Target.__table__.c[field].type.length
+        if len(getattr(receipt, field)) > max_length:
+            return f"{field} 长度超过 {max_length}"
+    try:
+        get_user_key(receipt.user)
+    except Exception as e:
+        return f"无法识别的用户: {e!r}"
+    return None
+
+
+async def bulk_add_receipts(receipts: list[SubReceipt]) -> tuple[int, int, int]:
+    """先逐条校验收据，跳过无法导入的条目，再在同一个事务中添加其余收据对应的订阅
+
+    返回 (新增的订阅数, 跳过的重复订阅数, 跳过的无效条目数)
+    """
+    valid_receipts: list[SubReceipt] = []
+    for receipt in receipts:
+        if reason := _check_receipt(receipt):
+            logger.error(f"！添加订阅条目 {receipt!r} 失败: {reason}")
+        else:
+            valid_receipts.append(receipt)
+    invalid_count = len(receipts) - len(valid_receipts)
+    try:
+        added_count, dup_count = await config.bulk_add_subscribe(valid_receipts)
+    except Exception as e:
+        logger.error(f"！批量添加 {len(valid_receipts)} 条订阅失败，已全部回滚: {e!r}")
+        raise
+    logger.success(
+        f"添加订阅条目 {added_count} 条成功，跳过 {dup_count} 条已存在的订阅，跳过 {invalid_count} 条无效的订阅"
+    )
+    return added_count, dup_count, invalid_count
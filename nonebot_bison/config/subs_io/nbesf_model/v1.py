@@ -3,16 +3,15 @@
 from functools import partial
 from typing import Any
 
-from nonebot.compat import PYDANTIC_V2, ConfigDict, model_dump, type_validate_json, type_validate_python
+from nonebot.compat import PYDANTIC_V2, ConfigDict, type_validate_json, type_validate_python
 from nonebot.log import logger
 from nonebot_plugin_saa import TargetQQGroup, TargetQQPrivate
 from pydantic import BaseModel, Field
 
-from nonebot_bison.config.db_config import SubscribeDupException, config
 from nonebot_bison.config.subs_io.utils import NBESFParseErr
 from nonebot_bison.types import Category, Tag
 
-from .base import NBESFBase, SubReceipt
+from .base import NBESFBase, SubReceipt, bulk_add_receipts
 
 # ===== nbesf 定义格式 ====== #
 NBESF_VERSION = 1
@@ -86,34 +85,31 @@ class SubGroup(
 # ======================= #
 
 
+def sub_pack_receipts(item: SubPack) -> list[SubReceipt]:
+    match item.user.type:
+        case "group":
+            user = TargetQQGroup(group_id=item.user.uid)
+        case "private":
+            user = TargetQQPrivate(user_id=item.user.uid)
+        case _:
+            raise NotImplementedError(f"nbesf v1 不支持的用户类型：{item.user.type}")
+
+    sub_receipt = partial(SubReceipt, user=user)
+
+    return [
+        sub_receipt(
+            target=sub.target.target,
+            target_name=sub.target.target_name,
+            platform_name=sub.target.platform_name,
+            cats=sub.categories,
+            tags=sub.tags,
+        )
+        for sub in item.subs
+    ]
+
+
 async def subs_receipt_gen(nbesf_data: SubGroup):
-    for item in nbesf_data.groups:
-        match item.user.type:
-            case "group":
-                user = TargetQQGroup(group_id=item.user.uid)
-            case "private":
-                user = TargetQQPrivate(user_id=item.user.uid)
-            case _:
-                raise NotImplementedError(f"nbesf v1 不支持的用户类型：{item.user.type}")
-
-        sub_receipt = partial(SubReceipt, user=user)
-
-        for sub in item.subs:
-            receipt = sub_receipt(
-                target=sub.target.target,
-                target_name=sub.target.target_name,
-                platform_name=sub.target.platform_name,
-                cats=sub.categories,
-                tags=sub.tags,
-            )
-            try:
-                await config.add_subscribe(receipt.user, **model_dump(receipt, exclude={"user"}))
-            except SubscribeDupException:
-                logger.warning(f"！添加订阅条目 {receipt!r} 失败: 相同的订阅已存在")
-            except Exception as e:
-                logger.error(f"！添加订阅条目 {receipt!r} 失败: {e!r}")
-            else:
-                logger.success(f"添加订阅条目 {receipt!r} 成功！")
+    await bulk_add_receipts([receipt for item in nbesf_data.groups for receipt in sub_pack_receipts(item)])
 
 
 def nbesf_parser(raw_data: Any) -> SubGroup:
@@ -8,13 +8,13 @@ from nonebot.log import logger
 from nonebot_plugin_saa.registries import AllSupportedPlatformTarget
 from pydantic import BaseModel, Field
 
-from nonebot_bison.config.db_config import SubscribeDupException, config
+from nonebot_bison.config.db_config import config
 from nonebot_bison.config.db_model import Cookie as DBCookie
 from nonebot_bison.config.subs_io.utils import NBESFParseErr
 from nonebot_bison.types import Category, Tag
 from nonebot_bison.types import Target as T_Target
 
-from .base import NBESFBase, SubReceipt
+from .base import NBESFBase, SubReceipt, bulk_add_receipts
 
 # ===== nbesf 定义格式 ====== #
 NBESF_VERSION = 3
@@ -86,41 +86,45 @@ class SubGroup(NBESFBase):
 # ======================= #
 
 
+def sub_pack_receipts(item: SubPack) -> list[SubReceipt]:
+    sub_receipt = partial(SubReceipt, user=item.user_target)
+
+    return [
+        sub_receipt(
+            target=sub.target.target,
+            target_name=sub.target.target_name,
+            platform_name=sub.target.platform_name,
+            cats=sub.categories,
+            tags=sub.tags,
+        )
+        for sub in item.subs
+    ]
+
+
 async def subs_receipt_gen(nbesf_data: SubGroup):
     logger.info("开始添加订阅流程")
-    for item in nbesf_data.groups:
-        sub_receipt = partial(SubReceipt, user=item.user_target)
-
-        for sub in item.subs:
-            receipt = sub_receipt(
-                target=sub.target.target,
-                target_name=sub.target.target_name,
-                platform_name=sub.target.platform_name,
-                cats=sub.categories,
-                tags=sub.tags,
-            )
-            try:
-                await config.add_subscribe(receipt.user, **model_dump(receipt, exclude={"user"}))
-            except SubscribeDupException:
-                logger.warning(f"！添加订阅条目 {receipt!r} 失败: 相同的订阅已存在")
-            except Exception as e:
-                logger.error(f"！添加订阅条目 {receipt!r} 失败: {e!r}")
-            else:
-                logger.success(f"添加订阅条目 {receipt!r} 成功！")
+    await bulk_add_receipts([receipt for item in nbesf_data.groups for receipt in sub_pack_receipts(item)])
 
 
 async def magic_cookie_gen(nbesf_data: SubGroup):
     logger.info("开始添加 Cookie 流程")
-    for cookie in nbesf_data.cookies:
-        try:
-            new_cookie = DBCookie(**model_dump(cookie, exclude={"targets"}))
-            cookie_id = await config.add_cookie(new_cookie)
-            for target in cookie.targets:
-                await config.add_cookie_target(T_Target(target.target), target.platform_name, cookie_id)
-        except Exception as e:
-            logger.error(f"！添加 Cookie 条目 {cookie!r} 失败: {e!r}")
-        else:
-            logger.success(f"添加 Cookie 条目 {cookie!r} 成功！")
+    await bulk_add_magic_cookies(nbesf_data.cookies)
+
+
+async def bulk_add_magic_cookies(nbesf_cookies: list[Cookie]):
+    cookies = [
+        (
+            DBCookie(**model_dump(cookie, exclude={"targets"})),
+            [(target.platform_name, T_Target(target.target)) for target in cookie.targets],
+        )
+        for cookie in nbesf_cookies
+    ]
+    try:
+        added_count = await config.bulk_add_cookies(cookies)
+    except Exception as e:
+        logger.error(f"！批量添加 {len(cookies)} 个 Cookie 失败，已全部回滚: {e!r}")
+        raise
+    logger.success(f"添加 Cookie 条目 {added_count} 个成功")
 
 
 def nbesf_parser(raw_data: Any) -> SubGroup:
@@ -0,0 +1,236 @@
+"""NBESF 文件的流式读取与导入
+
+逐个读取、校验顶层 groups 与 cookies 列表中的条目，无需将整个文件读入内存
+"""
+
+from collections.abc import Awaitable, Callable, Iterator
+from dataclasses import dataclass
+import json
+import re
+from types import ModuleType
+from typing import Any, TextIO
+
+from nonebot.compat import type_validate_python
+from nonebot.log import logger
+
+from .nbesf_model import v1, v2, v3
+from .nbesf_model.base import SubReceipt, bulk_add_receipts
+from .utils import NBESFParseErr, NBESFVerMatchErr
+
+STREAM_READ_SIZE = 64 * 1024
+"""每次从文件读取的字符数"""
+STREAMED_LIST_KEYS = ("groups", "cookies")
+
+_WHITESPACE = re.compile(r"\s*")
+
+
+class _JsonStreamReader:
+    """在按块读取的缓冲区上解析 JSON 值，值不完整时继续读取文件"""
+
+    def __init__(self, f: TextIO):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(STREAM_READ_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()  # type: ignore
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise NBESFParseErr("JSON 文件不完整")
+
+    def expect(self, char: str):
+        if (cur := self.peek()) != char:
+            raise NBESFParseErr(f"JSON 解析失败：期望 {char!r}，实际为 {cur!r}")
+        self.pos += 1
+
+    def decode(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                if self._fill():
+                    continue
+                raise NBESFParseErr("JSON 解析失败") from e
+            # 位于缓冲区末尾的数字可能被截断
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_items(f: TextIO) -> Iterator[tuple[str, Any]]:
+    """逐个产出 NBESF JSON 顶层的 (键, 值)，groups 与 cookies 列表中的元素逐个产出为 (键, 元素)"""
+    reader = _JsonStreamReader(f)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        key = reader.decode()
+        if not isinstance(key, str):
+            raise NBESFParseErr(f"JSON 解析失败：键 {key!r} 不是字符串")
+        reader.expect(":")
+        if key in STREAMED_LIST_KEYS and reader.peek() == "[":
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.expect("]")
+            else:
+                while True:
+                    yield key, reader.decode()
+                    if reader.peek() != ",":
+                        break
+                    reader.expect(",")
+                reader.expect("]")
+        else:
+            yield key, reader.decode()
+        if reader.peek() != ",":
+            break
+        reader.expect(",")
+    reader.expect("}")
+
+
+def iter_yaml_items(f: TextIO, pyyaml: ModuleType) -> Iterator[tuple[str, Any]]:
+    """逐个产出 NBESF YAML 顶层的 (键, 值)，groups 与 cookies 列表中的元素逐个产出为 (键, 元素)"""
+    loader = pyyaml.SafeLoader(f)
+
+    def construct_next() -> Any:
+        value = loader.construct_object(loader.compose_node(None, None), deep=True)
+        # 已产出的对象无需再缓存
+        loader.constructed_objects = {}
+        return value
+
+    try:
+        loader.get_event()  # StreamStartEvent
+        if not loader.check_event(pyyaml.DocumentStartEvent):
+            return
+        loader.get_event()
+        if not loader.check_event(pyyaml.MappingStartEvent):
+            raise NBESFParseErr("YAML 解析失败：顶层不是映射")
+        loader.get_event()
+        while not loader.check_event(pyyaml.MappingEndEvent):
+            key = construct_next()
+            if key in STREAMED_LIST_KEYS and loader.check_event(pyyaml.SequenceStartEvent):
+                loader.get_event()
+                while not loader.check_event(pyyaml.SequenceEndEvent):
+                    yield key, construct_next()
+                loader.get_event()
+            else:
+                yield key, construct_next()
+    except pyyaml.YAMLError as e:
+        raise NBESFParseErr("YAML 解析失败") from e
+    finally:
+        loader.dispose()
+
+
+@dataclass
+class ImportProgress:
+    """已提交到数据库的条目数"""
+
+    groups: int = 0
+    cookies: int = 0
+
+
+_NBESF_MODULES: dict[int, ModuleType] = {1: v1, 2: v2, 3: v3}
+
+
+def _validate_item(model: type, value: Any, desc: str) -> Any:
+    try:
+        return type_validate_python(model, value)
+    except Exception as e:
+        logger.error(f"{desc} 解析失败，该数据格式可能不满足NBESF格式标准！")
+        raise NBESFParseErr(f"{desc} 解析失败") from e
+
+
+async def subscribes_import_stream(
+    items: Iterator[tuple[str, Any]],
+    batch_size: int = 100,
+    progress: ImportProgress | None = None,
+    on_commit: Callable[[ImportProgress], Awaitable[None]] | None = None,
+) -> ImportProgress:
+    """
+    从 iter_json_items 或 iter_yaml_items 产出的条目中流式导入订阅
+
+    groups 与 cookies 中的条目逐个校验，每 batch_size 个条目在一个事务中写入数据库。
+    progress 为上次已提交的进度时，跳过已提交的条目，从断点继续导入；
+    每次提交后以最新进度调用 on_commit，可用于保存断点
+    """
+    committed = progress or ImportProgress()
+    seen = ImportProgress()
+    nbesf_module: ModuleType | None = None
+    receipts: list[SubReceipt] = []
+    pending_groups = 0
+    pending_cookies: list[v3.Cookie] = []
+
+    async def commit():
+        if on_commit:
+            await on_commit(committed)
+        logger.info(f"已导入 {committed.groups} 个订阅组，{committed.cookies} 个 Cookie")
+
+    async def flush_groups():
+        nonlocal receipts, pending_groups
+        if not pending_groups:
+            return
+        await bulk_add_receipts(receipts)
+        committed.groups = seen.groups
+        receipts, pending_groups = [], 0
+        await commit()
+
+    async def flush_cookies():
+        nonlocal pending_cookies
+        if not pending_cookies:
+            return
+        await v3.bulk_add_magic_cookies(pending_cookies)
+        committed.cookies = seen.cookies
+        pending_cookies = []
+        await commit()
+
+    for key, value in items:
+        if key == "version":
+            if (nbesf_module := _NBESF_MODULES.get(int(value))) is None:
+                raise NBESFVerMatchErr(f"不支持的NBESF版本：{value}")
+            logger.info(f"NBESF版本: {value}")
+            continue
+        if key not in STREAMED_LIST_KEYS:
+            continue
+        if nbesf_module is None:
+            raise NBESFParseErr("流式导入要求 version 位于 groups 与 cookies 之前")
+
+        if key == "groups":
+            index = seen.groups
+            seen.groups += 1
+            if index < committed.groups:
+                continue
+            await flush_cookies()
+            sub_pack = _validate_item(nbesf_module.SubPack, value, f"第 {index + 1} 个订阅组")
+            receipts.extend(nbesf_module.sub_pack_receipts(sub_pack))
+            pending_groups += 1
+            if pending_groups >= batch_size:
+                await flush_groups()
+        elif nbesf_module is v3:
+            index = seen.cookies
+            seen.cookies += 1
+            if index < committed.cookies:
+                continue
+            await flush_groups()
+            pending_cookies.append(_validate_item(v3.Cookie, value, f"第 {index + 1} 个 Cookie"))
+            if len(pending_cookies) >= batch_size:
+                await flush_cookies()
+
+    await flush_groups()
+    await flush_cookies()
+    return committed
@@ -1,5 +1,4 @@
-from collections import defaultdict
-from collections.abc import Callable
+from collections.abc import AsyncIterator, Callable
 from typing import cast
 
 from nonebot.compat import type_validate_python
@@ -7,85 +6,103 @@ from nonebot.log import logger
 from nonebot_plugin_datastore.db import create_session
 from nonebot_plugin_saa import PlatformTarget
 from sqlalchemy import select
-from sqlalchemy.orm.strategy_options import selectinload
+from sqlalchemy.orm import contains_eager
 from sqlalchemy.sql.selectable import Select
 
-from nonebot_bison.config import config
 from nonebot_bison.config.db_model import Cookie, CookieTarget, Subscribe, Target, User
 
 from .nbesf_model import NBESFBase, v1, v2, v3
 from .utils import NBESFVerMatchErr, row2dict
 
+EXPORT_CHUNK_SIZE = 1000
+"""流式导出时每次从数据库读取的行数"""
 
-async def subscribes_export(selector: Callable[[Select], Select]) -> v3.SubGroup:
+
+async def iter_sub_packs(
+    selector: Callable[[Select], Select], chunk_size: int = EXPORT_CHUNK_SIZE
+) -> AsyncIterator[v3.SubPack]:
     """
-    将Bison订阅导出为 Nonebot Bison Exchangable Subscribes File 标准格式的 SubGroup 类型数据
+    按用户逐个产出 SubPack，数据库中的订阅按 chunk_size 分批读取，内存占用与订阅总数无关
 
     selector:
         对 sqlalchemy Select 对象的操作函数，用于限定查询范围
         e.g. lambda stmt: stmt.where(User.uid=2233, User.type="group")
     """
     async with create_session() as sess:
-        sub_stmt = select(Subscribe).join(User)
-        sub_stmt = selector(sub_stmt).options(selectinload(Subscribe.target))
+        sub_stmt = select(Subscribe).join(User).join(Target)
+        sub_stmt = selector(sub_stmt)
+        sub_stmt = (
+            sub_stmt.options(contains_eager(Subscribe.user), contains_eager(Subscribe.target))
+            .order_by(Subscribe.user_id, Subscribe.id)
+            .execution_options(yield_per=chunk_size)
+        )
         sub_stmt = cast(Select[tuple[Subscribe]], sub_stmt)
-        sub_data = await sess.scalars(sub_stmt)
 
-        user_stmt = select(User).join(Subscribe)
-        user_stmt = selector(user_stmt).distinct()
-        user_stmt = cast(Select[tuple[User]], user_stmt)
-        user_data = await sess.scalars(user_stmt)
+        cur_user: User | None = None
+        subs: list[v3.SubPayload] = []
+        async for sub in await sess.stream_scalars(sub_stmt):
+            if cur_user is not None and sub.user_id != cur_user.id:
+                yield v3.SubPack(user_target=PlatformTarget.deserialize(cur_user.user_target), subs=subs)
+                subs = []
+            cur_user = sub.user
+            subs.append(type_validate_python(v3.SubPayload, sub))
+        if cur_user is not None:
+            yield v3.SubPack(user_target=PlatformTarget.deserialize(cur_user.user_target), subs=subs)
 
-    groups: list[v3.SubPack] = []
-    user_id_sub_dict: dict[int, list[v3.SubPayload]] = defaultdict(list)
 
-    for sub in sub_data:
-        sub_paylaod = type_validate_python(v3.SubPayload, sub)
-        user_id_sub_dict[sub.user_id].append(sub_paylaod)
+def _cookie_transform(cookie: Cookie, targets: list[v3.Target]) -> v3.Cookie:
+    cookie_dict = row2dict(cookie)
+    cookie_dict["tags"] = cookie.tags
+    cookie_dict["targets"] = targets
+    return v3.Cookie(**cookie_dict)
 
-    for user in user_data:
-        assert isinstance(user, User)
-        sub_pack = v3.SubPack(
-            user_target=PlatformTarget.deserialize(user.user_target),
-            subs=user_id_sub_dict[user.id],
-        )
-        groups.append(sub_pack)
 
+async def iter_cookies(chunk_size: int = EXPORT_CHUNK_SIZE) -> AsyncIterator[v3.Cookie]:
+    """逐个产出 Cookie 及其关联的 Target，包括未关联 Target 的非匿名 Cookie"""
     async with create_session() as sess:
         cookie_target_stmt = (
             select(CookieTarget)
             .join(Cookie)
             .join(Target)
-            .options(selectinload(CookieTarget.target))
-            .options(selectinload(CookieTarget.cookie))
+            .options(contains_eager(CookieTarget.cookie), contains_eager(CookieTarget.target))
+            .order_by(CookieTarget.cookie_id, CookieTarget.id)
+            .execution_options(yield_per=chunk_size)
         )
-        cookie_target_data = await sess.scalars(cookie_target_stmt)
-
-    cookie_target_dict: dict[Cookie, list[v3.Target]] = defaultdict(list)
-    for cookie_target in cookie_target_data:
-        target_payload = type_validate_python(v3.Target, cookie_target.target)
-        cookie_target_dict[cookie_target.cookie].append(target_payload)
-
-    def cookie_transform(cookie: Cookie, targets: list[v3.Target]) -> v3.Cookie:
-        cookie_dict = row2dict(cookie)
-        cookie_dict["tags"] = cookie.tags
-        cookie_dict["targets"] = targets
-        return v3.Cookie(**cookie_dict)
+        cur_cookie: Cookie | None = None
+        targets: list[v3.Target] = []
+        async for cookie_target in await sess.stream_scalars(cookie_target_stmt):
+            if cur_cookie is not None and cookie_target.cookie_id != cur_cookie.id:
+                yield _cookie_transform(cur_cookie, targets)
+                targets = []
+            cur_cookie = cookie_target.cookie
+            targets.append(type_validate_python(v3.Target, cookie_target.target))
+        if cur_cookie is not None:
+            yield _cookie_transform(cur_cookie, targets)
+
+        # 添加未关联的cookie
+        unlinked_cookie_stmt = (
+            select(Cookie)
+            .where(Cookie.is_anonymous.is_(False), ~Cookie.targets.any())
+            .order_by(Cookie.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        async for cookie in await sess.stream_scalars(unlinked_cookie_stmt):
+            yield _cookie_transform(cookie, [])
 
-    cookies: list[v3.Cookie] = []
-    cookie_set = set()
-    for cookie, targets in cookie_target_dict.items():
-        assert isinstance(cookie, Cookie)
-        cookies.append(cookie_transform(cookie, targets))
-        cookie_set.add(cookie.id)
 
-    # 添加未关联的cookie
-    all_cookies = await config.get_cookie(is_anonymous=False)
-    cookies.extend([cookie_transform(c, []) for c in all_cookies if c.id not in cookie_set])
+async def subscribes_export(selector: Callable[[Select], Select]) -> v3.SubGroup:
+    """
+    将Bison订阅导出为 Nonebot Bison Exchangable Subscribes File 标准格式的 SubGroup 类型数据
 
-    sub_group = v3.SubGroup(groups=groups, cookies=cookies)
+    会将全部数据读入内存，导出大量订阅时请使用 iter_sub_packs 与 iter_cookies 流式导出
 
-    return sub_group
+    selector:
+        对 sqlalchemy Select 对象的操作函数，用于限定查询范围
+        e.g. lambda stmt: stmt.where(User.uid=2233, User.type="group")
+    """
+    groups = [sub_pack async for sub_pack in iter_sub_packs(selector)]
+    cookies = [cookie async for cookie in iter_cookies()]
+    return v3.SubGroup(groups=groups, cookies=cookies)
 
 
 async def subscribes_import(
@@ -1,3 +1,11 @@
+import hashlib
+import json
+from typing import Any
+
+from nonebot.compat import model_dump
+from nonebot_plugin_saa import PlatformTarget
+
+
 class NoSuchUserException(Exception):
     pass
 
@@ -12,3 +20,10 @@ class NoSuchTargetException(Exception):
 
 class DuplicateCookieTargetException(Exception):
     pass
+
+
+def get_user_key(user: PlatformTarget | dict[str, Any]) -> str:
+    """由 PlatformTarget（或其序列化结果）生成规范化的用户标识，用于按索引查找用户"""
+    user_target = user if isinstance(user, dict) else model_dump(user)
+    canonical = json.dumps(user_target, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()
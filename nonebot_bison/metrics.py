@@ -17,6 +17,25 @@ cookie_choose_counter = Counter(
     "bison_cookie_choose_counter", "The number of cookie choose", ["site_name", "target", "cookie_id"]
 )
 
+retry_transition_counter = Counter(
+    "bison_retry_transition_counter",
+    "The number of retry state transitions",
+    ["retry_key", "from_state", "to_state"],
+)
+
+group_member_request_counter = Counter(
+    "bison_group_member_request_counter",
+    "The number of requests of each member in a no-target platform group",
+    ["platform_name", "member", "success"],
+)
+
+group_member_request_time_histogram = Histogram(
+    "bison_group_member_request_histogram",
+    "The time of each member in a no-target platform group used to request the source",
+    ["platform_name", "member"],
+    buckets=[0.1, 0.5, 1, 2, 5, 10, 30, 60],
+)
+
 request_time_histogram = Histogram(
     "bison_request_histogram",
     "The time of platform used to request the source",
@@ -24,6 +43,13 @@ request_time_histogram = Histogram(
     buckets=[0.1, 0.5, 1, 2, 5, 10, 30, 60],
 )
 
+rate_limit_wait_histogram = Histogram(
+    "bison_rate_limit_wait_histogram",
+    "The time of request waited for the rate limiter of its domain",
+    ["domain"],
+    buckets=[0, 0.1, 0.5, 1, 2, 5, 10, 30],
+)
+
 render_time_histogram = Histogram(
     "bison_render_histogram",
     "The time of theme used to render",
@@ -31,5 +57,22 @@ render_time_histogram = Histogram(
     buckets=[0.1, 0.5, 1, 2, 5, 10, 30, 60],
 )
 
+circuit_breaker_state_gauge = Gauge(
+    "bison_circuit_breaker_state",
+    "The state of circuit breaker, 0: closed, 1: open, 2: half-open",
+    ["key"],
+)
+
+schedule_interval_gauge = Gauge(
+    "bison_schedule_interval",
+    "The current schedule interval (seconds) of site adjusted by rate controller",
+    ["site_name"],
+)
+
+shard_owned_partitions_gauge = Gauge(
+    "bison_shard_owned_partitions",
+    "The number of partitions owned by this process in shard mode",
+)
+
 start_time = Gauge("bison_start_time", "The start time of the program")
 start_time.set(time.time())
@@ -156,6 +156,18 @@ class PostAPI(APIBase):
     data: "PostAPI.Data | None" = None
 
 
+class PostListAPI(APIBase):
+    """只校验外层结构的动态列表，动态条目保持原始数据
+
+    用于在完整校验 PostAPI.Item 之前先按 id_str 和 pub_ts 筛掉已经见过的动态
+    """
+
+    class Data(Base):
+        items: list[dict[str, Any]] | None = None
+
+    data: "PostListAPI.Data | None" = None
+
+
 class VideoMajor(Base):
     class Archive(Base):
         aid: str
@@ -401,3 +413,4 @@ model_rebuild_recurse(CommonMajor)
 model_rebuild_recurse(CoursesMajor)
 model_rebuild_recurse(UserAPI)
 model_rebuild_recurse(PostAPI)
+model_rebuild_recurse(PostListAPI)
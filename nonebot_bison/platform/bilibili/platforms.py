@@ -1,7 +1,7 @@
 from copy import deepcopy
 from enum import Enum, unique
 import re
-from typing import ClassVar, NamedTuple
+from typing import Any, ClassVar, NamedTuple
 from typing_extensions import Self
 
 from httpx import AsyncClient
@@ -11,10 +11,16 @@ from pydantic import BaseModel, Field, ValidationError
 from yarl import URL
 
 from nonebot_bison.compat import model_rebuild
-from nonebot_bison.platform.platform import CategoryNotRecognize, CategoryNotSupport, NewMessage, StatusChange
+from nonebot_bison.platform.platform import (
+    CategoryNotRecognize,
+    CategoryNotSupport,
+    NewMessage,
+    StatusChange,
+    catch_network_error,
+)
 from nonebot_bison.post.post import Post
 from nonebot_bison.types import ApiError, Category, RawPost, Tag, Target
-from nonebot_bison.utils import decode_unicode_escapes, text_similarity
+from nonebot_bison.utils import bounded_gather, decode_unicode_escapes, text_similarity
 
 from .models import (
     ArticleMajor,
@@ -29,6 +35,7 @@ from .models import (
     OPUSMajor,
     PGCMajor,
     PostAPI,
+    PostListAPI,
     UnknownMajor,
     UserAPI,
     VideoMajor,
@@ -101,7 +108,7 @@ class Bilibili(NewMessage):
         )
         res.raise_for_status()
         try:
-            res_obj = type_validate_json(PostAPI, res.content)
+            res_obj = type_validate_python(PostListAPI, res.json())
         except ValidationError as e:
             logger.exception("解析B站动态列表失败")
             logger.error(res.json())
@@ -112,8 +119,14 @@ class Bilibili(NewMessage):
         if res_obj.code == 0:
             if (data := res_obj.data) and (items := data.items):
                 logger.trace(f"获取用户{target}的动态列表成功，共{len(items)}条动态")
-                logger.trace(f"用户{target}的动态列表: {':'.join(x.id_str or x.basic.rid_str for x in items)}")
-                return [item for item in items if item.type != "DYNAMIC_TYPE_NONE"]
+                logger.trace(f"用户{target}的动态列表: {':'.join(self._get_raw_item_id(x) for x in items)}")
+                new_items = self._filter_seen_raw_items(target, items)
+                try:
+                    return [type_validate_python(DynRawPost, item) for item in new_items]
+                except ValidationError as e:
+                    logger.exception("解析B站动态失败")
+                    logger.error(new_items)
+                    raise ApiError(res.request.url) from e
 
             logger.trace(f"获取用户{target}的动态列表成功，但是没有动态")
             return []
@@ -122,6 +135,25 @@ class Bilibili(NewMessage):
         else:
             raise ApiError(res.request.url)
 
+    @staticmethod
+    def _get_raw_item_id(item: dict[str, Any]) -> str:
+        return item.get("id_str") or item.get("basic", {}).get("rid_str", "")
+
+    def _filter_seen_raw_items(self, target: Target, items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """只读取 id_str 和 pub_ts 粗筛原始动态，已见过或过旧的动态不再做完整的模型校验"""
+        store = self.get_stored_data(target)
+        exists_posts = store.exists_posts if store else set()
+        res = []
+        for item in items:
+            if item.get("type") == "DYNAMIC_TYPE_NONE" or item.get("id_str") in exists_posts:
+                continue
+            pub_ts = item.get("modules", {}).get("module_author", {}).get("pub_ts")
+            if isinstance(pub_ts, int) and self.is_outdated(pub_ts):
+                continue
+            res.append(item)
+        logger.trace(f"用户{target}的动态列表中有{len(res)}条需要解析")
+        return res
+
     def get_id(self, post: DynRawPost) -> str:
         return post.id_str
 
@@ -322,6 +354,8 @@ class Bilibililive(StatusChange):
     name = "Bilibili直播"
     has_target = True
     use_batch = True
+    batch_chunk_size = 50
+    batch_chunk_concurrency = 4
     default_theme = "brief"
 
     @unique
@@ -475,6 +509,10 @@ class BilibiliBangumi(StatusChange):
     has_target = True
     parse_target_promot = "请输入剧集主页"
     default_theme = "brief"
+    # 该接口不支持一次查询多个剧集，以批量模式在同一次调度中并发请求各个剧集
+    use_batch = True
+    batch_status_concurrency = 8
+    """批量获取状态时同时进行的最大请求数"""
 
     _url = "https://api.bilibili.com/pgc/review/user"
 
@@ -515,6 +553,21 @@ class BilibiliBangumi(StatusChange):
         else:
             raise self.FetchError
 
+    async def _get_status_or_none(self, target: Target) -> dict[str, Any] | None:
+        """单个剧集获取失败时返回 None，不影响同一批次的其他剧集"""
+        try:
+            return await catch_network_error(self.get_status, target)
+        except self.FetchError:
+            logger.warning(f"fetching {self.name}-{target} error")
+        except Exception as e:
+            logger.opt(exception=e).warning(f"fetching {self.name}-{target} error")
+        return None
+
+    async def batch_get_status(self, targets: list[Target]) -> list[dict[str, Any] | None]:
+        return await bounded_gather(
+            (self._get_status_or_none(target) for target in targets), self.batch_status_concurrency
+        )
+
     def compare_status(self, target: Target, old_status, new_status) -> list[RawPost]:
         if new_status["index"] != old_status["index"]:
             return [new_status]
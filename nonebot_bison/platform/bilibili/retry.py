@@ -4,14 +4,15 @@ from datetime import datetime, timedelta
 from enum import Enum
 from functools import wraps
 import random
-from typing import TYPE_CHECKING, Generic, Literal, TypeVar
+from typing import TYPE_CHECKING, Generic, Literal, TypeVar, overload
 from typing_extensions import assert_never, override
 
-from httpx import URL as HttpxURL
+from expiringdictx import ExpiringDict
 from nonebot.log import logger
 from strenum import StrEnum
 
-from nonebot_bison.types import Target
+from nonebot_bison.metrics import retry_transition_counter
+from nonebot_bison.types import ApiError, Target
 
 from .fsm import FSM, ActionReturn, Condition, StateGraph, Transition, reset_on_exception
 from .models import DynRawPost
@@ -23,10 +24,8 @@ if TYPE_CHECKING:
 TBilibili = TypeVar("TBilibili", bound="Bilibili")
 
 
-class ApiCode352Error(Exception):
-    def __init__(self, url: HttpxURL) -> None:
-        msg = f"api {url} error"
-        super().__init__(msg)
+class ApiCode352Error(ApiError):
+    pass
 
 
 # see https://docs.python.org/zh-cn/3/howto/enum.html#dataclass-support
@@ -207,6 +206,18 @@ RETRY_GRAPH: StateGraph[RetryState, RetryEvent, RetryAddon] = {
 
 
 class RetryFSM(FSM[RetryState, RetryEvent, RetryAddon[TBilibili]]):
+    def __init__(
+        self,
+        graph: StateGraph[RetryState, RetryEvent, RetryAddon[TBilibili]],
+        addon: RetryAddon[TBilibili],
+        key: str,
+        cookie_key: str | None = None,
+    ):
+        super().__init__(graph, addon)
+        self.key = key
+        self.cookie_key = cookie_key or key
+        """状态机对应的 cookie，按 target 隔离时不含 target，用作指标标签"""
+
     @override
     async def start(self, bls: TBilibili):
         self.addon.bilibili_platform = bls
@@ -220,42 +231,106 @@ class RetryFSM(FSM[RetryState, RetryEvent, RetryAddon[TBilibili]]):
     @override
     @reset_on_exception
     async def emit(self, event: RetryEvent):
+        from_state = self.current_state
         await super().emit(event)
+        retry_transition_counter.labels(
+            retry_key=self.cookie_key, from_state=from_state.state, to_state=self.current_state.state
+        ).inc()
 
+    def is_benched(self) -> bool:
+        """是否处于回避状态，回避中的 cookie 不应被选用"""
+        return self.current_state == RetryState.BACKOFF and self.addon.is_in_backoff_time()
 
-# FIXME: 拿出来是方便测试了，但全局单例会导致所有被装饰的函数共享状态，有待改进
-_retry_fsm = RetryFSM(RETRY_GRAPH, RetryAddon["Bilibili"]())
 
+DEFAULT_RETRY_KEY = "default"
+"""非 Bilibili ClientManager 使用的重试状态键"""
 
-def retry_for_352(api_func: Callable[[TBilibili, Target], Awaitable[list[DynRawPost]]]):
-    # _retry_fsm = RetryFSM(RETRY_GRAPH, RetryAddon[TBilibili]())
+RETRY_FSM_IDLE_AGE = timedelta(hours=2)
+"""重试状态机闲置超过该时长后被清理，需长于最长的回避时间"""
+
+_retry_fsms = ExpiringDict[str, RetryFSM](capacity=4096, default_age=RETRY_FSM_IDLE_AGE)
+"""按 LRU 与闲置时间清理，避免 cookie 与 target 增减后状态机无限累积"""
+
+
+def get_retry_fsm(key: str, target: Target | None = None) -> RetryFSM:
+    """获取对应 cookie（target 不为空时为 cookie+target）的重试状态机，不存在则创建"""
+    fsm_key = f"{key}:{target}" if target is not None else key
+    if (retry_fsm := _retry_fsms.get(fsm_key)) is None:
+        retry_fsm = RetryFSM(RETRY_GRAPH, RetryAddon["Bilibili"](), fsm_key, key)
+        _retry_fsms[fsm_key] = retry_fsm
+    else:
+        _retry_fsms.refresh(fsm_key, RETRY_FSM_IDLE_AGE)
+    return retry_fsm
+
+
+def is_retry_key_benched(key: str) -> bool:
+    return (retry_fsm := _retry_fsms.get(key)) is not None and retry_fsm.is_benched()
+
+
+async def _get_retry_key(bls: "Bilibili") -> str:
+    from .scheduler import BilibiliClientManager
+
+    client_mgr = bls.ctx.client_mgr
+    return await client_mgr.get_retry_key() if isinstance(client_mgr, BilibiliClientManager) else DEFAULT_RETRY_KEY
 
-    @wraps(api_func)
-    async def wrapper(bls: TBilibili, *args, **kwargs) -> list[DynRawPost]:
-        # nonlocal _retry_fsm
-        if not _retry_fsm.started:
-            await _retry_fsm.start(bls)
 
-        match _retry_fsm.current_state:
+@overload
+def retry_for_352(
+    api_func: Callable[[TBilibili, Target], Awaitable[list[DynRawPost]]],
+) -> Callable[[TBilibili, Target], Awaitable[list[DynRawPost]]]:
+    """按 cookie 隔离重试状态"""
+
+
+@overload
+def retry_for_352(
+    *, per_target: bool = False
+) -> Callable[
+    [Callable[[TBilibili, Target], Awaitable[list[DynRawPost]]]],
+    Callable[[TBilibili, Target], Awaitable[list[DynRawPost]]],
+]:
+    """per_target 为 True 时按 cookie+target 隔离重试状态"""
+
+
+def retry_for_352(api_func=None, /, *, per_target=False):  # pyright: ignore[reportInconsistentOverload]
+    def warp(api_func: Callable[[TBilibili, Target], Awaitable[list[DynRawPost]]]):
+        return _retry_for_352(api_func, per_target)
+
+    if api_func is None:
+        return warp
+
+    return warp(api_func)
+
+
+def _retry_for_352(api_func: Callable[[TBilibili, Target], Awaitable[list[DynRawPost]]], per_target: bool):
+    @wraps(api_func)
+    async def wrapper(bls: TBilibili, target: Target) -> list[DynRawPost]:
+        retry_fsm = get_retry_fsm(await _get_retry_key(bls), target if per_target else None)
+        if not retry_fsm.started:
+            await retry_fsm.start(bls)
+        # 刷新 client 时需要作用在本次请求的 context 上
+        retry_fsm.addon.bilibili_platform = bls
+
+        match retry_fsm.current_state:
             case RetryState.NROMAL | RetryState.REFRESH | RetryState.RAISE:
                 try:
-                    res = await api_func(bls, *args, **kwargs)
+                    res = await api_func(bls, target)
                 except ApiCode352Error as e:
-                    logger.warning("本次 Bilibili API 请求返回 352 错误码")
-                    await _retry_fsm.emit(RetryEvent.REQUEST_AND_RAISE)
+                    logger.warning(f"本次 Bilibili API 请求返回 352 错误码 ({retry_fsm.key})")
+                    bls.ctx.mark_throttled()
+                    await retry_fsm.emit(RetryEvent.REQUEST_AND_RAISE)
 
-                    if _retry_fsm.current_state == RetryState.RAISE:
+                    if retry_fsm.current_state == RetryState.RAISE:
                         raise e
 
                     return []
                 else:
-                    await _retry_fsm.emit(RetryEvent.REQUEST_AND_SUCCESS)
+                    await retry_fsm.emit(RetryEvent.REQUEST_AND_SUCCESS)
                     return res
             case RetryState.BACKOFF:
-                logger.warning("本次 Bilibili 请求回避中，不请求")
-                await _retry_fsm.emit(RetryEvent.IN_BACKOFF_TIME)
+                logger.warning(f"本次 Bilibili 请求回避中，不请求 ({retry_fsm.key})")
+                await retry_fsm.emit(RetryEvent.IN_BACKOFF_TIME)
                 return []
             case _:
-                assert_never(_retry_fsm.current_state)
+                assert_never(retry_fsm.current_state)
 
     return wrapper
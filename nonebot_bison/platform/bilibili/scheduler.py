@@ -1,3 +1,5 @@
+import asyncio
+from collections import deque
 from collections.abc import Callable
 from datetime import datetime, timedelta
 import json
@@ -7,6 +9,7 @@ from typing_extensions import override
 
 from httpx import AsyncClient, Response
 from nonebot import logger, require
+from nonebot_plugin_apscheduler import scheduler as aps_scheduler
 from playwright.async_api import Cookie
 
 from nonebot_bison.config import config
@@ -30,6 +33,19 @@ class BilibiliClientManager(CookieClientManager):
     _default_cookie_cd = timedelta(seconds=120)
     current_identified_cookie: CookieModel | None = None
     _site_name = "bilibili.com"
+    _cookie_pool_size = 2
+    """后台预先生成的匿名 cookie 数量"""
+    _cookie_pool_max_age = timedelta(hours=1)
+    """预先生成的匿名 cookie 超过该时长后丢弃"""
+    _cookie_pool_refresh_ahead = timedelta(minutes=15)
+    """预先生成的匿名 cookie 距离过期不足该时长时，在后台生成新的 cookie 替换"""
+    _cookie_pool_refresh_interval = timedelta(minutes=5)
+    """后台检查匿名 cookie 池的间隔"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._cookie_pool: deque[tuple[datetime, list[Cookie]]] = deque()
+        self._prewarm_task: asyncio.Task | None = None
 
     async def _get_cookies(self) -> list[Cookie]:
         browser = await get_browser()
@@ -48,9 +64,61 @@ class BilibiliClientManager(CookieClientManager):
             cookie_dict[cookie.get("name", "")] = cookie.get("value", "")
         return cookie_dict
 
+    def _drop_expired_pooled_cookies(self):
+        while self._cookie_pool and datetime.now() - self._cookie_pool[0][0] > self._cookie_pool_max_age:
+            self._cookie_pool.popleft()
+
+    def _fresh_pooled_cookie_count(self) -> int:
+        """池中距离过期还很远、无需替换的 cookie 数量"""
+        refresh_before = datetime.now() - (self._cookie_pool_max_age - self._cookie_pool_refresh_ahead)
+        return sum(1 for created_at, _ in self._cookie_pool if created_at > refresh_before)
+
+    async def _prewarm_cookies(self):
+        """在后台补满匿名 cookie 池，并提前替换即将过期的 cookie"""
+        self._drop_expired_pooled_cookies()
+        while self._fresh_pooled_cookie_count() < self._cookie_pool_size:
+            try:
+                cookies = await self._get_cookies()
+            except Exception as e:
+                logger.warning(f"预生成B站匿名cookie失败: {e}")
+                return
+            self._cookie_pool.append((datetime.now(), cookies))
+            # 新 cookie 生成后再丢弃最旧的 cookie，替换期间池中始终有可用的 cookie
+            while len(self._cookie_pool) > self._cookie_pool_size:
+                self._cookie_pool.popleft()
+            logger.debug(f"预生成B站匿名cookie，当前池大小: {len(self._cookie_pool)}")
+
+    def _ensure_prewarm(self):
+        if self._prewarm_task is None or self._prewarm_task.done():
+            self._prewarm_task = asyncio.create_task(self._prewarm_cookies())
+
+    async def _refresh_cookie_pool(self):
+        self._ensure_prewarm()
+
+    def _start_cookie_pool(self):
+        """开始预生成匿名 cookie，并定期在后台替换即将过期的 cookie"""
+        self._ensure_prewarm()
+        aps_scheduler.add_job(
+            self._refresh_cookie_pool,
+            "interval",
+            seconds=self._cookie_pool_refresh_interval.total_seconds(),
+            id="bison_bilibili_cookie_pool",
+            replace_existing=True,
+        )
+
+    async def _take_cookies(self) -> list[Cookie]:
+        """优先取用预生成的匿名 cookie，池为空时才同步打开浏览器生成"""
+        self._drop_expired_pooled_cookies()
+        if self._cookie_pool:
+            _, cookies = self._cookie_pool.popleft()
+        else:
+            cookies = await self._get_cookies()
+        self._ensure_prewarm()
+        return cookies
+
     @override
     async def _generate_anonymous_cookie(self) -> CookieModel:
-        cookies = await self._get_cookies()
+        cookies = await self._take_cookies()
         cookie = CookieModel(
             cookie_name=f"{self._site_name} anonymous",
             site_name=self._site_name,
@@ -82,27 +150,51 @@ class BilibiliClientManager(CookieClientManager):
         return _response_hook
 
     async def _get_next_identified_cookie(self) -> CookieModel | None:
-        """选择下一个实名 cookie"""
+        """选择下一个实名 cookie，跳过正在回避的 cookie"""
+        from .retry import is_retry_key_benched
+
         cookies = await config.get_cookie(self._site_name, is_anonymous=False)
-        available_cookies = [cookie for cookie in cookies if cookie.last_usage + cookie.cd < datetime.now()]
+        available_cookies = [
+            cookie
+            for cookie in cookies
+            if cookie.last_usage + cookie.cd < datetime.now()
+            and not is_retry_key_benched(self._cookie_retry_key(cookie))
+        ]
         if not available_cookies:
             return None
         cookie = min(available_cookies, key=lambda x: x.last_usage)
         return cookie
 
-    async def _choose_cookie(self, target: Target | None) -> CookieModel:
-        """选择 cookie 的具体算法"""
+    async def _select_identified_cookie(self) -> CookieModel | None:
         if self.current_identified_cookie is None:
             # 若当前没有选定实名 cookie 则尝试获取
             self.current_identified_cookie = await self._get_next_identified_cookie()
-        if self.current_identified_cookie:
+        return self.current_identified_cookie
+
+    @staticmethod
+    def _cookie_retry_key(cookie: CookieModel | None) -> str:
+        return f"cookie-{cookie.id}" if cookie else "anonymous"
+
+    async def get_retry_key(self) -> str:
+        """下一次请求将使用的 cookie 对应的重试状态键"""
+        return self._cookie_retry_key(await self._select_identified_cookie())
+
+    async def _choose_cookie(self, target: Target | None) -> CookieModel:
+        """选择 cookie 的具体算法"""
+        if identified_cookie := await self._select_identified_cookie():
             # 如果当前有选定的实名 cookie 则直接返回
-            return self.current_identified_cookie
+            return identified_cookie
         # 否则返回匿名 cookie
         return (await config.get_cookie(self._site_name, is_anonymous=True))[0]
 
     @override
     async def refresh_client(self):
+        if self._prewarm_task is None:
+            # 首次刷新发生在 init_scheduler 中，此时开始预生成，
+            # 并等待首批 cookie 生成后再取用，避免与预生成同时打开浏览器
+            self._start_cookie_pool()
+            assert self._prewarm_task
+            await self._prewarm_task
         await self._refresh_anonymous_cookie()
         logger.debug("刷新B站客户端的cookie")
 
@@ -119,6 +211,7 @@ class BilibiliSite(Site):
     name = "bilibili.com"
     schedule_setting: ClassVar[dict] = {"seconds": 60}
     schedule_type = "interval"
+    schedule_jitter = 5
     client_mgr = BilibiliClientManager
     require_browser = True
 
@@ -133,3 +226,4 @@ class BiliBangumiSite(Site):
     name = "bilibili.com/bangumi"
     schedule_setting: ClassVar[dict] = {"seconds": 30}
     schedule_type = "interval"
+    schedule_jitter = 3
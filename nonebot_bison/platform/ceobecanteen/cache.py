@@ -1,8 +1,9 @@
-from collections.abc import Callable
+import asyncio
+from collections.abc import Callable, Hashable
 from datetime import timedelta
 from functools import partial
 from types import MappingProxyType
-from typing import TypeAlias
+from typing import TypeAlias, TypeVar
 
 from expiringdictx import ExpiringDict, SimpleCache
 from hishel import AsyncCacheTransport, AsyncInMemoryStorage, Controller
@@ -26,6 +27,7 @@ CeobeClient = partial(
 )
 
 UniqueId: TypeAlias = str
+_K = TypeVar("_K", bound=Hashable)
 
 
 class CeobeCache:
@@ -47,10 +49,21 @@ class CeobeCache:
 
 
 class CeobeDataSourceCache:
-    """数据源缓存, 以unique_id为key存储数据源"""
+    """数据源缓存, 以unique_id为key存储数据源
+
+    刷新时同时维护 nickname 与 (datasource, db_unique_key) 到 unique_id 的索引；
+    刷新后仍找不到的 key 会在 negative_age 内直接返回 None，不再触发刷新；
+    同时进行的刷新请求共享同一次请求
+    """
+
+    negative_age = timedelta(minutes=5)
 
     def __init__(self):
         self._cache = ExpiringDict[UniqueId, CeobeTarget](capacity=100, default_age=timedelta(days=1))
+        self._nickname_index: dict[str, UniqueId] = {}
+        self._source_index: dict[tuple[str, str], UniqueId] = {}
+        self._missing_keys = ExpiringDict[Hashable, bool](capacity=1000, default_age=self.negative_age)
+        self._refresh_task: asyncio.Task[MappingProxyType[UniqueId, CeobeTarget]] | None = None
         self.client = CeobeClient()
         self.url = DATASOURCE_URL
 
@@ -59,11 +72,25 @@ class CeobeDataSourceCache:
         return MappingProxyType(self._cache)
 
     async def refresh_data_sources(self) -> MappingProxyType[UniqueId, CeobeTarget]:
-        """请求数据源API刷新缓存"""
+        """请求数据源API刷新缓存，刷新进行中时等待该次刷新的结果"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_data_sources())
+            self._refresh_task.add_done_callback(self._on_refresh_done)
+        return await asyncio.shield(self._refresh_task)
+
+    def _on_refresh_done(self, task: asyncio.Task):
+        self._refresh_task = None
+        # 所有调用者都被取消时，避免出现未获取异常的警告
+        if not task.cancelled():
+            task.exception()
+
+    async def _refresh_data_sources(self) -> MappingProxyType[UniqueId, CeobeTarget]:
         data_sources_resp = await self.client.get(self.url)
         data_sources = process_response(data_sources_resp, DataSourceResponse).data
         for ds in data_sources:
             self._cache[ds.unique_id] = ds
+            self._nickname_index[ds.nickname] = ds.unique_id
+            self._source_index[ds.datasource, ds.db_unique_key] = ds.unique_id
         return self.cache
 
     async def get_all(self, force_refresh: bool = False) -> MappingProxyType[UniqueId, CeobeTarget]:
@@ -80,40 +107,46 @@ class CeobeDataSourceCache:
         cache = self._cache.values()
         return next(filter(cond_func, cache), None)
 
+    async def _get_or_refresh(
+        self, missing_key: Hashable, lookup: Callable[[], CeobeTarget | None]
+    ) -> CeobeTarget | None:
+        """在缓存中查找数据源，找不到时刷新缓存，刷新后仍找不到的 key 会被记录一段时间"""
+        if target := lookup():
+            return target
+        if missing_key in self._missing_keys:
+            return None
+        await self.refresh_data_sources()
+        if target := lookup():
+            return target
+        # ExpiringDict 会把元组 key 解析为 (key, age)，需显式传入有效期
+        self._missing_keys[missing_key, self.negative_age] = True
+        return None
+
+    def _get_indexed(self, index: dict[_K, UniqueId], key: _K) -> CeobeTarget | None:
+        if (unique_id := index.get(key)) is None:
+            return None
+        return self._cache.get(unique_id)
+
     async def get_by_unique_id(self, unique_id: str) -> CeobeTarget | None:
         """根据unique_id获取数据源
 
         如果在缓存中找不到，会刷新缓存
         """
-        if target := self._cache.get(unique_id):
-            return target
-        await self.refresh_data_sources()
-        return self._cache.get(unique_id)
+        return await self._get_or_refresh(("unique_id", unique_id), lambda: self._cache.get(unique_id))
 
     async def get_by_nickname(self, nickname: str) -> CeobeTarget | None:
         """根据nickname获取数据源
 
         如果在缓存中找不到，会刷新缓存
         """
-
-        def select_by_nickname(target: CeobeTarget):
-            return target.nickname == nickname
-
-        if target := self.select_one(select_by_nickname):
-            return target
-        await self.refresh_data_sources()
-        return self.select_one(select_by_nickname)
+        return await self._get_or_refresh(
+            ("nickname", nickname), lambda: self._get_indexed(self._nickname_index, nickname)
+        )
 
     async def get_by_source(self, source: CeobeSource) -> CeobeTarget | None:
         """根据source获取数据源
 
         如果在缓存中找不到，会刷新缓存
         """
-
-        def select_by_source(target: CeobeTarget):
-            return target.db_unique_key == source.data and target.datasource == source.type
-
-        if target := self.select_one(select_by_source):
-            return target
-        await self.refresh_data_sources()
-        return self.select_one(select_by_source)
+        key = (source.type, source.data)
+        return await self._get_or_refresh(("source", *key), lambda: self._get_indexed(self._source_index, key))
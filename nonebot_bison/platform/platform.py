@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
+import asyncio
 from collections import defaultdict
 from collections.abc import Awaitable, Callable, Collection
 from dataclasses import dataclass
+import functools
 import json
 import ssl
 import time
@@ -13,10 +15,16 @@ from httpx import AsyncClient
 from nonebot.log import logger
 from nonebot_plugin_saa import PlatformTarget
 
+from nonebot_bison.metrics import group_member_request_counter, group_member_request_time_histogram
 from nonebot_bison.plugin_config import plugin_config
 from nonebot_bison.post import Post
 from nonebot_bison.types import Category, RawPost, SubUnit, Tag, Target
-from nonebot_bison.utils import ProcessContext, Site
+from nonebot_bison.utils import ProcessContext, Site, bounded_gather, chunked_gather
+from nonebot_bison.utils.circuit_breaker import (
+    get_host_circuit_breaker,
+    get_site_circuit_breaker,
+    is_circuit_breaker_enabled,
+)
 
 
 class CategoryNotSupport(Exception):
@@ -52,6 +60,8 @@ async def catch_network_error(func: Callable[P, Awaitable[R]], *args: P.args, **
     try:
         return await func(*args, **kwargs)
     except httpx.RequestError as err:
+        if is_circuit_breaker_enabled():
+            get_host_circuit_breaker(err.request.url.host).record_failure()
         if plugin_config.bison_show_network_warning:
             logger.warning(f"network connection error: {type(err)}, url: {err.request.url}")
         return None
@@ -94,6 +104,12 @@ class Platform(metaclass=PlatformABCMeta, base=True):
     registry: list[type["Platform"]]
     reverse_category: dict[str, Category]
     use_batch: bool = False
+    batch_chunk_size: int | None = None
+    """批量接口单次请求的最大 target 数量，None 表示不分块"""
+    batch_chunk_concurrency: int = 1
+    """批量接口分块后同时进行的最大请求数"""
+    batch_handle_concurrency: int = 4
+    """批量接口返回后同时处理（解析、分发）的最大 target 数"""
     # TODO: 限定可使用的theme名称
     default_theme: str = "basic"
 
@@ -104,19 +120,34 @@ class Platform(metaclass=PlatformABCMeta, base=True):
     @abstractmethod
     async def fetch_new_post(self, sub_unit: SubUnit) -> list[tuple[PlatformTarget, list[Post]]]: ...
 
+    async def _catch_site_network_error(
+        self, func: Callable[P, Awaitable[R]], *args: P.args, **kwargs: P.kwargs
+    ) -> R | None:
+        res = await catch_network_error(func, *args, **kwargs)
+        if is_circuit_breaker_enabled():
+            site_breaker = get_site_circuit_breaker(self.site.name)
+            # 抓取函数总是返回列表，返回 None 说明出现了网络错误
+            if res is None:
+                site_breaker.record_failure()
+            else:
+                site_breaker.record_success()
+        return res
+
     async def do_fetch_new_post(self, sub_unit: SubUnit) -> list[tuple[PlatformTarget, list[Post]]]:
-        return await catch_network_error(self.fetch_new_post, sub_unit) or []
+        return await self._catch_site_network_error(self.fetch_new_post, sub_unit) or []
 
     @abstractmethod
-    async def batch_fetch_new_post(self, sub_units: list[SubUnit]) -> list[tuple[PlatformTarget, list[Post]]]: ...
+    async def batch_fetch_new_post(
+        self, sub_units: list[SubUnit]
+    ) -> list[tuple[PlatformTarget, list[Post]]] | None: ...
 
     async def do_batch_fetch_new_post(self, sub_units: list[SubUnit]) -> list[tuple[PlatformTarget, list[Post]]]:
-        return await catch_network_error(self.batch_fetch_new_post, sub_units) or []
+        return await self._catch_site_network_error(self.batch_fetch_new_post, sub_units) or []
 
     @abstractmethod
     async def parse(self, raw_post: RawPost) -> Post: ...
 
-    async def do_parse(self, raw_post: RawPost) -> Post:
+    async def do_parse(self, raw_post: RawPost, parse_cache: dict[Any, Post] | None = None) -> Post:
         "actually function called"
         return await self.parse(raw_post)
 
@@ -124,6 +155,10 @@ class Platform(metaclass=PlatformABCMeta, base=True):
         super().__init__()
         self.ctx = context
 
+    def set_context(self, context: ProcessContext):
+        "Inject the context of current fetch into a long-lived platform instance"
+        self.ctx = context
+
     class ParseTargetException(Exception):
         def __init__(self, *args: object, prompt: str | None = None) -> None:
             super().__init__(*args)
@@ -206,11 +241,13 @@ class Platform(metaclass=PlatformABCMeta, base=True):
         self, new_posts: list[RawPost], sub_unit: SubUnit
     ) -> list[tuple[PlatformTarget, list[Post]]]:
         res: list[tuple[PlatformTarget, list[Post]]] = []
+        # 解析缓存只在本次分发内有效，同一平台实例上并发处理多个 target 时互不影响
+        parse_cache: dict[Any, Post] = {}
         for user, cats, required_tags in sub_unit.user_sub_infos:
             user_raw_post = await self.filter_user_custom(new_posts, cats, required_tags)
             user_post: list[Post] = []
             for raw_post in user_raw_post:
-                user_post.append(await self.do_parse(raw_post))
+                user_post.append(await self.do_parse(raw_post, parse_cache))
             res.append((user, user_post))
         return res
 
@@ -223,27 +260,25 @@ class Platform(metaclass=PlatformABCMeta, base=True):
 class MessageProcess(Platform, abstract=True):
     "General message process fetch, parse, filter progress"
 
-    def __init__(self, ctx: ProcessContext):
-        super().__init__(ctx)
-        self.parse_cache: dict[Any, Post] = {}
-
     @abstractmethod
     def get_id(self, post: RawPost) -> Any:
         "Get post id of given RawPost"
 
-    async def do_parse(self, raw_post: RawPost) -> Post:
+    async def do_parse(self, raw_post: RawPost, parse_cache: dict[Any, Post] | None = None) -> Post:
         post_id = self.get_id(raw_post)
-        if post_id not in self.parse_cache:
+        if parse_cache is None:
+            parse_cache = {}
+        if post_id not in parse_cache:
             retry_times = 3
             while retry_times:
                 try:
-                    self.parse_cache[post_id] = await self.parse(raw_post)
+                    parse_cache[post_id] = await self.parse(raw_post)
                     break
                 except Exception as err:
                     retry_times -= 1
                     if not retry_times:
                         raise err
-        return self.parse_cache[post_id]
+        return parse_cache[post_id]
 
     @abstractmethod
     async def get_sub_list(self, target: Target) -> list[RawPost]:
@@ -259,17 +294,17 @@ class MessageProcess(Platform, abstract=True):
     def get_date(self, post: RawPost) -> int | None:
         "Get post timestamp and return, return None if can't get the time"
 
+    def is_outdated(self, post_time: int | None) -> bool:
+        "Whether a post published at post_time is too old to be pushed"
+        return bool(post_time and time.time() - post_time > 2 * 60 * 60 and plugin_config.bison_init_filter)
+
     async def filter_common(self, raw_post_list: list[RawPost]) -> list[RawPost]:
         res = []
         for raw_post in raw_post_list:
             # post_id = self.get_id(raw_post)
             # if post_id in exists_posts_set:
             #     continue
-            if (
-                (post_time := self.get_date(raw_post))
-                and time.time() - post_time > 2 * 60 * 60
-                and plugin_config.bison_init_filter
-            ):
+            if self.is_outdated(self.get_date(raw_post)):
                 continue
             try:
                 self.get_category(raw_post)
@@ -335,22 +370,36 @@ class NewMessage(MessageProcess, abstract=True):
                         self.get_id(post),
                     )
                 )
-        res = await self.dispatch_user_post(new_posts, sub_unit)
-        self.parse_cache = {}
-        return res
+        return await self.dispatch_user_post(new_posts, sub_unit)
 
     async def fetch_new_post(self, sub_unit: SubUnit) -> list[tuple[PlatformTarget, list[Post]]]:
         post_list = await self.get_sub_list(sub_unit.sub_target)
         return await self._handle_new_post(post_list, sub_unit)
 
-    async def batch_fetch_new_post(self, sub_units: list[SubUnit]) -> list[tuple[PlatformTarget, list[Post]]]:
+    async def batch_fetch_new_post(self, sub_units: list[SubUnit]) -> list[tuple[PlatformTarget, list[Post]]] | None:
         if not self.has_target:
             raise RuntimeError("Target without target should not use batch api")  # pragma: no cover
-        posts_set = await self.batch_get_sub_list([x[0] for x in sub_units])
-        res = []
-        for sub_unit, posts in zip(sub_units, posts_set):
-            res.extend(await self._handle_new_post(posts, sub_unit))
-        return res
+        # 每个分块的错误单独处理，只跳过该分块；全部分块网络错误时返回 None，由调用方记为网络错误
+        chunk_results = await chunked_gather(
+            functools.partial(catch_network_error, self._batch_get_sub_list_of_units),
+            sub_units,
+            chunk_size=self.batch_chunk_size,
+            concurrency=self.batch_chunk_concurrency,
+        )
+        if chunk_results is None:
+            return None
+        handled = await bounded_gather(
+            (
+                self._handle_new_post(posts, sub_unit)
+                for chunk, posts_set in chunk_results
+                for sub_unit, posts in zip(chunk, posts_set)
+            ),
+            self.batch_handle_concurrency,
+        )
+        return [item for target_res in handled for item in target_res]
+
+    async def _batch_get_sub_list_of_units(self, sub_units: list[SubUnit]) -> list[list[RawPost]]:
+        return await self.batch_get_sub_list([x[0] for x in sub_units])
 
 
 class StatusChange(Platform, abstract=True):
@@ -363,7 +412,8 @@ class StatusChange(Platform, abstract=True):
     async def get_status(self, target: Target) -> Any: ...
 
     @abstractmethod
-    async def batch_get_status(self, targets: list[Target]) -> list[Any]: ...
+    async def batch_get_status(self, targets: list[Target]) -> list[Any]:
+        "Get status of the given targets, the status of a failed target can be None"
 
     @abstractmethod
     def compare_status(self, target: Target, old_status, new_status) -> list[RawPost]: ...
@@ -398,14 +448,31 @@ class StatusChange(Platform, abstract=True):
             raise
         return await self._handle_status_change(new_status, sub_unit)
 
-    async def batch_fetch_new_post(self, sub_units: list[SubUnit]) -> list[tuple[PlatformTarget, list[Post]]]:
+    async def batch_fetch_new_post(self, sub_units: list[SubUnit]) -> list[tuple[PlatformTarget, list[Post]]] | None:
         if not self.has_target:
             raise RuntimeError("Target without target should not use batch api")  # pragma: no cover
-        new_statuses = await self.batch_get_status([x[0] for x in sub_units])
-        res = []
-        for sub_unit, new_status in zip(sub_units, new_statuses):
-            res.extend(await self._handle_status_change(new_status, sub_unit))
-        return res
+        chunk_results = await chunked_gather(
+            functools.partial(catch_network_error, self._batch_get_status_of_units),
+            sub_units,
+            chunk_size=self.batch_chunk_size,
+            concurrency=self.batch_chunk_concurrency,
+        )
+        if chunk_results is None:
+            return None
+        handled = await bounded_gather(
+            (
+                self._handle_status_change(new_status, sub_unit)
+                for chunk, new_statuses in chunk_results
+                for sub_unit, new_status in zip(chunk, new_statuses)
+                # 批量接口中单个 target 获取失败时返回 None，本次跳过该 target
+                if new_status is not None
+            ),
+            self.batch_handle_concurrency,
+        )
+        return [item for target_res in handled for item in target_res]
+
+    async def _batch_get_status_of_units(self, sub_units: list[SubUnit]) -> list[Any]:
+        return await self.batch_get_status([x[0] for x in sub_units])
 
 
 class SimplePost(NewMessage, abstract=True):
@@ -427,9 +494,7 @@ class SimplePost(NewMessage, abstract=True):
                         self.get_id(post),
                     )
                 )
-        res = await self.dispatch_user_post(post_list, sub_unit)
-        self.parse_cache = {}
-        return res
+        return await self.dispatch_user_post(post_list, sub_unit)
 
 
 def make_no_target_group(platform_list: list[type[Platform]]) -> type[Platform]:
@@ -468,6 +533,11 @@ def make_no_target_group(platform_list: list[type[Platform]]) -> type[Platform]:
         for platform_class in self.platform_list:
             self.platform_obj_list.append(platform_class(ctx))
 
+    def set_context(self: "NoTargetGroup", ctx: ProcessContext):
+        Platform.set_context(self, ctx)
+        for platform in self.platform_obj_list:
+            platform.set_context(ctx)
+
     def __str__(self: "NoTargetGroup") -> str:
         return "[" + " ".join(x.name for x in self.platform_list) + "]"
 
@@ -475,12 +545,45 @@ def make_no_target_group(platform_list: list[type[Platform]]) -> type[Platform]:
     async def get_target_name(cls, client: AsyncClient, target: Target):
         return await platform_list[0].get_target_name(client, target)
 
+    async def fetch_member_new_post(self: "NoTargetGroup", platform: Platform, sub_unit: SubUnit):
+        member = type(platform).__name__
+        success_flag = False
+        try:
+            with group_member_request_time_histogram.labels(platform_name=self.platform_name, member=member).time():
+                # 网络错误与单个平台相同经 catch_network_error 处理，返回 None
+                res = await catch_network_error(platform.fetch_new_post, sub_unit)
+            success_flag = res is not None
+            return res
+        finally:
+            group_member_request_counter.labels(
+                platform_name=self.platform_name, member=member, success=success_flag
+            ).inc()
+
     async def fetch_new_post(self: "NoTargetGroup", sub_unit: SubUnit):
+        # 并发请求各个成员，单个成员失败不影响其他成员的推送
+        # 全部成员失败时，有其他异常则抛出第一个异常，只有网络错误则返回 None，与单个平台的网络错误相同
+        member_results = await asyncio.gather(
+            *(fetch_member_new_post(self, platform, sub_unit) for platform in self.platform_obj_list),
+            return_exceptions=True,
+        )
         res = defaultdict(list)
-        for platform in self.platform_obj_list:
-            platform_res = await platform.fetch_new_post(sub_unit)
+        errors: list[tuple[Platform, BaseException]] = []
+        succeeded = False
+        for platform, platform_res in zip(self.platform_obj_list, member_results):
+            if platform_res is None:
+                continue
+            if isinstance(platform_res, BaseException):
+                errors.append((platform, platform_res))
+                continue
+            succeeded = True
             for user, posts in platform_res:
                 res[user].extend(posts)
+        if not succeeded:
+            if errors:
+                raise errors[0][1]
+            return None
+        for platform, err in errors:
+            logger.opt(exception=err).warning(f"fetching {platform.name}-{type(platform).__name__} error")
         return [[key, val] for key, val in res.items()]
 
     return type(
@@ -497,6 +600,7 @@ def make_no_target_group(platform_list: list[type[Platform]]) -> type[Platform]:
             "has_target": False,
             "enable_tag": False,
             "__init__": __init__,
+            "set_context": set_context,
             "get_target_name": get_target_name,
             "fetch_new_post": fetch_new_post,
         },
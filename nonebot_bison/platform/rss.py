@@ -1,18 +1,31 @@
 import calendar
+from collections.abc import Callable
+from datetime import timedelta
+import html
+from io import BytesIO
+import re
 import time
 from typing import Any, ClassVar
 
 from bs4 import BeautifulSoup as bs
+from expiringdictx import ExpiringDict
 import feedparser
 from httpx import AsyncClient
+from lxml import etree
+from nonebot.log import logger
 
 from nonebot_bison.post import Post
 from nonebot_bison.types import Category, RawPost, Target
-from nonebot_bison.utils import text_similarity
+from nonebot_bison.utils import ProcessContext, fast_text_similarity
 from nonebot_bison.utils.site import CookieClientManager, Site
 
 from .platform import NewMessage
 
+_ATOM_NS = "{http://www.w3.org/2005/Atom}"
+_ENTRY_TAGS = ("item", f"{_ATOM_NS}entry")
+_ID_TAGS = ("guid", f"{_ATOM_NS}id")
+_HTML_TAG_PATTERN = re.compile(r"<[^>]*>")
+
 
 class RssSite(Site):
     name = "rss"
@@ -47,6 +60,18 @@ class Rss(NewMessage):
     site = RssSite
     has_target = True
 
+    incremental_parse = True
+    """已初始化的 target 使用流式解析，只解析新条目"""
+    incremental_stop_run = 5
+    """流式解析时连续遇到多少条已见过的条目后停止"""
+    incremental_seen_limit = 1000
+    """每个 target 最多记录多少条上次抓取到的条目 id"""
+
+    def __init__(self, ctx: ProcessContext):
+        super().__init__(ctx)
+        # 上次抓取到的全部条目 id（按文档顺序），包括因过旧被过滤、不在 exists_posts 中的条目
+        self._fetched_ids = ExpiringDict[Target, list[str]](capacity=4096, default_age=timedelta(days=1))
+
     @classmethod
     async def get_target_name(cls, client: AsyncClient, target: Target) -> str | None:
         res = await client.get(target, timeout=10.0)
@@ -67,15 +92,89 @@ class Rss(NewMessage):
     async def get_sub_list(self, target: Target) -> list[RawPost]:
         client = await self.ctx.get_client(target)
         res = await client.get(target, timeout=10.0)
-        feed = feedparser.parse(res)
-        entries = feed.entries
-        for entry in entries:
+        parsed = None
+        store = self.get_stored_data(target)
+        if self.incremental_parse and store and store.inited:
+            fetched_ids = set(self._fetched_ids.get(target) or ())
+            parsed = self._incremental_parse(
+                target, res.content, lambda entry_id: entry_id in fetched_ids or entry_id in store.exists_posts
+            )
+        if parsed is None:
+            feed = feedparser.parse(res)
+            self._record_fetched_ids(target, [entry.id for entry in feed.entries if entry.get("id")])
+        else:
+            feed, scanned_ids = parsed
+            self._record_fetched_ids(target, scanned_ids)
+        for entry in feed.entries:
             entry["_target_name"] = feed.feed.title
         return feed.entries
 
+    def _record_fetched_ids(self, target: Target, ids: list[str]):
+        """记录本次扫描到的条目 id，增量解析提前停止时补上上次记录中未扫描到的部分"""
+        merged = dict.fromkeys(ids)
+        for entry_id in self._fetched_ids.get(target) or ():
+            if len(merged) >= self.incremental_seen_limit:
+                break
+            merged.setdefault(entry_id)
+        self._fetched_ids[target] = list(merged)[: self.incremental_seen_limit]
+
+    def _incremental_parse(
+        self, target: Target, content: bytes, is_seen: Callable[[str], bool]
+    ) -> tuple[feedparser.FeedParserDict, list[str]] | None:
+        """按文档顺序流式扫描条目 id，遇到连续 incremental_stop_run 条已见过的条目后停止，
+        只把新条目交给 feedparser 解析，返回 (解析结果, 扫描到的条目 id)；无法增量解析时返回 None"""
+        root = None
+        new_entries = []
+        scanned_ids: list[str] = []
+        stale_run = 0
+        try:
+            for event, elem in etree.iterparse(
+                BytesIO(content), events=("start", "end"), resolve_entities=False, no_network=True
+            ):
+                if event == "start":
+                    if root is None:
+                        root = elem
+                    continue
+                if elem.tag not in _ENTRY_TAGS:
+                    continue
+                entry_id = next((text.strip() for tag in _ID_TAGS if (text := elem.findtext(tag))), None)
+                if not entry_id:
+                    # 没有 id 的条目无法判断是否已见过
+                    return None
+                scanned_ids.append(entry_id)
+                if is_seen(entry_id):
+                    stale_run += 1
+                    if stale_run >= self.incremental_stop_run:
+                        break
+                else:
+                    new_entries.append(elem)
+                    stale_run = 0
+        except etree.XMLSyntaxError:
+            return None
+        if root is None or not scanned_ids:
+            # 没有可识别的条目（如 RSS 1.0、Atom 0.3），交给 feedparser 完整解析
+            return None
+        if not new_entries:
+            return feedparser.FeedParserDict(entries=[], feed=feedparser.FeedParserDict()), scanned_ids
+        # iterparse 会预读，树中可能还有未产生事件的条目，一并移除
+        new_entry_set = set(new_entries)
+        for elem in list(root.iter(*_ENTRY_TAGS)):
+            if elem not in new_entry_set:
+                elem.getparent().remove(elem)
+        feed = feedparser.parse(BytesIO(etree.tostring(root, encoding="utf-8", xml_declaration=True)))
+        if "title" not in feed.feed or len(feed.entries) != len(new_entries):
+            return None
+        logger.trace(f"rss {target} 增量解析 {len(new_entries)} 条新条目")
+        return feed, scanned_ids
+
     def _text_process(self, title: str, desc: str) -> tuple[str | None, str]:
         """检查标题和描述是否相似，如果相似则标题为None, 否则返回标题和描述"""
-        similarity = 1.0 if len(title) == 0 or len(desc) == 0 else text_similarity(title, desc)
+        if len(title) == 0 or len(desc) == 0:
+            similarity = 1.0
+        elif plain_desc := html.unescape(_HTML_TAG_PATTERN.sub("", desc)).strip():
+            similarity = fast_text_similarity(title, plain_desc, score_cutoff=0.8)
+        else:
+            similarity = 0.0
         if similarity > 0.8:
             return None, title if len(title) > len(desc) else desc
 
@@ -7,6 +7,7 @@ from yarl import URL
 global_config = nonebot.get_driver().config
 PlatformName = str
 ThemeName = str
+SiteName = str
 
 
 class PlugConfig(BaseModel):
@@ -41,7 +42,36 @@ class PlugConfig(BaseModel):
         description="默认UA",
     )
     bison_show_network_warning: bool = True
+    bison_host_rate_limit: dict[str, float] = Field(
+        default={},
+        description="按域名限制每秒请求数，所有站点共享，子域名与其共享同一限额，形如 {domain: rate}，默认不限制",
+    )
+    bison_circuit_breaker_threshold: int = Field(
+        default=5, description="同一站点或域名连续出现多少次网络错误后熔断，0 为不启用熔断"
+    )
+    bison_circuit_breaker_recovery_timeout: float = Field(default=60, description="熔断后经过多少秒放行一次探测请求")
     bison_platform_theme: dict[PlatformName, ThemeName] = {}
+    bison_park_undeliverable_targets: bool = Field(
+        default=True, description="暂停抓取没有已连接 Bot 能送达任何订阅者的 target，直到有 Bot 连接"
+    )
+    bison_schedule_interval_bounds: dict[SiteName, tuple[float, float]] = Field(
+        default={}, description="为站点指定自适应调度间隔的上下限（秒），形如 {site_name: [min, max]}"
+    )
+    bison_shard_enable: bool = Field(
+        default=False, description="启用分片调度，多个进程共用同一个数据库时按分区分摊抓取任务"
+    )
+    bison_shard_node_id: str = Field(default="", description="分片调度模式下本进程的标识，为空时自动生成")
+    bison_shard_partitions: int = Field(default=64, description="分片调度的分区数，所有进程必须一致")
+    bison_shard_lease_ttl: float = Field(default=30, description="分片调度的租约有效期（秒），心跳间隔为其三分之一")
+    bison_shard_target_sync_interval: float = Field(
+        default=300, description="分片调度模式下从数据库同步其他进程增删的 target 的间隔（秒）"
+    )
+    bison_target_name_cache_ttl: float = Field(
+        default=600, description="查询 target 名称结果的缓存时间（秒），0 为不缓存"
+    )
+    bison_target_name_refresh_interval: float = Field(
+        default=24, description="后台刷新已订阅 target 名称的间隔（小时），0 为不刷新"
+    )
 
     @property
     def outer_url(self) -> URL:
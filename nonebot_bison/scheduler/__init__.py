@@ -1,3 +1,17 @@
-from .manager import handle_delete_target, handle_insert_new_target, init_scheduler, scheduler_dict
+from .manager import (
+    handle_delete_target,
+    handle_delete_targets,
+    handle_insert_new_target,
+    handle_insert_new_targets,
+    init_scheduler,
+    scheduler_dict,
+)
 
-__all__ = ["handle_delete_target", "handle_insert_new_target", "init_scheduler", "scheduler_dict"]
+__all__ = [
+    "handle_delete_target",
+    "handle_delete_targets",
+    "handle_insert_new_target",
+    "handle_insert_new_targets",
+    "init_scheduler",
+    "scheduler_dict",
+]
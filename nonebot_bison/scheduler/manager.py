@@ -1,6 +1,8 @@
+from collections import defaultdict
 from typing import cast
 
 from nonebot.log import logger
+from nonebot_plugin_apscheduler import scheduler as aps_scheduler
 
 from nonebot_bison.config import config
 from nonebot_bison.config.db_model import Target
@@ -11,11 +13,14 @@ from nonebot_bison.utils import Site
 from nonebot_bison.utils.site import CookieClientManager, is_cookie_client_manager
 
 from .scheduler import Scheduler
+from .shard import ShardManager, default_node_id, get_shard_manager, set_shard_manager
 
 scheduler_dict: dict[type[Site], Scheduler] = {}
 
 
 async def init_scheduler():
+    if plugin_config.bison_shard_enable:
+        await init_shard_manager()
     _schedule_class_dict: dict[type[Site], list[Target]] = {}
     _schedule_class_platform_dict: dict[type[Site], list[str]] = {}
     for platform in platform_manager.values():
@@ -49,7 +54,51 @@ async def init_scheduler():
             client_mgr = cast(CookieClientManager, scheduler_dict[site].client_mgr)
             await client_mgr.refresh_client()
     config.register_add_target_hook(handle_insert_new_target)
+    config.register_add_targets_hook(handle_insert_new_targets)
     config.register_delete_target_hook(handle_delete_target)
+    config.register_delete_targets_hook(handle_delete_targets)
+
+
+async def init_shard_manager():
+    if not (shard_manager := get_shard_manager()):
+        shard_manager = ShardManager(
+            plugin_config.bison_shard_node_id or default_node_id(),
+            plugin_config.bison_shard_partitions,
+            plugin_config.bison_shard_lease_ttl,
+        )
+        set_shard_manager(shard_manager)
+        logger.info(f"shard scheduler enabled, node id: {shard_manager.node_id}")
+    await shard_manager.heartbeat()
+    aps_scheduler.add_job(
+        shard_heartbeat,
+        "interval",
+        seconds=plugin_config.bison_shard_lease_ttl / 3,
+        id="bison_shard_heartbeat",
+        replace_existing=True,
+    )
+    aps_scheduler.add_job(
+        shard_sync_targets,
+        "interval",
+        seconds=plugin_config.bison_shard_target_sync_interval,
+        id="bison_shard_sync_targets",
+        replace_existing=True,
+    )
+
+
+async def shard_heartbeat():
+    if not (shard_manager := get_shard_manager()):
+        return
+    await shard_manager.heartbeat()
+
+
+async def shard_sync_targets():
+    """其他进程增删的订阅不会触发本进程的 hook，需要定期从数据库同步"""
+    if not get_shard_manager():
+        return
+    for scheduler in scheduler_dict.values():
+        for platform_name in scheduler.platform_name_list:
+            targets = await config.get_platform_target(platform_name)
+            scheduler.sync_schedulables(platform_name, [T_Target(target.target) for target in targets])
 
 
 async def handle_insert_new_target(platform_name: str, target: T_Target):
@@ -58,9 +107,31 @@ async def handle_insert_new_target(platform_name: str, target: T_Target):
     scheduler_obj.insert_new_schedulable(platform_name, target)
 
 
+async def handle_insert_new_targets(targets: list[tuple[str, T_Target]]):
+    site_targets: dict[type[Site], list[tuple[str, T_Target]]] = defaultdict(list)
+    for platform_name, target in targets:
+        if platform_name not in platform_manager:
+            continue
+        site_targets[platform_manager[platform_name].site].append((platform_name, target))
+    for site, new_targets in site_targets.items():
+        if scheduler_obj := scheduler_dict.get(site):
+            scheduler_obj.insert_new_schedulables(new_targets)
+
+
 async def handle_delete_target(platform_name: str, target: T_Target):
     if platform_name not in platform_manager:
         return
     platform = platform_manager[platform_name]
     scheduler_obj = scheduler_dict[platform.site]
     scheduler_obj.delete_schedulable(platform_name, target)
+
+
+async def handle_delete_targets(targets: list[tuple[str, T_Target]]):
+    site_targets: dict[type[Site], list[tuple[str, T_Target]]] = defaultdict(list)
+    for platform_name, target in targets:
+        if platform_name not in platform_manager:
+            continue
+        site_targets[platform_manager[platform_name].site].append((platform_name, target))
+    for site, deleted_targets in site_targets.items():
+        if scheduler_obj := scheduler_dict.get(site):
+            scheduler_obj.delete_schedulables(deleted_targets)
@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from nonebot_bison.metrics import schedule_interval_gauge
+from nonebot_bison.plugin_config import plugin_config
+from nonebot_bison.utils import Site
+
+
+class AIMDRateController:
+    """根据上游的限流信号调整站点的调度间隔
+
+    请求正常时请求频率加性增加（每次增加基准频率的 increase_ratio 倍），
+    遇到 429、-352、ApiError 等限流信号时调度间隔乘以 backoff_factor，
+    调度间隔始终限制在 [min_interval, max_interval] 之间
+    """
+
+    increase_ratio: float = 0.1
+    backoff_factor: float = 2.0
+
+    def __init__(self, site_name: str, base_interval: float, min_interval: float, max_interval: float):
+        if not 0 < min_interval <= max_interval:
+            raise ValueError(f"invalid interval bounds of {site_name}: [{min_interval}, {max_interval}]")
+        self.site_name = site_name
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min(max(base_interval, min_interval), max_interval)
+        self._update_gauge()
+
+    @classmethod
+    def from_site(cls, site: type[Site]) -> "AIMDRateController | None":
+        """只有 interval 类型的站点可以调整调度间隔"""
+        if site.schedule_type != "interval":
+            return None
+        base_interval = timedelta(**site.schedule_setting).total_seconds()
+        min_interval, max_interval = plugin_config.bison_schedule_interval_bounds.get(
+            site.name,
+            (
+                site.schedule_min_interval or base_interval,
+                site.schedule_max_interval or base_interval * 8,
+            ),
+        )
+        return cls(site.name, base_interval, min_interval, max_interval)
+
+    def _update_gauge(self):
+        schedule_interval_gauge.labels(site_name=self.site_name).set(self.interval)
+
+    def _set_interval(self, interval: float) -> bool:
+        interval = min(max(interval, self.min_interval), self.max_interval)
+        changed = interval != self.interval
+        self.interval = interval
+        self._update_gauge()
+        return changed
+
+    def on_success(self) -> bool:
+        """请求正常，返回调度间隔是否发生变化"""
+        rate = 1 / self.interval + self.increase_ratio / self.base_interval
+        return self._set_interval(1 / rate)
+
+    def on_throttled(self) -> bool:
+        """上游限流，返回调度间隔是否发生变化"""
+        return self._set_interval(self.interval * self.backoff_factor)
@@ -1,5 +1,8 @@
 from collections import defaultdict
 from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import time
+import zlib
 
 from nonebot.log import logger
 from nonebot_plugin_apscheduler import scheduler
@@ -7,12 +10,21 @@ from nonebot_plugin_saa.utils.exceptions import NoBotFound
 
 from nonebot_bison.config import config
 from nonebot_bison.metrics import render_time_histogram, request_counter, request_time_histogram, sent_counter
-from nonebot_bison.platform import platform_manager
+from nonebot_bison.platform import Platform, platform_manager
+from nonebot_bison.plugin_config import plugin_config
 from nonebot_bison.send import send_msgs
-from nonebot_bison.types import SubUnit, Target
+from nonebot_bison.types import ApiError, SubUnit, Target, UserSubInfo
 from nonebot_bison.utils import ClientManager, ProcessContext, Site
+from nonebot_bison.utils.circuit_breaker import get_site_circuit_breaker, is_circuit_breaker_enabled
+from nonebot_bison.utils.get_bot import is_reachable
 from nonebot_bison.utils.site import SkipRequestException
 
+from .rate_control import AIMDRateController
+from .shard import owns_target
+
+PARK_RECHECK_INTERVAL = 600
+"""停放的 target 最长停放时间（秒）"""
+
 
 @dataclass
 class Schedulable:
@@ -26,6 +38,8 @@ class Scheduler:
     schedulable_list: list[Schedulable]  # for load weigth from db
     batch_api_target_cache: dict[str, dict[Target, list[Target]]]  # platform_name -> (target -> [target])
     batch_platform_name_targets_cache: dict[str, list[Target]]
+    platform_obj_cache: dict[str, Platform]  # platform_name -> platform instance
+    parked_targets: dict[tuple[str, Target], float]  # (platform_name, target) -> 停放截止时间
     client_mgr: ClientManager
 
     def __init__(
@@ -41,6 +55,8 @@ class Scheduler:
         self.scheduler_config = scheduler_config
         self.client_mgr = scheduler_config.client_mgr()
         self.scheduler_config_obj = self.scheduler_config()
+        self.platform_obj_cache = {}
+        self.parked_targets = {}
 
         self.schedulable_list = []
         self.batch_platform_name_targets_cache = defaultdict(list)
@@ -58,12 +74,32 @@ class Scheduler:
             f"register scheduler for {self.name} with "
             f"{self.scheduler_config.schedule_type} {self.scheduler_config.schedule_setting}"
         )
-        scheduler.add_job(
+        self.rate_controller = AIMDRateController.from_site(self.scheduler_config)
+        self.job = scheduler.add_job(
             self.exec_fetch,
             self.scheduler_config.schedule_type,
             **self.scheduler_config.schedule_setting,
+            **self._get_stagger_kwargs(),
         )
 
+    def _get_stagger_kwargs(self, interval: float | None = None) -> dict:
+        """错开各站点任务的首次执行时间并加入随机抖动，避免不同间隔的任务周期性地同时触发
+
+        interval 为调整后的间隔秒数，默认使用站点配置的间隔
+        """
+        kwargs = {}
+        if jitter := self.scheduler_config.schedule_jitter:
+            kwargs["jitter"] = jitter
+        if self.scheduler_config.schedule_type == "interval":
+            if interval is None:
+                interval = timedelta(**self.scheduler_config.schedule_setting).total_seconds()
+            offset = self.scheduler_config.schedule_offset
+            if offset is None:
+                # 由站点名得到固定的相位，重启后各站点的相对相位不变
+                offset = zlib.crc32(self.name.encode()) / 0xFFFFFFFF * interval
+            kwargs["start_date"] = datetime.now(timezone.utc) + timedelta(seconds=offset)
+        return kwargs
+
     def _refresh_batch_api_target_cache(self):
         self.batch_api_target_cache = defaultdict(dict)
         for platform_name, targets in self.batch_platform_name_targets_cache.items():
@@ -78,44 +114,120 @@ class Scheduler:
         self.pre_weight_val = 0
         cur_max_schedulable = None
         for schedulable in self.schedulable_list:
+            if not owns_target(schedulable.platform_name, schedulable.target) or self._is_parked(
+                schedulable.platform_name, schedulable.target
+            ):
+                continue
             schedulable.current_weight += cur_weight[f"{schedulable.platform_name}-{schedulable.target}"]
             weight_sum += cur_weight[f"{schedulable.platform_name}-{schedulable.target}"]
             if not cur_max_schedulable or cur_max_schedulable.current_weight < schedulable.current_weight:
                 cur_max_schedulable = schedulable
-        assert cur_max_schedulable
+        if not cur_max_schedulable:
+            return None
         cur_max_schedulable.current_weight -= weight_sum
         return cur_max_schedulable
 
+    def _is_parked(self, platform_name: str, target: Target) -> bool:
+        if (parked_until := self.parked_targets.get((platform_name, target))) is None:
+            return False
+        if time.monotonic() >= parked_until:
+            del self.parked_targets[(platform_name, target)]
+            return False
+        return True
+
+    def _check_deliverable(self, platform_name: str, target: Target, user_sub_infos: list[UserSubInfo]) -> bool:
+        """没有已连接的 Bot 能送达任何订阅者时停放该 target，直到有 Bot 连接"""
+        if not plugin_config.bison_park_undeliverable_targets:
+            return True
+        if any(is_reachable(user_sub_info.user) for user_sub_info in user_sub_infos):
+            return True
+        logger.info(f"no connected bot can reach subscribers of [{platform_name}]{target}, park it")
+        # 兜底定期重新检查，避免错过 Bot 连接事件后永远停放
+        self.parked_targets[(platform_name, target)] = time.monotonic() + PARK_RECHECK_INTERVAL
+        return False
+
+    def unpark_all(self):
+        if self.parked_targets:
+            logger.info(f"unpark {len(self.parked_targets)} targets of scheduler {self.name}")
+        self.parked_targets.clear()
+
     async def exec_fetch(self):
+        if is_circuit_breaker_enabled() and not get_site_circuit_breaker(self.name).allow_request():
+            logger.trace(f"scheduler {self.name} skipped: circuit breaker is open")
+            return
         if not (schedulable := await self.get_next_schedulable()):
             return
         logger.trace(f"scheduler {self.name} fetching next target: [{schedulable.platform_name}]{schedulable.target}")
 
         context = ProcessContext(self.client_mgr)
+        success_flag = False
         try:
             await self._run_schedulable_fetch(context, schedulable)
+            success_flag = True
+        except ApiError:
+            context.mark_throttled()
+            raise
         finally:
+            self._adjust_interval(context.throttled, success_flag)
             await context.cleanup()
 
+    def _adjust_interval(self, throttled: bool, success: bool):
+        if not self.rate_controller:
+            return
+        if throttled:
+            changed = self.rate_controller.on_throttled()
+        elif success:
+            changed = self.rate_controller.on_success()
+        else:
+            return
+        if changed:
+            logger.debug(f"scheduler {self.name} reschedule with interval {self.rate_controller.interval:.2f}s")
+            interval = self.rate_controller.interval
+            # 保留按站点名得到的相位和抖动，避免调整间隔后各站点重新对齐
+            self.job.reschedule("interval", seconds=interval, **self._get_stagger_kwargs(interval))
+
+    def _get_platform_obj(self, platform_name: str, context: ProcessContext) -> Platform:
+        """复用平台实例以保留跨轮次的缓存，每次抓取只替换 ProcessContext"""
+        if platform_obj := self.platform_obj_cache.get(platform_name):
+            platform_obj.set_context(context)
+        else:
+            platform_obj = platform_manager[platform_name](context)
+            self.platform_obj_cache[platform_name] = platform_obj
+        return platform_obj
+
     async def _run_schedulable_fetch(self, context: ProcessContext, schedulable: Schedulable) -> None:
         success_flag = False
-        platform_obj = platform_manager[schedulable.platform_name](context)
+        platform_obj = self._get_platform_obj(schedulable.platform_name, context)
         to_send = None
+        # 停放或无法送达的 target 不发起请求，也不计入请求指标
+        if schedulable.use_batch:
+            batch_targets = self.batch_api_target_cache[schedulable.platform_name][schedulable.target]
+            sub_units = []
+            for batch_target in batch_targets:
+                if not owns_target(schedulable.platform_name, batch_target) or self._is_parked(
+                    schedulable.platform_name, batch_target
+                ):
+                    continue
+                userinfo = await config.get_platform_target_subscribers(schedulable.platform_name, batch_target)
+                if self._check_deliverable(schedulable.platform_name, batch_target, userinfo):
+                    sub_units.append(SubUnit(batch_target, userinfo))
+            if not sub_units:
+                logger.debug("skip request: all targets in batch are undeliverable")
+                return
+        else:
+            send_userinfo_list = await config.get_platform_target_subscribers(
+                schedulable.platform_name, schedulable.target
+            )
+            if not self._check_deliverable(schedulable.platform_name, schedulable.target, send_userinfo_list):
+                logger.debug(f"skip request: target {schedulable.target} is undeliverable")
+                return
         try:
             with request_time_histogram.labels(
                 platform_name=schedulable.platform_name, site_name=platform_obj.site.name
             ).time():
                 if schedulable.use_batch:
-                    batch_targets = self.batch_api_target_cache[schedulable.platform_name][schedulable.target]
-                    sub_units = []
-                    for batch_target in batch_targets:
-                        userinfo = await config.get_platform_target_subscribers(schedulable.platform_name, batch_target)
-                        sub_units.append(SubUnit(batch_target, userinfo))
                     to_send = await platform_obj.do_batch_fetch_new_post(sub_units)
                 else:
-                    send_userinfo_list = await config.get_platform_target_subscribers(
-                        schedulable.platform_name, schedulable.target
-                    )
                     to_send = await platform_obj.do_fetch_new_post(SubUnit(schedulable.target, send_userinfo_list))
                 success_flag = True
         except SkipRequestException as err:
@@ -155,28 +267,49 @@ class Scheduler:
                         logger.warning("no bot connected")
 
     def insert_new_schedulable(self, platform_name: str, target: Target):
-        self.pre_weight_val += 1000
-        new_schedulable = Schedulable(platform_name, target, 1000, platform_manager[platform_name].use_batch)
+        self.insert_new_schedulables([(platform_name, target)])
 
-        if new_schedulable.use_batch:
-            self.batch_platform_name_targets_cache[platform_name].append(target)
+    def insert_new_schedulables(self, targets: list[tuple[str, Target]]):
+        """批量插入 [(platform_name, target)]，只刷新一次批量接口的 target 缓存"""
+        refresh_batch_cache = False
+        for platform_name, target in targets:
+            self.pre_weight_val += 1000
+            new_schedulable = Schedulable(platform_name, target, 1000, platform_manager[platform_name].use_batch)
+            if new_schedulable.use_batch:
+                self.batch_platform_name_targets_cache[platform_name].append(target)
+                refresh_batch_cache = True
+            self.schedulable_list.append(new_schedulable)
+            logger.info(f"insert [{platform_name}]{target} to Schduler({self.scheduler_config.name})")
+        if refresh_batch_cache:
             self._refresh_batch_api_target_cache()
 
-        self.schedulable_list.append(new_schedulable)
-        logger.info(f"insert [{platform_name}]{target} to Schduler({self.scheduler_config.name})")
+    def sync_schedulables(self, platform_name: str, targets: list[Target]):
+        """与数据库中的 target 同步，用于分片调度时感知其他进程增删的订阅"""
+        current_targets = {s.target for s in self.schedulable_list if s.platform_name == platform_name}
+        for target in set(targets) - current_targets:
+            self.insert_new_schedulable(platform_name, target)
+        for target in current_targets - set(targets):
+            self.delete_schedulable(platform_name, target)
 
     def delete_schedulable(self, platform_name, target: Target):
-        if platform_manager[platform_name].use_batch:
-            self.batch_platform_name_targets_cache[platform_name].remove(target)
+        self.delete_schedulables([(platform_name, target)])
+
+    def delete_schedulables(self, targets: list[tuple[str, Target]]):
+        """批量删除 [(platform_name, target)]，只遍历一次调度列表并刷新一次批量接口的 target 缓存"""
+        refresh_batch_cache = False
+        for platform_name, target in targets:
+            if platform_manager[platform_name].use_batch:
+                self.batch_platform_name_targets_cache[platform_name].remove(target)
+                refresh_batch_cache = True
+        if refresh_batch_cache:
             self._refresh_batch_api_target_cache()
 
-        if not self.schedulable_list:
-            return
-        to_find_idx = None
-        for idx, schedulable in enumerate(self.schedulable_list):
-            if schedulable.platform_name == platform_name and schedulable.target == target:
-                to_find_idx = idx
-                break
-        if to_find_idx is not None:
-            deleted_schdulable = self.schedulable_list.pop(to_find_idx)
-            self.pre_weight_val -= deleted_schdulable.current_weight
+        to_delete = set(targets)
+        remained_schedulables = []
+        for schedulable in self.schedulable_list:
+            if (key := (schedulable.platform_name, schedulable.target)) in to_delete:
+                to_delete.remove(key)
+                self.pre_weight_val -= schedulable.current_weight
+            else:
+                remained_schedulables.append(schedulable)
+        self.schedulable_list[:] = remained_schedulables
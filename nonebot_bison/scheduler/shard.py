@@ -0,0 +1,173 @@
+import bisect
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+import hashlib
+import os
+import socket
+import time
+import uuid
+
+from nonebot.log import logger
+from nonebot_plugin_datastore import create_session
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from nonebot_bison.config.db_model import SchedulerNode, ShardLease
+from nonebot_bison.metrics import shard_owned_partitions_gauge
+from nonebot_bison.types import Target
+
+
+def _stable_hash(key: str) -> int:
+    # 内置的 hash 对 str 加了随机盐，不同进程的结果不一致
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+def get_partition(platform_name: str, target: Target, partition_count: int) -> int:
+    return _stable_hash(f"{platform_name}:{target}") % partition_count
+
+
+class HashRing:
+    """一致性哈希环，每个节点对应 replicas 个虚拟节点，增减节点时只有少量分区改变归属"""
+
+    def __init__(self, nodes: Iterable[str], replicas: int = 64):
+        self._ring = sorted((_stable_hash(f"{node}#{i}"), node) for node in nodes for i in range(replicas))
+        self._keys = [key for key, _ in self._ring]
+
+    def get_node(self, key: str) -> str | None:
+        if not self._ring:
+            return None
+        idx = bisect.bisect(self._keys, _stable_hash(key)) % len(self._ring)
+        return self._ring[idx][1]
+
+
+def _utcnow() -> datetime:
+    # 数据库中保存不带时区的 UTC 时间
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def default_node_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+class ShardManager:
+    """分片调度
+
+    各进程在数据库中注册并定期心跳，按一致性哈希把 partition_count 个分区分配给存活的进程，
+    进程只抓取持有租约的分区内的 target。
+    分配变化时原持有者先释放租约，新持有者在租约释放或到期后才接管，因此同一分区不会被两个进程同时抓取
+    """
+
+    def __init__(self, node_id: str, partition_count: int, lease_ttl: float):
+        if partition_count <= 0:
+            raise ValueError("partition_count must be positive")
+        self.node_id = node_id
+        self.partition_count = partition_count
+        self.lease_ttl = lease_ttl
+        self.owned_partitions: set[int] = set()
+        # 本地记录的租约有效期，心跳失败时到期后停止抓取，避免与接管的进程重复抓取
+        self._lease_valid_until = 0.0
+
+    def owns(self, platform_name: str, target: Target) -> bool:
+        if time.monotonic() >= self._lease_valid_until:
+            return False
+        return get_partition(platform_name, target, self.partition_count) in self.owned_partitions
+
+    def _get_desired_partitions(self, live_nodes: Iterable[str]) -> set[int]:
+        ring = HashRing(live_nodes)
+        return {p for p in range(self.partition_count) if ring.get_node(f"partition-{p}") == self.node_id}
+
+    async def _renew_partitions(self, sess: AsyncSession, desired: set[int], expires_at: datetime) -> set[int]:
+        # 释放不再分配给本进程的分区
+        await sess.execute(
+            delete(ShardLease).where(ShardLease.owner == self.node_id, ShardLease.partition.not_in(desired))
+        )
+        await sess.execute(update(ShardLease).where(ShardLease.owner == self.node_id).values(expires_at=expires_at))
+        return set((await sess.scalars(select(ShardLease.partition).where(ShardLease.owner == self.node_id))).all())
+
+    async def _claim_partitions(
+        self, sess: AsyncSession, partitions: set[int], now: datetime, expires_at: datetime
+    ) -> set[int]:
+        leased = set((await sess.scalars(select(ShardLease.partition))).all())
+        owned = set()
+        for partition in partitions:
+            if partition not in leased:
+                await sess.execute(
+                    insert(ShardLease).values(partition=partition, owner=self.node_id, expires_at=expires_at)
+                )
+                owned.add(partition)
+                continue
+            # 接管已到期的租约；其他进程持有的有效租约需等待其释放
+            res = await sess.execute(
+                update(ShardLease)
+                .where(ShardLease.partition == partition, ShardLease.expires_at < now)
+                .values(owner=self.node_id, expires_at=expires_at)
+            )
+            if res.rowcount:  # type: ignore
+                owned.add(partition)
+        return owned
+
+    async def heartbeat(self) -> bool:
+        """续约并按当前存活的进程重新分配分区，返回持有的分区是否发生变化"""
+        valid_until = time.monotonic() + self.lease_ttl
+        now = _utcnow()
+        expires_at = now + timedelta(seconds=self.lease_ttl)
+        async with create_session() as sess:
+            await sess.merge(SchedulerNode(id=self.node_id, heartbeat_at=now))
+            # 清理心跳超时的进程，它们持有的租约到期后由其他进程接管
+            await sess.execute(
+                delete(SchedulerNode).where(SchedulerNode.heartbeat_at < now - timedelta(seconds=self.lease_ttl))
+            )
+            live_nodes = (await sess.scalars(select(SchedulerNode.id))).all()
+            desired = self._get_desired_partitions(live_nodes)
+            owned = await self._renew_partitions(sess, desired, expires_at)
+            await sess.commit()
+
+        # 续约已单独提交，占用新分区失败时不影响已持有的租约
+        if claimable := desired - owned:
+            async with create_session() as sess:
+                try:
+                    owned |= await self._claim_partitions(sess, claimable, now, expires_at)
+                    await sess.commit()
+                except IntegrityError:
+                    # 其他进程同时占用了空闲分区，下次心跳时重试
+                    await sess.rollback()
+                    logger.debug(f"shard node {self.node_id} lost the race of claiming partitions, retry later")
+
+        changed = owned != self.owned_partitions
+        if changed:
+            logger.info(
+                f"shard node {self.node_id} owns {len(owned)}/{self.partition_count} partitions "
+                f"with {len(live_nodes)} live nodes"
+            )
+        self.owned_partitions = owned
+        self._lease_valid_until = valid_until
+        shard_owned_partitions_gauge.set(len(owned))
+        return changed
+
+    async def leave(self):
+        """注销本进程并释放所有租约，其他进程在下次心跳时接管"""
+        self.owned_partitions = set()
+        self._lease_valid_until = 0.0
+        shard_owned_partitions_gauge.set(0)
+        async with create_session() as sess:
+            await sess.execute(delete(ShardLease).where(ShardLease.owner == self.node_id))
+            await sess.execute(delete(SchedulerNode).where(SchedulerNode.id == self.node_id))
+            await sess.commit()
+
+
+_shard_manager: ShardManager | None = None
+
+
+def get_shard_manager() -> ShardManager | None:
+    return _shard_manager
+
+
+def set_shard_manager(shard_manager: ShardManager | None):
+    global _shard_manager
+    _shard_manager = shard_manager
+
+
+def owns_target(platform_name: str, target: Target) -> bool:
+    """未启用分片调度时本进程抓取所有 target"""
+    return _shard_manager is None or _shard_manager.owns(platform_name, target)
@@ -1,19 +1,28 @@
-from collections.abc import Callable, Coroutine
+from collections.abc import AsyncIterator, Callable, Coroutine
+from dataclasses import asdict
 from functools import partial, wraps
 import importlib
 import json
 from pathlib import Path
+import textwrap
 import time
 from types import ModuleType
 from typing import Any, TypeVar
 
+from anyio import AsyncFile, open_file
 from anyio import Path as AIOPath
-from anyio import open_file
 from nonebot.compat import model_dump
 from nonebot.log import logger
-
-from nonebot_bison.config.subs_io import subscribes_export, subscribes_import
-from nonebot_bison.config.subs_io.nbesf_model import v1, v2, v3
+from pydantic import BaseModel
+
+from nonebot_bison.config.subs_io import iter_cookies, iter_sub_packs
+from nonebot_bison.config.subs_io.nbesf_model import v3
+from nonebot_bison.config.subs_io.stream import (
+    ImportProgress,
+    iter_json_items,
+    iter_yaml_items,
+    subscribes_import_stream,
+)
 from nonebot_bison.scheduler.manager import init_scheduler
 
 try:
@@ -70,6 +79,51 @@ def path_init(ctx, param, value):
     return export_path
 
 
+async def _write_json_list(f: AsyncFile[str], key: str, items: AsyncIterator[BaseModel]):
+    await f.write(f'\n    "{key}": [')
+    empty = True
+    async for item in items:
+        await f.write("\n" if empty else ",\n")
+        empty = False
+        item_json = json.dumps(model_dump(item), ensure_ascii=False, indent=4)
+        await f.write(textwrap.indent(item_json, " " * 8))
+    await f.write("]" if empty else "\n    ]")
+
+
+async def write_json_stream(f: AsyncFile[str]):
+    """逐条写入 NBESF JSON，输出与 json.dumps(..., indent=4) 一次性导出的结果一致"""
+    await f.write(f'{{\n    "version": {v3.NBESF_VERSION},')
+    await _write_json_list(f, "groups", iter_sub_packs(lambda x: x))
+    await f.write(",")
+    await _write_json_list(f, "cookies", iter_cookies())
+    await f.write("\n}")
+
+
+async def _write_yaml_list(f: AsyncFile[str], pyyaml: ModuleType, key: str, items: AsyncIterator[BaseModel]):
+    empty = True
+    async for item in items:
+        if empty:
+            await f.write(f"{key}:\n")
+            empty = False
+        # 由于 nbesf v2 中的user_target使用了AllSupportedPlatformTarget, 因此不能使用safe_dump
+        # 下文引自 https://pyyaml.org/wiki/PyYAMLDocumentation
+        # safe_dump(data, stream=None) serializes the given Python object into the stream.
+        # If stream is None, it returns the produced stream.
+        # safe_dump produces only standard YAML tags and cannot represent an arbitrary Python object.
+        # 进行以下曲线救国方案
+        yaml_data = json.loads(json.dumps(model_dump(item), ensure_ascii=False))
+        await f.write(pyyaml.safe_dump([yaml_data], sort_keys=False))
+    if empty:
+        await f.write(f"{key}: []\n")
+
+
+async def write_yaml_stream(f: AsyncFile[str], pyyaml: ModuleType):
+    """逐条写入 NBESF YAML，输出与 safe_dump 一次性导出的结果一致"""
+    await f.write(pyyaml.safe_dump({"version": v3.NBESF_VERSION}, sort_keys=False))
+    await _write_yaml_list(f, pyyaml, "groups", iter_sub_packs(lambda x: x))
+    await _write_yaml_list(f, pyyaml, "cookies", iter_cookies())
+
+
 @cli.command(help="导出Nonebot Bison Exchangable Subcribes File", name="export")
 @click.option("--path", "-p", default=None, callback=path_init, help="导出路径,  如果不指定，则默认为工作目录")
 @click.option(
@@ -85,30 +139,16 @@ async def subs_export(path: Path, format: str):
     export_file = path / f"bison_subscribes_export_{int(time.time())}.{format}"
     assert not export_file.exists()
 
-    logger.info("正在获取订阅信息...")
-    export_data: v3.SubGroup = await subscribes_export(lambda x: x)
-
+    logger.info("正在导出订阅信息...")
     async with await open_file(export_file, "w", encoding="utf-8") as f:
         match format:
             case "yaml" | "yml":
                 logger.info("正在导出为yaml...")
-
-                pyyaml = import_yaml_module()
-                # 由于 nbesf v2 中的user_target使用了AllSupportedPlatformTarget, 因此不能使用safe_dump
-                # 下文引自 https://pyyaml.org/wiki/PyYAMLDocumentation
-                # safe_dump(data, stream=None) serializes the given Python object into the stream.
-                # If stream is None, it returns the produced stream.
-                # safe_dump produces only standard YAML tags and cannot represent an arbitrary Python object.
-                # 进行以下曲线救国方案
-                json_data = json.dumps(model_dump(export_data), ensure_ascii=False)
-                yaml_data = pyyaml.safe_load(json_data)
-                output = pyyaml.safe_dump(yaml_data, sort_keys=False)
-                await f.write(output)
+                await write_yaml_stream(f, import_yaml_module())
 
             case "json":
                 logger.info("正在导出为json...")
-                json_data = json.dumps(model_dump(export_data), ensure_ascii=False, indent=4)
-                await f.write(json_data)
+                await write_json_stream(f)
 
             case _:
                 raise click.BadParameter(message=f"不支持的导出格式: {format}")
@@ -116,6 +156,14 @@ async def subs_export(path: Path, format: str):
         logger.success(f"导出完毕！已导出到 {path} ")
 
 
+def _load_import_progress(progress_file: Path) -> ImportProgress:
+    try:
+        return ImportProgress(**json.loads(progress_file.read_text(encoding="utf-8")))
+    except (OSError, ValueError, TypeError):
+        logger.warning(f"无法读取导入进度文件 {progress_file}，将从头开始导入")
+        return ImportProgress()
+
+
 @cli.command(help="从Nonebot Biosn Exchangable Subscribes File导入订阅", name="import")
 @click.option("--path", "-p", required=True, help="导入文件名")
 @click.option(
@@ -124,43 +172,55 @@ async def subs_export(path: Path, format: str):
     type=click.Choice(["json", "yaml", "yml"]),
     help="指定导入格式[json, yaml]，默认为 json",
 )
+@click.option(
+    "--batch-size",
+    default=100,
+    type=click.IntRange(min=1),
+    help="每个事务写入的订阅组或 Cookie 数量，默认为 100",
+)
+@click.option("--resume", is_flag=True, default=False, help="从上次中断时保存的进度继续导入")
 @run_async
-async def subs_import(path: str, format: str):
+async def subs_import(path: str, format: str, batch_size: int, resume: bool):
     await init_scheduler()
 
-    import_file_path = AIOPath(path)
-    assert await import_file_path.is_file(), "该路径不是文件！"
+    import_file_path = Path(path)
+    assert import_file_path.is_file(), "该路径不是文件！"
+    progress_file = import_file_path.with_name(f"{import_file_path.name}.progress")
+
+    progress = ImportProgress()
+    if progress_file.exists():
+        if resume:
+            progress = _load_import_progress(progress_file)
+            logger.info(f"从上次的进度继续导入：已导入 {progress.groups} 个订阅组，{progress.cookies} 个 Cookie")
+        else:
+            logger.warning(f"存在上次中断的导入进度 {progress_file}，未指定 --resume，将从头开始导入")
 
-    async with await open_file(import_file_path, "r", encoding="utf-8") as f:
+    async def save_progress(progress: ImportProgress):
+        await AIOPath(progress_file).write_text(json.dumps(asdict(progress)), encoding="utf-8")
+
+    # 流式解析器按块同步读取文件，命令行中不会阻塞其他任务
+    with import_file_path.open(encoding="utf-8") as f:  # noqa: ASYNC230
         match format:
             case "yaml" | "yml":
                 logger.info("正在从yaml导入...")
-
-                pyyaml = import_yaml_module()
-                import_items = pyyaml.safe_load(await f.read())
+                import_items = iter_yaml_items(f, import_yaml_module())
 
             case "json":
                 logger.info("正在从json导入...")
-
-                import_items = json.loads(await f.read())
+                import_items = iter_json_items(f)
 
             case _:
                 raise click.BadParameter(message=f"不支持的导入格式: {format}")
 
-        assert isinstance(import_items, dict)
-        ver = int(import_items.get("version", 0))
-        logger.info(f"NBESF版本: {ver}")
-        match ver:
-            case 1:
-                nbesf_data = v1.nbesf_parser(import_items)
-            case 2:
-                nbesf_data = v2.nbesf_parser(import_items)
-            case 3:
-                nbesf_data = v3.nbesf_parser(import_items)
-            case _:
-                raise NotImplementedError("不支持的NBESF版本")
+        try:
+            progress = await subscribes_import_stream(import_items, batch_size, progress, save_progress)
+        except Exception:
+            if progress_file.exists():
+                logger.error(f"导入中断，已导入的进度保存在 {progress_file}，修复问题后可使用 --resume 继续导入")
+            raise
 
-        await subscribes_import(nbesf_data)
+    progress_file.unlink(missing_ok=True)
+    logger.success(f"导入完毕！共导入 {progress.groups} 个订阅组，{progress.cookies} 个 Cookie")
 
 
 def main():
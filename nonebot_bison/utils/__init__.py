@@ -1,4 +1,5 @@
 import difflib
+import math
 import re
 import sys
 from typing import Any, ClassVar
@@ -8,9 +9,12 @@ import nonebot
 from nonebot.log import default_format, logger
 from nonebot.plugin import require
 from nonebot_plugin_saa import Image, MessageSegmentFactory, Text
+from rapidfuzz.distance import LCSseq
 
 from nonebot_bison.plugin_config import plugin_config
 
+from .batch import bounded_gather as bounded_gather
+from .batch import chunked_gather as chunked_gather
 from .context import ProcessContext as ProcessContext
 from .http import http_client as http_client
 from .image import capture_html as capture_html
@@ -103,6 +107,21 @@ def text_similarity(str1: str, str2: str) -> float:
     return t / min(len(str1), len(str2))
 
 
+def fast_text_similarity(str1: str, str2: str, *, max_len: int = 1024, score_cutoff: float = 0.0) -> float:
+    """text_similarity 的线性时间版本，返回0到1.0的相似度
+
+    较长的字符串只取前缀参与比较，长度不超过较短字符串的两倍且不超过 max_len，
+    相似度使用 rapidfuzz 的位并行最长公共子序列计算，低于 score_cutoff 时提前返回 0
+    """
+    if len(str1) == 0 or len(str2) == 0:
+        raise ValueError("The length of string can not be 0")
+    shorter_len = min(len(str1), len(str2), max_len)
+    window = min(shorter_len * 2, max_len)
+    str1, str2 = str1[:window], str2[:window]
+    cutoff = math.ceil(score_cutoff * shorter_len) if score_cutoff else None
+    return LCSseq.similarity(str1, str2, score_cutoff=cutoff) / shorter_len
+
+
 def decode_unicode_escapes(s: str):
     """解码 \\r, \\n, \\t, \\uXXXX 等转义序列"""
 
@@ -0,0 +1,70 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from typing import TypeVar
+
+from nonebot.log import logger
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def chunked(items: Sequence[T], chunk_size: int | None) -> list[list[T]]:
+    """将 items 按 chunk_size 切分，chunk_size 为 None 时不切分"""
+    if not items:
+        return []
+    if chunk_size is None:
+        return [list(items)]
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    return [list(items[i : i + chunk_size]) for i in range(0, len(items), chunk_size)]
+
+
+async def bounded_gather(aws: Iterable[Awaitable[R]], concurrency: int) -> list[R]:
+    """并发执行 aws，同时最多执行 concurrency 个，结果顺序与传入顺序一致"""
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def run(aw: Awaitable[R]) -> R:
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(run(aw) for aw in aws))
+
+
+async def chunked_gather(
+    func: Callable[[list[T]], Awaitable[list[R] | None]],
+    items: Sequence[T],
+    *,
+    chunk_size: int | None = None,
+    concurrency: int = 1,
+) -> list[tuple[list[T], list[R]]] | None:
+    """将 items 分块调用批量接口 func，同时最多进行 concurrency 个分块请求
+
+    func 需返回与传入分块一一对应的结果列表，返回 None 表示该分块请求失败（如经 catch_network_error 处理的网络错误）。
+    func 抛出的其他异常只影响所在分块，记录日志后跳过该分块。
+    返回成功的 (分块, 结果) 列表，顺序与分块顺序一致；全部分块失败时，若有分块抛出异常则重新抛出，否则返回 None
+    """
+    chunks = chunked(items, chunk_size)
+    errors: list[Exception] = []
+
+    async def run_chunk(chunk: list[T]) -> list[R] | None:
+        try:
+            return await func(chunk)
+        except Exception as e:
+            logger.opt(exception=e).warning(f"批量请求分块失败，跳过该分块: {chunk}")
+            errors.append(e)
+            return None
+
+    results = await bounded_gather((run_chunk(chunk) for chunk in chunks), concurrency)
+
+    succeeded: list[tuple[list[T], list[R]]] = []
+    for chunk, res in zip(chunks, results):
+        if res is None:
+            continue
+        if len(res) != len(chunk):
+            raise ValueError(f"batch result length {len(res)} mismatch with chunk length {len(chunk)}")
+        succeeded.append((chunk, res))
+    if chunks and not succeeded:
+        if errors:
+            raise errors[-1]
+        return None
+    return succeeded
@@ -0,0 +1,94 @@
+from enum import IntEnum
+import time
+
+from nonebot.log import logger
+
+from nonebot_bison.metrics import circuit_breaker_state_gauge
+from nonebot_bison.plugin_config import plugin_config
+
+
+class CircuitState(IntEnum):
+    # 数值即 bison_circuit_breaker_state 指标的取值
+    CLOSED = 0
+    OPEN = 1
+    HALF_OPEN = 2
+
+
+class CircuitBreaker:
+    """网络错误熔断器
+
+    连续 failure_threshold 次网络错误后熔断（OPEN），熔断期间的请求直接跳过；
+    经过 recovery_timeout 秒后进入半开（HALF_OPEN）状态，放行一次探测请求，
+    探测成功则恢复（CLOSED），失败则重新熔断。
+    探测请求若没有返回结果，下一个 recovery_timeout 后会再次放行探测请求。
+    """
+
+    def __init__(self, key: str, failure_threshold: int, recovery_timeout: float):
+        self.key = key
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = CircuitState.CLOSED
+        self.failure_count = 0
+        self.last_transition_time = 0.0
+        self._update_gauge()
+
+    def _update_gauge(self):
+        circuit_breaker_state_gauge.labels(key=self.key).set(self.state.value)
+
+    def _transit(self, state: CircuitState):
+        if state != self.state:
+            logger.info(f"circuit breaker {self.key}: {self.state.name} -> {state.name}")
+        self.state = state
+        self.last_transition_time = time.monotonic()
+        self._update_gauge()
+
+    def allow_request(self) -> bool:
+        if self.state == CircuitState.CLOSED:
+            return True
+        if time.monotonic() - self.last_transition_time < self.recovery_timeout:
+            return False
+        # OPEN 超时，或 HALF_OPEN 的探测请求迟迟没有结果，放行一次探测请求
+        self._transit(CircuitState.HALF_OPEN)
+        return True
+
+    def record_success(self):
+        self.failure_count = 0
+        if self.state != CircuitState.CLOSED:
+            self._transit(CircuitState.CLOSED)
+
+    def record_failure(self):
+        self.failure_count += 1
+        if self.state == CircuitState.HALF_OPEN or (
+            self.state == CircuitState.CLOSED and self.failure_count >= self.failure_threshold
+        ):
+            self._transit(CircuitState.OPEN)
+
+
+_circuit_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(key: str) -> CircuitBreaker:
+    if key not in _circuit_breakers:
+        _circuit_breakers[key] = CircuitBreaker(
+            key,
+            failure_threshold=plugin_config.bison_circuit_breaker_threshold,
+            recovery_timeout=plugin_config.bison_circuit_breaker_recovery_timeout,
+        )
+    return _circuit_breakers[key]
+
+
+def get_site_circuit_breaker(site_name: str) -> CircuitBreaker:
+    return get_circuit_breaker(f"site:{site_name}")
+
+
+def get_host_circuit_breaker(host: str) -> CircuitBreaker:
+    return get_circuit_breaker(f"host:{host}")
+
+
+def reset_circuit_breakers():
+    """清除所有熔断器状态，已获取的熔断器不再生效"""
+    _circuit_breakers.clear()
+
+
+def is_circuit_breaker_enabled() -> bool:
+    return plugin_config.bison_circuit_breaker_threshold > 0
@@ -1,14 +1,16 @@
 from base64 import b64encode
 
-from httpx import AsyncClient, Response
+from httpx import AsyncClient, Request, Response
 
 from nonebot_bison.types import Target
 
-from .site import ClientManager
+from .circuit_breaker import get_host_circuit_breaker, is_circuit_breaker_enabled
+from .site import ClientManager, SkipRequestException
 
 
 class ProcessContext:
     reqs: list[Response]
+    throttled: bool
     _client_mgr: ClientManager
     _clients: list[AsyncClient]
     _client: AsyncClient | None
@@ -16,21 +18,39 @@ class ProcessContext:
 
     def __init__(self, client_mgr: ClientManager) -> None:
         self.reqs = []
+        self.throttled = False
         self._client_mgr = client_mgr
         self._clients = []
         self._client = None
         self._static_client = None
 
+    @property
+    def client_mgr(self) -> ClientManager:
+        return self._client_mgr
+
     def _log_response(self, resp: Response):
         self.reqs.append(resp)
+        if resp.status_code == 429:
+            self.mark_throttled()
+
+    def mark_throttled(self):
+        """标记本次抓取遇到了上游限流"""
+        self.throttled = True
 
     def _register_to_client(self, client: AsyncClient):
         async def _log_to_ctx(r: Response):
             self._log_response(r)
+            if is_circuit_breaker_enabled():
+                get_host_circuit_breaker(r.request.url.host).record_success()
+
+        async def _check_circuit_breaker(r: Request):
+            if is_circuit_breaker_enabled() and not get_host_circuit_breaker(r.url.host).allow_request():
+                raise SkipRequestException(f"circuit breaker of host {r.url.host} is open")
 
-        existing_hooks = client.event_hooks["response"]
+        existing_hooks = client.event_hooks
         hooks = {
-            "response": [*existing_hooks, _log_to_ctx],
+            "request": [*existing_hooks["request"], _check_circuit_breaker],
+            "response": [*existing_hooks["response"], _log_to_ctx],
         }
         client.event_hooks = hooks
 
@@ -7,6 +7,8 @@ import nonebot
 from nonebot.adapters import Bot
 from nonebot.adapters.onebot.v11 import Bot as Ob11Bot
 from nonebot_plugin_saa import PlatformTarget
+from nonebot_plugin_saa.auto_select_bot import get_bot
+from nonebot_plugin_saa.utils.exceptions import NoBotFound
 
 GROUP: dict[int, list[Bot]] = {}
 USER: dict[int, list[Bot]] = {}
@@ -32,3 +34,15 @@ async def get_groups() -> list[dict[str, Any]]:
         all_groups.update({group["group_id"]: group for group in groups if group["group_id"] not in all_groups})
 
     return list(all_groups.values())
+
+
+def is_reachable(target: PlatformTarget) -> bool:
+    """是否有已连接的 Bot 可以向 target 发送消息"""
+    try:
+        get_bot(target)
+    except NoBotFound:
+        return False
+    except NotImplementedError:
+        # 自动选择 Bot 不支持的 target 无法判断，视为可达
+        return True
+    return True
@@ -2,6 +2,8 @@ import httpx
 
 from nonebot_bison.plugin_config import plugin_config
 
+from .rate_limit import limit_host_rate
+
 http_args = {
     "proxy": plugin_config.bison_proxy or None,
 }
@@ -15,4 +17,9 @@ def http_client(*args, **kwargs):
         kwargs["headers"] = new_headers
     else:
         kwargs["headers"] = http_headers
+    event_hooks = kwargs.get("event_hooks") or {}
+    kwargs["event_hooks"] = {
+        "request": [limit_host_rate, *event_hooks.get("request", [])],
+        "response": [*event_hooks.get("response", [])],
+    }
     return httpx.AsyncClient(*args, **kwargs, **http_args)
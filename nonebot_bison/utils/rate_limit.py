@@ -0,0 +1,66 @@
+import asyncio
+import math
+import time
+
+import httpx
+
+from nonebot_bison.metrics import rate_limit_wait_histogram
+from nonebot_bison.plugin_config import plugin_config
+
+
+class TokenBucket:
+    """令牌桶，允许令牌数为负数以便按到达顺序预约令牌，因此无需加锁"""
+
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def reserve(self) -> float:
+        """预约一个令牌，返回需要等待的秒数"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        self.tokens -= 1
+        return 0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    async def acquire(self) -> float:
+        if (wait_time := self.reserve()) > 0:
+            await asyncio.sleep(wait_time)
+        return wait_time
+
+
+_host_buckets: dict[str, TokenBucket] = {}
+
+
+def _get_limit_domain(host: str) -> str | None:
+    """返回 host 所属的已配置限流域名，子域名与其共享同一个令牌桶"""
+    for domain in plugin_config.bison_host_rate_limit:
+        if host == domain or host.endswith(f".{domain}"):
+            return domain
+    return None
+
+
+def get_host_bucket(host: str) -> TokenBucket | None:
+    if not (domain := _get_limit_domain(host)):
+        return None
+    if domain not in _host_buckets:
+        rate = plugin_config.bison_host_rate_limit[domain]
+        _host_buckets[domain] = TokenBucket(rate, capacity=max(1, math.ceil(rate)))
+    return _host_buckets[domain]
+
+
+def reset_host_buckets():
+    """清除所有域名的令牌桶，下次请求时按当前配置重新创建"""
+    _host_buckets.clear()
+
+
+async def limit_host_rate(request: httpx.Request):
+    """httpx 请求钩子，所有 client 对同一域名共享令牌桶"""
+    if not (bucket := get_host_bucket(request.url.host)):
+        return
+    wait_time = await bucket.acquire()
+    rate_limit_wait_histogram.labels(domain=_get_limit_domain(request.url.host)).observe(wait_time)
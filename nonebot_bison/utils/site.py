@@ -151,7 +151,10 @@ class CookieClientManager(ClientManager):
         if cookie:
             cookies.update(cookie_dict)
         client.cookies = cookies
-        client.event_hooks = {"response": [self._generate_hook(cookie)]}
+        client.event_hooks = {
+            "request": client.event_hooks["request"],
+            "response": [self._generate_hook(cookie)],
+        }
         return client
 
     @classmethod
@@ -201,6 +204,14 @@ class Site(metaclass=SiteMeta):
     name: str
     client_mgr: type[ClientManager] = DefaultClientManager
     require_browser: bool = False
+    schedule_offset: float | None = None
+    """interval 类型任务首次执行前的延迟（秒），None 表示由站点名计算出 [0, 间隔) 内的固定值"""
+    schedule_jitter: float | None = None
+    """每次执行时间的随机抖动上限（秒），None 表示不抖动"""
+    schedule_min_interval: float | None = None
+    """自适应调度的最小间隔（秒），None 表示不快于 schedule_setting，仅对 interval 类型生效"""
+    schedule_max_interval: float | None = None
+    """自适应调度的最大间隔（秒），None 表示 schedule_setting 的 8 倍，仅对 interval 类型生效"""
     registry: list[type["Site"]]
 
     def __str__(self):
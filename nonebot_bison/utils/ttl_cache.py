@@ -0,0 +1,74 @@
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+import time
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class SingleFlightTTLCache(Generic[K, V]):
+    """带有效期的 LRU 缓存，同一个 key 同时只有一个加载请求，其他调用者等待并共享其结果
+
+    结果为 None 时视为未找到，使用 negative_ttl 作为有效期；加载抛出的异常不会被缓存
+    """
+
+    def __init__(self, ttl: float, negative_ttl: float | None = None, maxsize: int = 1024):
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.maxsize = maxsize
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._inflight: dict[K, asyncio.Task[V]] = {}
+
+    def get(self, key: K) -> tuple[bool, V | None]:
+        """返回 (是否命中, 值)，过期的条目视为未命中"""
+        if (entry := self._entries.get(key)) is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: K, value: V):
+        ttl = self.negative_ttl if value is None else self.ttl
+        if ttl <= 0:
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: K):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    async def get_or_load(self, key: K, loader: Callable[[], Awaitable[V]], use_cache: bool = True) -> V:
+        """命中缓存时直接返回，否则调用 loader 加载并写入缓存
+
+        use_cache 为 False 时跳过缓存读取，但仍与进行中的加载请求合并
+        """
+        if use_cache:
+            hit, value = self.get(key)
+            if hit:
+                return value  # type: ignore
+        if (task := self._inflight.get(key)) is None:
+            task = asyncio.create_task(self._load(key, loader))
+            # 所有调用者都被取消时，避免出现未获取异常的警告
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[key] = task
+        # 单个调用者被取消时不取消共享的加载请求
+        return await asyncio.shield(task)
+
+    async def _load(self, key: K, loader: Callable[[], Awaitable[V]]) -> V:
+        try:
+            value = await loader()
+            self.set(key, value)
+            return value
+        finally:
+            del self._inflight[key]
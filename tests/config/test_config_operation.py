@@ -150,3 +150,101 @@ async def test_del_subsribe(init_scheduler):
         target = await sess.scalar(select(Target))
         assert target
         assert target.target_name == "weibo_name_new"
+
+
+async def test_list_subscribe_of_users(init_scheduler):
+    from nonebot_plugin_datastore.db import get_engine
+    from nonebot_plugin_saa import TargetQQGroup
+    from sqlalchemy import event
+
+    from nonebot_bison.config.db_config import config
+    from nonebot_bison.config.utils import get_user_key
+    from nonebot_bison.types import Target as TTarget
+
+    for group_id in (1, 2, 3):
+        await config.add_subscribe(TargetQQGroup(group_id=group_id), TTarget("weibo_id"), "weibo_name", "weibo", [], [])
+    await config.add_subscribe(TargetQQGroup(group_id=1), TTarget("bili_id"), "bili_name", "bilibili", [], [])
+
+    users = [TargetQQGroup(group_id=group_id) for group_id in (1, 2, 4)]
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = get_engine().sync_engine
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        res = await config.list_subscribe_of_users(users)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert len([statement for statement in statements if statement.lstrip().startswith("SELECT")]) == 1
+    assert set(res) == {get_user_key(users[0]), get_user_key(users[1])}
+    assert {sub.target.target for sub in res[get_user_key(users[0])]} == {"weibo_id", "bili_id"}
+    assert [sub.target.target_name for sub in res[get_user_key(users[1])]] == ["weibo_name"]
+
+    res = await config.list_subscribe_of_users(users, platform_name="bilibili")
+    assert set(res) == {get_user_key(users[0])}
+    assert [sub.target.target for sub in res[get_user_key(users[0])]] == ["bili_id"]
+
+
+async def test_bulk_modify_subscribe(init_scheduler, mocker):
+    from nonebot_plugin_saa import TargetQQGroup
+
+    from nonebot_bison.config.db_config import SubscribeDupException, config
+    from nonebot_bison.config.subs_io.nbesf_model.base import SubReceipt
+    from nonebot_bison.config.utils import NoSuchSubscribeException
+    from nonebot_bison.types import Target as TTarget
+
+    for group_id in (1, 2, 3):
+        await config.add_subscribe(TargetQQGroup(group_id=group_id), TTarget("old_id"), "old_name", "weibo", [], [])
+    await config.add_subscribe(TargetQQGroup(group_id=3), TTarget("kept_id"), "kept_name", "weibo", [], [])
+    add_targets_hook = mocker.AsyncMock()
+    delete_targets_hook = mocker.AsyncMock()
+    mocker.patch.object(config, "add_targets_hook", [add_targets_hook])
+    mocker.patch.object(config, "delete_targets_hook", [delete_targets_hook])
+
+    def receipt(group_id: int, target: str, target_name: str, cats: list[int]) -> SubReceipt:
+        return SubReceipt(
+            user=TargetQQGroup(group_id=group_id),
+            target=target,
+            target_name=target_name,
+            platform_name="weibo",
+            cats=cats,
+            tags=[],
+        )
+
+    # 把所有群组从 old_id 迁移到 new_id，并更新 kept_id 的订阅
+    res = await config.bulk_modify_subscribe(
+        to_add=[receipt(group_id, "new_id", "new_name", [1]) for group_id in (1, 2, 3)],
+        to_update=[receipt(3, "kept_id", "kept_name2", [2])],
+        to_delete=[(TargetQQGroup(group_id=group_id), "weibo", TTarget("old_id")) for group_id in (1, 2, 3)],
+    )
+    assert res == (3, 1, 3)
+    add_targets_hook.assert_awaited_once_with([("weibo", TTarget("new_id"))])
+    delete_targets_hook.assert_awaited_once_with([("weibo", TTarget("old_id"))])
+    subs = await config.list_subs_with_all_info()
+    assert sorted((sub.user.user_target["group_id"], sub.target.target, sub.categories) for sub in subs) == [
+        (1, "new_id", [1]),
+        (2, "new_id", [1]),
+        (3, "kept_id", [2]),
+        (3, "new_id", [1]),
+    ]
+    assert {sub.target.target_name for sub in subs} == {"new_name", "kept_name2"}
+
+    # 任一操作失败时全部回滚
+    add_targets_hook.reset_mock()
+    delete_targets_hook.reset_mock()
+    with pytest.raises(NoSuchSubscribeException):
+        await config.bulk_modify_subscribe(
+            to_add=[receipt(4, "another_id", "another_name", [])],
+            to_delete=[(TargetQQGroup(group_id=1), "weibo", TTarget("old_id"))],
+        )
+    with pytest.raises(SubscribeDupException):
+        await config.bulk_modify_subscribe(
+            to_add=[receipt(4, "another_id", "another_name", []), receipt(1, "new_id", "new_name", [])],
+            to_delete=[(TargetQQGroup(group_id=3), "weibo", TTarget("kept_id"))],
+        )
+    add_targets_hook.assert_not_awaited()
+    delete_targets_hook.assert_not_awaited()
+    assert len(await config.list_subs_with_all_info()) == 4
@@ -0,0 +1,61 @@
+from collections.abc import Awaitable, Callable
+import re
+
+from nonebug.app import App
+
+FULL_SCAN_PATTERN = re.compile(r"^SCAN (nonebot_bison_\w+)$")
+
+
+async def get_query_plans(func: Callable[[], Awaitable]) -> list[str]:
+    """执行 func 并返回其中所有 SELECT 语句在 SQLite 上的查询计划"""
+    from nonebot_plugin_datastore.db import get_engine
+    from sqlalchemy import event
+
+    engine = get_engine()
+    statements = []
+
+    def capture(conn, cursor, statement: str, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        await func()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    plans = []
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            rows = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plans.extend(row[-1] for row in rows)
+    return plans
+
+
+def assert_no_full_scan(plans: list[str]):
+    assert plans
+    full_scans = [plan for plan in plans if FULL_SCAN_PATTERN.match(plan)]
+    assert not full_scans, f"full table scan found in query plan: {plans}"
+
+
+async def test_hot_queries_use_index(app: App):
+    from nonebot_plugin_saa import TargetQQGroup
+
+    from nonebot_bison.config import config
+    from nonebot_bison.config.db_config import WeightConfig
+    from nonebot_bison.types import Target as T_Target
+
+    for group_id in range(3):
+        for target in ("t1", "t2"):
+            await config.add_subscribe(TargetQQGroup(group_id=group_id), T_Target(target), target, "weibo", [], [])
+    await config.update_time_weight_config(T_Target("t1"), "weibo", WeightConfig(default=10, time_config=[]))
+
+    assert_no_full_scan(await get_query_plans(lambda: config.get_platform_target_subscribers("weibo", T_Target("t1"))))
+    assert_no_full_scan(await get_query_plans(lambda: config.get_platform_target("weibo")))
+    assert_no_full_scan(await get_query_plans(lambda: config.list_subscribe(TargetQQGroup(group_id=1))))
+    assert_no_full_scan(await get_query_plans(lambda: config.get_current_weight_val(["weibo"])))
+    assert_no_full_scan(
+        await get_query_plans(
+            lambda: config.list_subscribe_of_users([TargetQQGroup(group_id=0), TargetQQGroup(group_id=2)])
+        )
+    )
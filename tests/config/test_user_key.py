@@ -0,0 +1,90 @@
+import time
+
+from nonebug.app import App
+import pytest
+
+
+def test_user_key_canonical():
+    from nonebot.compat import model_dump
+    from nonebot_plugin_saa import TargetQQGroup, TargetQQPrivate
+
+    from nonebot_bison.config.utils import get_user_key
+
+    group = TargetQQGroup(group_id=123)
+    assert get_user_key(group) == get_user_key(model_dump(group))
+    assert get_user_key({"group_id": 123, "platform_type": "QQ Group"}) == get_user_key(
+        {"platform_type": "QQ Group", "group_id": 123}
+    )
+    assert get_user_key(group) != get_user_key(TargetQQGroup(group_id=234))
+    assert get_user_key(group) != get_user_key(TargetQQPrivate(user_id=123))
+
+
+async def test_user_lookup_use_index(app: App):
+    from nonebot_plugin_datastore import create_session
+    from nonebot_plugin_saa import TargetQQGroup
+    from sqlalchemy import select, text
+
+    from nonebot_bison.config.db_model import User
+    from nonebot_bison.config.utils import get_user_key
+
+    stmt = select(User).where(User.user_key == get_user_key(TargetQQGroup(group_id=123)))
+    compiled = stmt.compile(compile_kwargs={"literal_binds": True})
+    async with create_session() as sess:
+        plan = (await sess.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))).all()
+    assert any("ix_nonebot_bison_user_user_key" in row[-1] for row in plan)
+
+
+async def test_user_key_unique(app: App):
+    from nonebot.compat import model_dump
+    from nonebot_plugin_datastore import create_session
+    from nonebot_plugin_saa import TargetQQGroup
+    from sqlalchemy.exc import IntegrityError
+
+    from nonebot_bison.config.db_model import User
+    from nonebot_bison.config.utils import get_user_key
+
+    user = TargetQQGroup(group_id=123)
+    async with create_session() as sess:
+        sess.add(User(user_target=model_dump(user), user_key=get_user_key(user)))
+        await sess.commit()
+        sess.add(User(user_target=model_dump(user), user_key=get_user_key(user)))
+        with pytest.raises(IntegrityError):
+            await sess.commit()
+
+
+@pytest.mark.benchmark
+async def test_user_lookup_benchmark(app: App):
+    from nonebot.compat import model_dump
+    from nonebot.log import logger
+    from nonebot_plugin_datastore import create_session
+    from nonebot_plugin_saa import TargetQQGroup
+    from sqlalchemy import insert, select
+
+    from nonebot_bison.config.db_model import User
+    from nonebot_bison.config.utils import get_user_key
+
+    user_count = 50000
+    async with create_session() as sess:
+        await sess.execute(
+            insert(User),
+            [
+                {"user_target": model_dump(user), "user_key": get_user_key(user)}
+                for user in (TargetQQGroup(group_id=i) for i in range(user_count))
+            ],
+        )
+        await sess.commit()
+
+    lookup_users = [TargetQQGroup(group_id=i) for i in range(0, user_count, user_count // 100)]
+    async with create_session() as sess:
+        start = time.perf_counter()
+        for user in lookup_users:
+            assert await sess.scalar(select(User.id).where(User.user_target == model_dump(user)))
+        json_cost = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for user in lookup_users:
+            assert await sess.scalar(select(User.id).where(User.user_key == get_user_key(user)))
+        key_cost = time.perf_counter() - start
+
+    logger.info(f"{len(lookup_users)} lookups in {user_count} users: json {json_cost:.3f}s, user_key {key_cost:.3f}s")
+    assert key_cost < json_cost
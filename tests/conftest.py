@@ -50,7 +50,16 @@ async def app(tmp_path: Path, request: pytest.FixtureRequest, mocker: MockerFixt
     from nonebot_plugin_htmlrender.browser import shutdown_htmlrender, startup_htmlrender
 
     from nonebot_bison import plugin_config
-    from nonebot_bison.config.db_model import ScheduleTimeWeight, Subscribe, Target, User
+    from nonebot_bison.config.db_model import (
+        Cookie,
+        CookieTarget,
+        SchedulerNode,
+        ScheduleTimeWeight,
+        ShardLease,
+        Subscribe,
+        Target,
+        User,
+    )
 
     plugin_config.bison_config_path = str(tmp_path / "legacy_config")
     plugin_config.bison_filter_log = False
@@ -83,6 +92,21 @@ async def app(tmp_path: Path, request: pytest.FixtureRequest, mocker: MockerFixt
         await session.execute(delete(Subscribe))
         await session.execute(delete(Target))
         await session.execute(delete(ScheduleTimeWeight))
+        await session.execute(delete(SchedulerNode))
+        await session.execute(delete(ShardLease))
+        await session.execute(delete(CookieTarget))
+        await session.execute(delete(Cookie))
+
+    # 重置熔断器、限流器、分片调度状态与 target 名称缓存
+    from nonebot_bison.apis import reset_target_name_cache
+    from nonebot_bison.scheduler.shard import set_shard_manager
+    from nonebot_bison.utils.circuit_breaker import reset_circuit_breakers
+    from nonebot_bison.utils.rate_limit import reset_host_buckets
+
+    reset_circuit_breakers()
+    reset_host_buckets()
+    set_shard_manager(None)
+    reset_target_name_cache()
 
     # 关闭渲染图片时打开的浏览器
     await shutdown_htmlrender()
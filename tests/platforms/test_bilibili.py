@@ -151,7 +151,13 @@ async def test_reset_on_exception(app: App):
 @pytest.mark.asyncio
 async def test_retry_for_352(app: App, mocker: MockerFixture):
     from nonebot_bison.platform.bilibili.platforms import ApiCode352Error
-    from nonebot_bison.platform.bilibili.retry import RetryAddon, RetryState, _retry_fsm, retry_for_352
+    from nonebot_bison.platform.bilibili.retry import (
+        DEFAULT_RETRY_KEY,
+        RetryAddon,
+        RetryState,
+        get_retry_fsm,
+        retry_for_352,
+    )
     from nonebot_bison.platform.platform import NewMessage
     from nonebot_bison.post import Post
     from nonebot_bison.types import RawPost, Target
@@ -238,6 +244,7 @@ async def test_retry_for_352(app: App, mocker: MockerFixture):
             self.refresh_client_call_count += 1
 
     fakebili = MockPlatform(ProcessContext(MockClientManager()))
+    _retry_fsm = get_retry_fsm(DEFAULT_RETRY_KEY)
     client_mgr = fakebili.ctx._client_mgr
     assert isinstance(client_mgr, MockClientManager)
     assert client_mgr.get_client_call_count == 0
@@ -447,6 +454,186 @@ async def test_dynamic_forword_deleted(bilibili: "Bilibili", bing_dy_list: list)
     assert repost.content == "源动态已被作者删除"
 
 
+async def test_retry_for_352_per_cookie(app: App):
+    from nonebot_bison.metrics import retry_transition_counter
+    from nonebot_bison.platform.bilibili import BilibiliClientManager
+    from nonebot_bison.platform.bilibili.retry import (
+        ApiCode352Error,
+        RetryState,
+        get_retry_fsm,
+        is_retry_key_benched,
+        retry_for_352,
+    )
+    from nonebot_bison.types import Target
+    from nonebot_bison.utils import ProcessContext
+
+    class KeyedClientManager(BilibiliClientManager):
+        retry_key = "cookie-a"
+
+        async def get_retry_key(self) -> str:
+            return self.retry_key
+
+        async def refresh_client(self):
+            pass
+
+    class FakeBili:
+        def __init__(self, ctx: ProcessContext):
+            self.ctx = ctx
+            self.bad_keys: set[str] = set()
+
+        @retry_for_352  # type: ignore
+        async def get_sub_list(self, t: Target):
+            if self.ctx.client_mgr.retry_key in self.bad_keys:  # type: ignore
+                raise ApiCode352Error(URL("http://t.tt/1"))
+            return [t]
+
+        @retry_for_352(per_target=True)  # type: ignore
+        async def get_sub_list_per_target(self, t: Target):
+            return await self.get_sub_list.__wrapped__(self, t)  # type: ignore
+
+    client_mgr = KeyedClientManager()
+    fakebili = FakeBili(ProcessContext(client_mgr))
+    fakebili.bad_keys.add("cookie-a")
+
+    # cookie-a 连续 352 直到进入回避
+    for _ in range(4):
+        assert not await fakebili.get_sub_list(Target("t1"))
+    assert get_retry_fsm("cookie-a").current_state == RetryState.BACKOFF
+    assert is_retry_key_benched("cookie-a")
+    assert (
+        retry_transition_counter.labels(retry_key="cookie-a", from_state="REFRESH", to_state="BACKOFF")._value.get()
+        == 1
+    )
+
+    # 其他 cookie 不受影响
+    client_mgr.retry_key = "cookie-b"
+    assert await fakebili.get_sub_list(Target("t1")) == [Target("t1")]
+    assert get_retry_fsm("cookie-b").current_state == RetryState.NROMAL
+    assert not is_retry_key_benched("cookie-b")
+
+    # 按 target 隔离
+    fakebili.bad_keys.add("cookie-b")
+    assert not await fakebili.get_sub_list_per_target(Target("t2"))
+    assert get_retry_fsm("cookie-b", Target("t2")).current_state == RetryState.REFRESH
+    assert get_retry_fsm("cookie-b").current_state == RetryState.NROMAL
+    # 指标只按 cookie 区分，不包含 target
+    assert (
+        retry_transition_counter.labels(retry_key="cookie-b", from_state="NORMAL", to_state="REFRESH")._value.get() == 1
+    )
+
+    for retry_fsm in (get_retry_fsm("cookie-a"), get_retry_fsm("cookie-b"), get_retry_fsm("cookie-b", Target("t2"))):
+        await retry_fsm.reset()
+
+
+async def test_retry_fsm_eviction(app: App):
+    from datetime import timedelta
+
+    from nonebot_bison.platform.bilibili.retry import RETRY_FSM_IDLE_AGE, get_retry_fsm
+    from nonebot_bison.types import Target
+
+    with freeze_time() as frozen_time:
+        fsm = get_retry_fsm("cookie-idle", Target("t1"))
+        frozen_time.tick(RETRY_FSM_IDLE_AGE - timedelta(minutes=1))
+        assert get_retry_fsm("cookie-idle", Target("t1")) is fsm
+        # 使用时刷新闲置时间，闲置超时后被清理
+        frozen_time.tick(RETRY_FSM_IDLE_AGE - timedelta(minutes=1))
+        assert get_retry_fsm("cookie-idle", Target("t1")) is fsm
+        frozen_time.tick(RETRY_FSM_IDLE_AGE + timedelta(minutes=1))
+        assert get_retry_fsm("cookie-idle", Target("t1")) is not fsm
+
+
+async def test_benched_cookie_not_chosen(app: App):
+    from datetime import timedelta
+
+    from nonebot_bison.config import config
+    from nonebot_bison.config.db_model import Cookie
+    from nonebot_bison.platform.bilibili import BilibiliClientManager
+    from nonebot_bison.platform.bilibili.retry import RetryState, get_retry_fsm
+
+    client_mgr = BilibiliClientManager()
+    cookie_1_id = await config.add_cookie(Cookie(site_name="bilibili.com", content='{"c": "1"}'))
+    cookie_2_id = await config.add_cookie(
+        Cookie(site_name="bilibili.com", content='{"c": "2"}', last_usage=datetime(2000, 1, 1))
+    )
+
+    benched_fsm = get_retry_fsm(f"cookie-{cookie_1_id}")
+    await benched_fsm.start(None)  # type: ignore
+    benched_fsm.current_state = RetryState.BACKOFF
+    benched_fsm.addon.backoff_finish_time = datetime.now() + timedelta(minutes=5)
+
+    cookie = await client_mgr._get_next_identified_cookie()
+    assert cookie
+    assert cookie.id == cookie_2_id
+    assert await client_mgr.get_retry_key() == f"cookie-{cookie_2_id}"
+
+    await benched_fsm.reset()
+    client_mgr.current_identified_cookie = None
+    cookie = await client_mgr._get_next_identified_cookie()
+    assert cookie
+    assert cookie.id == cookie_1_id
+
+
+async def test_anonymous_cookie_prewarm(app: App):
+    import asyncio
+    from datetime import datetime, timedelta
+
+    from nonebot_bison.config import config
+    from nonebot_bison.platform.bilibili import BilibiliClientManager
+
+    client_mgr = BilibiliClientManager()
+    get_cookies = client_mgr._get_cookies
+    base_count = get_cookies.call_count  # type: ignore
+
+    running = max_running = 0
+
+    async def fake_get_cookies():
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return [{"name": "test anonymous", "content": "test"}]
+
+    get_cookies.side_effect = fake_get_cookies  # type: ignore
+
+    # 首次刷新等待预生成完成后再取用池中的 cookie，不会同时打开多个浏览器页面
+    await client_mgr.refresh_client()
+    assert client_mgr._prewarm_task
+    await client_mgr._prewarm_task
+    assert max_running == 1
+    assert len(client_mgr._cookie_pool) == client_mgr._cookie_pool_size
+    assert get_cookies.call_count == base_count + 1 + client_mgr._cookie_pool_size  # type: ignore
+
+    # 刷新时直接取用池中的 cookie，并在后台补满
+    await client_mgr.refresh_client()
+    await client_mgr._prewarm_task
+    assert len(client_mgr._cookie_pool) == client_mgr._cookie_pool_size
+    assert get_cookies.call_count == base_count + 2 + client_mgr._cookie_pool_size  # type: ignore
+
+    cookies = await config.get_cookie(client_mgr._site_name, is_anonymous=True)
+    assert len(cookies) == 1
+
+    # 过期的 cookie 会被丢弃
+    client_mgr._cookie_pool = type(client_mgr._cookie_pool)(
+        (ts - timedelta(days=1), cookie) for ts, cookie in client_mgr._cookie_pool
+    )
+    await client_mgr.refresh_client()
+    await client_mgr._prewarm_task
+    assert get_cookies.call_count == base_count + 3 + 2 * client_mgr._cookie_pool_size  # type: ignore
+    assert len(client_mgr._cookie_pool) == client_mgr._cookie_pool_size
+
+    # 即将过期的 cookie 在后台提前替换
+    expiring_at = datetime.now() - client_mgr._cookie_pool_max_age + client_mgr._cookie_pool_refresh_ahead / 2
+    client_mgr._cookie_pool = type(client_mgr._cookie_pool)(
+        (expiring_at, cookie) for _, cookie in client_mgr._cookie_pool
+    )
+    await client_mgr._refresh_cookie_pool()
+    await client_mgr._prewarm_task
+    assert get_cookies.call_count == base_count + 3 + 3 * client_mgr._cookie_pool_size  # type: ignore
+    assert len(client_mgr._cookie_pool) == client_mgr._cookie_pool_size
+    assert all(created_at > expiring_at for created_at, _ in client_mgr._cookie_pool)
+
+
 @pytest.mark.asyncio
 @respx.mock
 async def test_fetch_new_without_dynamic(bilibili, dummy_user_subinfo, without_dynamic):
@@ -506,6 +693,76 @@ async def test_fetch_new(bilibili, dummy_user_subinfo):
     )
 
 
+@pytest.mark.asyncio
+@respx.mock
+async def test_fetch_new_skip_seen_validation(bilibili, dummy_user_subinfo, mocker: MockerFixture):
+    from nonebot_bison.platform.bilibili import platforms
+    from nonebot_bison.platform.bilibili.models import DynRawPost
+    from nonebot_bison.types import SubUnit, Target
+
+    target = Target("161775301")
+    post_router = respx.get(
+        f"https://api.bilibili.com/x/polymer/web-dynamic/v1/feed/space?host_mid={target}&timezone_offset=-480&offset=&features=itemOpusStyle"
+    )
+    raw_post_list = get_json("bilibili-new.json")
+    new_post = raw_post_list["data"]["items"][0]
+    new_post["modules"]["module_author"]["pub_ts"] = int(datetime.now().timestamp())
+    post_router.mock(return_value=Response(200, json=raw_post_list))
+
+    validate_spy = mocker.spy(platforms, "type_validate_python")
+
+    def validated_post_count():
+        return len([call for call in validate_spy.call_args_list if call.args[0] is DynRawPost])
+
+    res = await bilibili.fetch_new_post(SubUnit(target, [dummy_user_subinfo]))
+    assert len(res) == 0
+    # 只有未过期的动态会被完整校验
+    assert validated_post_count() == 1
+
+    validate_spy.reset_mock()
+    res2 = await bilibili.fetch_new_post(SubUnit(target, [dummy_user_subinfo]))
+    assert len(res2) == 0
+    assert validated_post_count() == 0
+
+
+@pytest.mark.benchmark
+async def test_pre_filter_benchmark(bilibili: "Bilibili"):
+    import json
+
+    from nonebot.compat import type_validate_json
+
+    from nonebot_bison.platform.bilibili.models import DynRawPost, PostAPI, PostListAPI
+    from nonebot_bison.types import Target
+
+    target = Target("161775302")
+    contents = [
+        json.dumps(get_json(file_name)).encode()
+        for file_name in ("bilibili-new.json", "bilibili-dynamic-live-rcmd.json", "bilibili-opus-major.json")
+    ]
+    for content in contents:
+        items = type_validate_python(PostListAPI, json.loads(content)).data.items  # type: ignore
+        ids = {item["id_str"] for item in items if item.get("id_str")}
+        bilibili.set_stored_data(target, bilibili.MessageStorage(True, ids))
+
+    rounds = 20
+    start = time()
+    for _ in range(rounds):
+        for content in contents:
+            type_validate_json(PostAPI, content)
+    full_cost = time() - start
+
+    start = time()
+    for _ in range(rounds):
+        for content in contents:
+            items = type_validate_python(PostListAPI, json.loads(content)).data.items  # type: ignore
+            for item in bilibili._filter_seen_raw_items(target, items):
+                type_validate_python(DynRawPost, item)
+    pre_filter_cost = time() - start
+
+    logger.info(f"full validation: {full_cost * 1000:.2f}ms, pre-filter: {pre_filter_cost * 1000:.2f}ms")
+    assert pre_filter_cost < full_cost
+
+
 @pytest.mark.asyncio
 @respx.mock
 async def test_fetch_new_live_rcmd(bilibili: "Bilibili", dummy_user_subinfo):
@@ -67,3 +67,33 @@ async def test_fetch_bilibili_bangumi_status(bili_bangumi: "BilibiliBangumi", du
     assert post2.images == ["http://i0.hdslb.com/bfs/archive/ea0a302c954f9dbc3d593e676486396c551529c9.jpg"]
     assert post2.compress is True
     assert "brief" == post2.get_priority_themes()[0]
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_batch_fetch_bilibili_bangumi_status(bili_bangumi: "BilibiliBangumi", dummy_user_subinfo):
+    from nonebot_bison.types import SubUnit, Target
+
+    assert bili_bangumi.use_batch
+
+    bili_bangumi_router = respx.get("https://api.bilibili.com/pgc/review/user?media_id=28235414")
+    bili_bangumi_router.mock(return_value=Response(200, json=get_json("bilibili-gangumi-hanhua0.json")))
+    bili_bangumi_error_router = respx.get("https://api.bilibili.com/pgc/review/user?media_id=1")
+    bili_bangumi_error_router.mock(return_value=Response(200, json={"code": -404, "message": "啥都木有"}))
+    bili_bangumi_detail_router = respx.get("https://api.bilibili.com/pgc/view/web/season?season_id=39719")
+    bili_bangumi_detail_router.mock(return_value=Response(200, json=get_json("bilibili-gangumi-hanhua1-detail.json")))
+
+    sub_units = [SubUnit(Target("1"), [dummy_user_subinfo]), SubUnit(Target("28235414"), [dummy_user_subinfo])]
+
+    res0 = await bili_bangumi.batch_fetch_new_post(sub_units)
+    assert res0 == []
+    assert bili_bangumi_router.call_count == 1
+    assert bili_bangumi_error_router.call_count == 1
+    assert bili_bangumi.get_stored_data(Target("1")) is None
+
+    # 单个剧集请求失败不影响其他剧集
+    bili_bangumi_router.mock(return_value=Response(200, json=get_json("bilibili-gangumi-hanhua1.json")))
+    res1 = await bili_bangumi.batch_fetch_new_post(sub_units)
+    assert res1
+    assert len(res1) == 1
+    assert res1[0][1][0].content == "更新至第2话"
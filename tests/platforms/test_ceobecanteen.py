@@ -257,3 +257,34 @@ async def test_parse_target_fuzzy(app: App, ceobecanteen: "CeobeCanteen", dummy_
 
     assert pe2.value.prompt
     assert "明日方舟-B站" in pe2.value.prompt
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_data_source_cache_single_flight(app: App, dummy_target, ceobecanteen_targets):
+    import asyncio
+
+    from nonebot_bison.platform.ceobecanteen.cache import CeobeDataSourceCache
+    from nonebot_bison.platform.ceobecanteen.models import CeobeSource
+
+    targets_router = respx.get("https://server.ceobecanteen.top/api/v1/canteen/config/datasource/list")
+    targets_router.mock(return_value=Response(200, json=ceobecanteen_targets))
+    cache = CeobeDataSourceCache()
+
+    # 同时查询多个未缓存的数据源只刷新一次
+    source = CeobeSource(type="bilibili:dynamic-by-uid", data="161775300")
+    results = await asyncio.gather(
+        *[cache.get_by_source(source) for _ in range(5)],
+        cache.get_by_nickname("明日方舟-B站"),
+        cache.get_by_unique_id(dummy_target),
+    )
+    assert targets_router.call_count == 1
+    assert {target.unique_id for target in results if target} == {dummy_target}
+    assert all(results)
+
+    # 刷新后仍找不到的数据源在一段时间内不再触发刷新
+    unknown_source = CeobeSource(type="bilibili:dynamic-by-uid", data="unknown")
+    assert await asyncio.gather(*[cache.get_by_source(unknown_source) for _ in range(5)]) == [None] * 5
+    assert await cache.get_by_nickname("不存在的数据源") is None
+    assert await cache.get_by_nickname("不存在的数据源") is None
+    assert targets_router.call_count == 3
@@ -3,6 +3,7 @@ from typing import Any, ClassVar
 
 from nonebug.app import App
 import pytest
+from pytest_mock import MockerFixture
 
 now = time()
 passed = now - 3 * 60 * 60
@@ -481,6 +482,54 @@ async def test_group(
     assert len(res3) == 0
 
 
+@pytest.mark.asyncio
+async def test_group_member_error_isolation(
+    app: App,
+    mock_platform_no_target,
+    mock_platform_no_target_2,
+    user_info_factory,
+    mocker: MockerFixture,
+):
+    import httpx
+
+    from nonebot_bison.metrics import group_member_request_counter
+    from nonebot_bison.platform.platform import make_no_target_group
+    from nonebot_bison.types import SubUnit, Target
+    from nonebot_bison.utils import DefaultClientManager, ProcessContext
+
+    dummy = Target("dummy")
+
+    def failed_count(member: type) -> float:
+        return group_member_request_counter.labels(
+            platform_name="mock_platform", member=member.__name__, success=False
+        )._value.get()
+
+    group_platform_class = make_no_target_group([mock_platform_no_target, mock_platform_no_target_2])
+    group_platform = group_platform_class(ProcessContext(DefaultClientManager()))
+    res1 = await group_platform.fetch_new_post(SubUnit(dummy, [user_info_factory([1, 4], [])]))
+    assert len(res1) == 0
+
+    failed_before = failed_count(mock_platform_no_target_2)
+    mocker.patch.object(mock_platform_no_target_2, "get_sub_list", side_effect=RuntimeError("member error"))
+    res2 = await group_platform.fetch_new_post(SubUnit(dummy, [user_info_factory([1, 4], [])]))
+    assert len(res2) == 1
+    assert [x.content for x in res2[0][1]] == ["p2"]
+    assert failed_count(mock_platform_no_target_2) == failed_before + 1
+
+    # 网络错误经 catch_network_error 处理，全部成员都是网络错误时与单个平台相同返回 None
+    network_error = httpx.ConnectError("connect failed", request=httpx.Request("GET", "https://example.com"))
+    mocker.patch.object(mock_platform_no_target, "get_sub_list", side_effect=network_error)
+    mocker.patch.object(mock_platform_no_target_2, "get_sub_list", side_effect=network_error)
+    failed_before = failed_count(mock_platform_no_target_2)
+    assert await group_platform.fetch_new_post(SubUnit(dummy, [user_info_factory([1, 4], [])])) is None
+    # 两个成员类名相同，共用同一个指标
+    assert failed_count(mock_platform_no_target_2) == failed_before + 2
+
+    mocker.patch.object(mock_platform_no_target, "get_sub_list", side_effect=RuntimeError("member error"))
+    with pytest.raises(RuntimeError, match="member error"):
+        await group_platform.fetch_new_post(SubUnit(dummy, [user_info_factory([1, 4], [])]))
+
+
 async def test_batch_fetch_new_message(app: App):
     from nonebot_plugin_saa import TargetQQGroup
 
@@ -643,3 +692,160 @@ async def test_batch_fetch_compare_status(app: App):
     assert (TargetQQGroup(group_id=123), "off") in send_set
     assert (TargetQQGroup(group_id=123), "on") in send_set
     assert (TargetQQGroup(group_id=234), "on") in send_set
+
+
+async def test_batch_fetch_chunked(app: App):
+    import asyncio
+
+    import httpx
+    from nonebot_plugin_saa import TargetQQGroup
+
+    from nonebot_bison.platform.platform import StatusChange
+    from nonebot_bison.post import Post
+    from nonebot_bison.types import Category, RawPost, SubUnit, Target, UserSubInfo
+    from nonebot_bison.utils import DefaultClientManager
+    from nonebot_bison.utils.context import ProcessContext
+
+    class ChunkedStatusChange(StatusChange):
+        platform_name = "mock_platform"
+        name = "Mock Platform"
+        enabled = True
+        is_common = True
+        enable_tag = False
+        has_target = True
+        categories: ClassVar[dict] = {Category(1): "开播"}
+        batch_chunk_size = 2
+        batch_chunk_concurrency = 2
+
+        requested: ClassVar[list[list[Target]]] = []
+        running = 0
+        max_running = 0
+        online = False
+
+        @classmethod
+        async def batch_get_status(cls, targets: "list[Target]"):
+            cls.requested.append(targets)
+            cls.running += 1
+            cls.max_running = max(cls.max_running, cls.running)
+            await asyncio.sleep(0.01)
+            cls.running -= 1
+            if Target("bad") in targets:
+                raise httpx.ConnectError("connect failed", request=httpx.Request("GET", "https://example.com/status"))
+            if Target("error") in targets:
+                raise cls.FetchError()
+            return [{"s": cls.online} for _ in targets]
+
+        def compare_status(self, target, old_status, new_status) -> list["RawPost"]:
+            if not old_status["s"] and new_status["s"]:
+                return [{"text": target, "cat": 1}]
+            return []
+
+        async def parse(self, raw_post) -> "Post":
+            return Post(self, raw_post["text"], "")
+
+        def get_category(self, raw_post):
+            return raw_post["cat"]
+
+    platform_obj = ChunkedStatusChange(ProcessContext(DefaultClientManager()))
+    user = UserSubInfo(TargetQQGroup(group_id=123), [1], [])
+    sub_units = [SubUnit(Target(t), [user]) for t in ("t1", "t2", "bad", "t3", "t4")]
+
+    assert await platform_obj.batch_fetch_new_post(sub_units) == []
+    assert [len(x) for x in ChunkedStatusChange.requested] == [2, 2, 1]
+    assert ChunkedStatusChange.max_running == 2
+
+    ChunkedStatusChange.online = True
+    res = await platform_obj.batch_fetch_new_post(sub_units)
+    # 网络错误分块中的 t3 被跳过，其余分块正常推送且保持原有顺序
+    assert res
+    assert [post.content for _, posts in res for post in posts] == ["t1", "t2", "t4"]
+
+    # 全部分块出现网络错误时与单个请求失败相同，返回 None
+    bad_units = [SubUnit(Target("bad"), [user]), SubUnit(Target("t5"), [user])]
+    assert await platform_obj.batch_fetch_new_post(bad_units) is None
+
+    # 其他异常同样只影响所在分块
+    error_units = [SubUnit(Target(t), [user]) for t in ("t1", "t2", "error", "t3")]
+    ChunkedStatusChange.online = False
+    assert await platform_obj.batch_fetch_new_post(error_units) == []
+    ChunkedStatusChange.online = True
+    res = await platform_obj.batch_fetch_new_post(error_units)
+    assert res
+    assert [post.content for _, posts in res for post in posts] == ["t1", "t2"]
+
+    # 全部分块都抛出异常时向上抛出
+    with pytest.raises(ChunkedStatusChange.FetchError):
+        await platform_obj.batch_fetch_new_post([SubUnit(Target("error"), [user]), SubUnit(Target("t6"), [user])])
+
+
+async def test_batch_fetch_concurrent_handle(app: App):
+    import asyncio
+
+    from nonebot_plugin_saa import TargetQQGroup
+
+    from nonebot_bison.platform.platform import NewMessage
+    from nonebot_bison.post import Post
+    from nonebot_bison.types import RawPost, SubUnit, Target, UserSubInfo
+    from nonebot_bison.utils import DefaultClientManager
+    from nonebot_bison.utils.context import ProcessContext
+
+    class ConcurrentNewMessage(NewMessage):
+        platform_name = "mock_platform"
+        name = "Mock Platform"
+        enabled = True
+        is_common = True
+        enable_tag = False
+        categories: ClassVar[dict] = {}
+        has_target = True
+        batch_handle_concurrency = 3
+
+        inited = False
+        running = 0
+        max_running = 0
+        parse_count = 0
+
+        @classmethod
+        async def get_target_name(cls, client, _: "Target"):
+            return "MockPlatform"
+
+        def get_id(self, post: "RawPost") -> Any:
+            return post["id"]
+
+        def get_date(self, raw_post: "RawPost") -> float:
+            return raw_post["date"]
+
+        async def parse(self, raw_post: "RawPost") -> "Post":
+            cls = type(self)
+            cls.parse_count += 1
+            cls.running += 1
+            cls.max_running = max(cls.max_running, cls.running)
+            # 越靠前的 target 解析越慢，用于检查输出顺序
+            await asyncio.sleep(0.05 / raw_post["order"])
+            cls.running -= 1
+            return Post(self, raw_post["text"], "")
+
+        @classmethod
+        async def batch_get_sub_list(cls, targets: list[Target]) -> list[list[RawPost]]:
+            if not cls.inited:
+                cls.inited = True
+                return [[] for _ in targets]
+            # 不同 target 的推文 id 相同，并发处理时解析结果不能互相串用
+            return [[{"id": 1, "order": i + 1, "text": target, "date": now}] for i, target in enumerate(targets)]
+
+    platform_obj = ConcurrentNewMessage(ProcessContext(DefaultClientManager()))
+    sub_units = [
+        SubUnit(
+            Target(f"target{i}"),
+            [UserSubInfo(TargetQQGroup(group_id=i), [], []), UserSubInfo(TargetQQGroup(group_id=i + 100), [], [])],
+        )
+        for i in range(1, 7)
+    ]
+
+    assert await platform_obj.batch_fetch_new_post(sub_units) == []
+    res = await platform_obj.batch_fetch_new_post(sub_units)
+    assert [(platform_target, [post.content for post in posts]) for platform_target, posts in res] == [
+        (TargetQQGroup(group_id=group_id), [f"target{i}"]) for i in range(1, 7) for group_id in (i, i + 100)
+    ]
+    assert ConcurrentNewMessage.max_running == 3
+    # 同一个 target 的多个订阅者共用一次解析结果
+    assert ConcurrentNewMessage.parse_count == 6
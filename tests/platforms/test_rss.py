@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import typing
 import xml.etree.ElementTree as ET
 
@@ -8,7 +8,7 @@ import pytest
 import pytz
 import respx
 
-from .utils import get_file
+from .utils import get_file, path
 
 if typing.TYPE_CHECKING:
     pass
@@ -218,3 +218,195 @@ def test_similar_text_process():
     str2 = "你爱我"
     res = text_similarity(str1, str2)
     assert res <= 0.8
+
+
+def test_fast_text_similarity():
+    from nonebot_bison.utils import fast_text_similarity
+
+    with pytest.raises(ValueError, match="The length of string can not be 0"):
+        fast_text_similarity("", "xxxx")
+    with pytest.raises(ValueError, match="The length of string can not be 0"):
+        fast_text_similarity("xxxx", "")
+    str1 = (
+        "天使九局下被追平，米基-莫尼亚克(Mickey Moniak)超前安打拒绝剧本，天使7-6老虎；阿莱克-博姆（Alec"
+        " Bohm）再见安打，费城人4-3金莺..."
+    )
+    str2 = (
+        "天使九局下被追平，米基-莫尼亚克(Mickey Moniak)超前安打拒绝剧本，天使7-6老虎；阿莱克-博姆（Alec"
+        " Bohm）再见安打，费城人4-3金莺；布兰登-洛维（Brandon Lowe）阳春炮，光芒4-1马林鱼；皮特-阿隆索(Pete Alonso)、"
+        "丹尼尔-沃格尔巴克(Daniel Vogelbach)背靠背本垒打，大都会9-3扬基；吉田正尚（Masataka Yoshida）3安2打点，"
+        "红袜7-1勇士；凯尔-塔克（Kyle Tucker）阳春炮，太空人4-3连胜游骑兵。"
+    )
+    assert fast_text_similarity(str1, str2) > 0.8
+    assert fast_text_similarity(str2, str1) > 0.8
+    assert fast_text_similarity("我爱你", "你爱我") <= 0.8
+    # 低于 score_cutoff 时直接返回 0
+    assert fast_text_similarity("我爱你", "你爱我", score_cutoff=0.8) == 0
+    # 只比较较长字符串的前缀
+    assert fast_text_similarity("abcd", "xxxxxxxxabcd") == 0
+
+
+@pytest.mark.benchmark
+def test_text_similarity_benchmark():
+    import time
+
+    import feedparser
+    from nonebot.log import logger
+
+    from nonebot_bison.utils import fast_text_similarity, text_similarity
+
+    pairs: list[tuple[str, str]] = []
+    for file in path.glob("rss-*.xml"):
+        for entry in feedparser.parse(file.read_text(encoding="utf8")).entries:
+            if (title := entry.get("title")) and (desc := entry.get("description")):
+                pairs.append((title, desc))
+    # 长文章：标题与超长正文
+    long_title, long_desc = pairs[0][0], "".join(desc for _, desc in pairs) * 20
+    pairs.append((long_title, long_desc))
+
+    start = time.perf_counter()
+    for title, desc in pairs:
+        text_similarity(title, desc)
+    slow_cost = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for title, desc in pairs:
+        fast_text_similarity(title, desc, score_cutoff=0.8)
+    fast_cost = time.perf_counter() - start
+
+    logger.info(f"text_similarity: {slow_cost * 1000:.2f}ms, fast_text_similarity: {fast_cost * 1000:.2f}ms")
+    assert fast_cost < slow_cost
+
+
+def _make_feed(guids: list[str], pub_date: str = "") -> str:
+    pub_date_tag = f"<pubDate>{pub_date}</pubDate>" if pub_date else ""
+    items = "".join(
+        f"<item><title>title {guid}</title><description>desc {guid}</description>{pub_date_tag}"
+        f'<link>https://example.com/{guid}</link><guid isPermaLink="false">{guid}</guid></item>'
+        for guid in guids
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f'<rss version="2.0"><channel><title>test feed</title>{items}</channel></rss>'
+    )
+
+
+async def _poll(rss, target) -> list:
+    """抓取并更新已推送条目，与调度器中 fetch_new_post 的流程一致"""
+    entries = await rss.get_sub_list(target)
+    await rss.filter_common_with_diff(target, entries)
+    return entries
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_incremental_parse(rss, mocker):
+    import feedparser
+
+    from nonebot_bison.types import Target
+
+    rss_router = respx.get("https://example.com/incremental.xml")
+    target = Target("https://example.com/incremental.xml")
+
+    old_guids = [f"old-{i}" for i in range(500)]
+    rss_router.mock(return_value=Response(200, text=_make_feed(old_guids)))
+    res1 = await _poll(rss, target)
+    assert len(res1) == 500
+
+    parse_spy = mocker.spy(feedparser, "parse")
+    rss_router.mock(return_value=Response(200, text=_make_feed(old_guids)))
+    res2 = await _poll(rss, target)
+    assert res2 == []
+    parse_spy.assert_not_called()
+
+    rss_router.mock(return_value=Response(200, text=_make_feed(["new-1", "new-0", *old_guids])))
+    res3 = await _poll(rss, target)
+    assert [entry.id for entry in res3] == ["new-1", "new-0"]
+    assert res3[0]["_target_name"] == "test feed"
+    assert res3[0].link == "https://example.com/new-1"
+    assert parse_spy.call_count == 1
+
+    # 置顶的旧条目不会打断增量解析
+    rss_router.mock(return_value=Response(200, text=_make_feed(["old-499", "new-2", "new-1", "new-0", *old_guids])))
+    res4 = await _poll(rss, target)
+    assert [entry.id for entry in res4] == ["new-2"]
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_incremental_parse_outdated_entries(rss, mocker):
+    from email.utils import format_datetime
+
+    import feedparser
+
+    from nonebot_bison.types import Target
+
+    rss_router = respx.get("https://example.com/incremental-outdated.xml")
+    target = Target("https://example.com/incremental-outdated.xml")
+
+    # 超过 2 小时的条目在初始化时被过滤，不会进入 exists_posts
+    old_date = format_datetime(datetime.now(timezone.utc) - timedelta(days=3))
+    old_guids = [f"old-{i}" for i in range(100)]
+    rss_router.mock(return_value=Response(200, text=_make_feed(old_guids, old_date)))
+    assert len(await _poll(rss, target)) == 100
+    assert not rss.get_stored_data(target).exists_posts & set(old_guids)
+
+    parse_spy = mocker.spy(feedparser, "parse")
+    assert await _poll(rss, target) == []
+    parse_spy.assert_not_called()
+
+    rss_router.mock(return_value=Response(200, text=_make_feed(["new-0", *old_guids], old_date)))
+    res = await _poll(rss, target)
+    assert [entry.id for entry in res] == ["new-0"]
+    assert parse_spy.call_count == 1
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_incremental_parse_fallback(rss):
+    from nonebot_bison.types import Target
+
+    rss_router = respx.get("https://example.com/incremental-fallback.xml")
+    target = Target("https://example.com/incremental-fallback.xml")
+
+    rss_router.mock(return_value=Response(200, text=_make_feed(["a", "b"])))
+    assert len(await _poll(rss, target)) == 2
+
+    # 缺少 guid 的条目无法增量判断，退回完整解析
+    feed_without_guid = _make_feed(["a", "b"]).replace(
+        "<channel><title>test feed</title>",
+        "<channel><title>test feed</title><item><title>no guid</title><link>https://example.com/x</link></item>",
+    )
+    rss_router.mock(return_value=Response(200, text=feed_without_guid))
+    assert len(await rss.get_sub_list(target)) == 3
+
+
+def _make_rdf_feed(ids: list[str]) -> str:
+    items = "".join(
+        f'<item rdf:about="{id}"><title>title {id}</title><link>{id}</link><description>desc {id}</description></item>'
+        for id in ids
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns="http://purl.org/rss/1.0/">'
+        '<channel rdf:about="http://x/"><title>rdf feed</title><link>http://x/</link><description>d</description>'
+        f"</channel>{items}</rdf:RDF>"
+    )
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_incremental_parse_rdf(rss):
+    from nonebot_bison.types import Target
+
+    rss_router = respx.get("https://example.com/incremental.rdf")
+    target = Target("https://example.com/incremental.rdf")
+
+    rss_router.mock(return_value=Response(200, text=_make_rdf_feed(["http://x/1"])))
+    assert [entry.id for entry in await _poll(rss, target)] == ["http://x/1"]
+
+    # 无法识别 RSS 1.0 的条目，退回完整解析，新条目不会被丢弃
+    rss_router.mock(return_value=Response(200, text=_make_rdf_feed(["http://x/2", "http://x/1"])))
+    res = await rss.get_sub_list(target)
+    assert [entry.id for entry in res] == ["http://x/2", "http://x/1"]
+    assert [entry.id for entry in await rss.filter_common_with_diff(target, res)] == ["http://x/2"]
@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+import httpx
+from pytest_mock import MockerFixture
+
+
+async def test_aimd_rate_controller(app):
+    from nonebot_bison.scheduler.rate_control import AIMDRateController
+
+    controller = AIMDRateController("test", base_interval=10, min_interval=5, max_interval=40)
+    assert controller.interval == 10
+
+    assert controller.on_throttled()
+    assert controller.interval == 20
+    controller.on_throttled()
+    controller.on_throttled()
+    assert controller.interval == 40
+
+    # 请求频率加性增加，逐步恢复并最终限制在最小间隔
+    last_interval = controller.interval
+    assert controller.on_success()
+    assert controller.interval < last_interval
+    for _ in range(100):
+        controller.on_success()
+    assert controller.interval == 5
+    assert not controller.on_success()
+
+
+async def test_aimd_rate_controller_from_site(app, mocker: MockerFixture):
+    from nonebot_bison.platform.bilibili import BilibiliSite, BililiveSite
+    from nonebot_bison.platform.ncm import NcmSite
+    from nonebot_bison.plugin_config import plugin_config
+    from nonebot_bison.scheduler.rate_control import AIMDRateController
+    from nonebot_bison.utils import anonymous_site
+
+    controller = AIMDRateController.from_site(NcmSite)
+    assert controller
+    assert (controller.interval, controller.min_interval, controller.max_interval) == (60, 60, 480)
+
+    mocker.patch.object(plugin_config, "bison_schedule_interval_bounds", {BililiveSite.name: (2, 30)})
+    controller = AIMDRateController.from_site(BililiveSite)
+    assert controller
+    assert (controller.interval, controller.min_interval, controller.max_interval) == (5, 2, 30)
+
+    mocker.patch.object(BilibiliSite, "schedule_min_interval", 30)
+    controller = AIMDRateController.from_site(BilibiliSite)
+    assert controller
+    assert controller.min_interval == 30
+
+    assert AIMDRateController.from_site(anonymous_site("cron", {"hour": 1})) is None
+
+
+async def test_scheduler_backoff_on_throttle(init_scheduler, mocker: MockerFixture):
+    from nonebot_plugin_saa import TargetQQGroup
+    import pytest
+
+    from nonebot_bison.config import config
+    from nonebot_bison.platform import platform_manager
+    from nonebot_bison.platform.ncm import NcmSite
+    from nonebot_bison.scheduler import scheduler_dict
+    from nonebot_bison.scheduler.manager import init_scheduler
+    from nonebot_bison.types import ApiError
+    from nonebot_bison.types import Target as T_Target
+
+    await config.add_subscribe(TargetQQGroup(group_id=123), T_Target("t1"), "target1", "ncm-artist", [], [])
+    await init_scheduler()
+    scheduler = scheduler_dict[NcmSite]
+    assert scheduler.rate_controller
+    mocker.patch("nonebot_bison.scheduler.scheduler.is_reachable", return_value=True)
+
+    fetch_mock = mocker.patch.object(
+        platform_manager["ncm-artist"], "fetch_new_post", side_effect=ApiError(httpx.URL("https://music.163.com"))
+    )
+    with pytest.raises(ApiError):
+        await scheduler.exec_fetch()
+    assert scheduler.rate_controller.interval == 120
+    assert scheduler.job.trigger.interval == timedelta(seconds=120)
+    # 调整间隔后保留站点的相位偏移与抖动
+    stagger_kwargs = scheduler._get_stagger_kwargs(120)
+    assert abs(scheduler.job.trigger.start_date - stagger_kwargs["start_date"]) < timedelta(seconds=2)
+    assert scheduler.job.trigger.jitter == stagger_kwargs.get("jitter")
+
+    # 429 响应同样视为限流
+    async def fetch_429(self, sub_unit):
+        self.ctx._log_response(httpx.Response(429, request=httpx.Request("GET", "https://music.163.com")))
+        return []
+
+    mocker.patch.object(platform_manager["ncm-artist"], "fetch_new_post", fetch_429)
+    await scheduler.exec_fetch()
+    assert scheduler.rate_controller.interval == 240
+
+    fetch_mock = mocker.patch.object(platform_manager["ncm-artist"], "fetch_new_post", return_value=[])
+    await scheduler.exec_fetch()
+    assert fetch_mock.called
+    assert scheduler.rate_controller.interval < 240
+    assert scheduler.job.trigger.interval == timedelta(seconds=scheduler.rate_controller.interval)
@@ -0,0 +1,154 @@
+from pytest_mock import MockerFixture
+
+
+def test_hash_ring_minimal_movement():
+    from nonebot_bison.scheduler.shard import HashRing
+
+    keys = [f"partition-{p}" for p in range(256)]
+    ring_2 = HashRing(["a", "b"])
+    ring_3 = HashRing(["a", "b", "c"])
+    assert HashRing([]).get_node("partition-0") is None
+    assert {ring_2.get_node(key) for key in keys} == {"a", "b"}
+    # 新增节点时只有分配给新节点的分区改变归属
+    for key in keys:
+        if (node := ring_3.get_node(key)) != "c":
+            assert node == ring_2.get_node(key)
+
+
+async def test_shard_rebalance(app):
+    from nonebot_bison.scheduler.shard import ShardManager
+
+    partitions = set(range(16))
+    node_a = ShardManager("a", 16, 30)
+    node_b = ShardManager("b", 16, 30)
+
+    assert await node_a.heartbeat()
+    assert node_a.owned_partitions == partitions
+
+    # b 加入后，a 持有的租约释放前 b 不会抓取
+    await node_b.heartbeat()
+    assert not node_b.owned_partitions
+    await node_a.heartbeat()
+    await node_b.heartbeat()
+    assert node_a.owned_partitions
+    assert node_b.owned_partitions
+    assert not node_a.owned_partitions & node_b.owned_partitions
+    assert node_a.owned_partitions | node_b.owned_partitions == partitions
+
+    # b 离开后 a 接管所有分区
+    await node_b.leave()
+    await node_a.heartbeat()
+    assert node_a.owned_partitions == partitions
+
+
+async def test_shard_take_over_expired_lease(app, mocker: MockerFixture):
+    from datetime import timedelta
+
+    from nonebot_bison.scheduler import shard
+    from nonebot_bison.scheduler.shard import ShardManager
+
+    node_a = ShardManager("a", 16, 30)
+    node_b = ShardManager("b", 16, 30)
+    await node_a.heartbeat()
+
+    # a 不再心跳，租约到期后 b 接管所有分区
+    now = shard._utcnow()
+    mocker.patch.object(shard, "_utcnow", return_value=now + timedelta(seconds=60))
+    await node_b.heartbeat()
+    assert node_b.owned_partitions == set(range(16))
+
+
+async def test_shard_renew_lease_when_claim_conflict(app, mocker: MockerFixture):
+    from datetime import timedelta
+
+    from nonebot_plugin_datastore import create_session
+    from sqlalchemy import select
+    from sqlalchemy.exc import IntegrityError
+
+    from nonebot_bison.config.db_model import ShardLease
+    from nonebot_bison.scheduler import shard
+    from nonebot_bison.scheduler.shard import ShardManager
+
+    node_a = ShardManager("a", 16, 30)
+    node_b = ShardManager("b", 16, 30)
+    await node_a.heartbeat()
+    await node_b.heartbeat()
+    await node_a.heartbeat()
+    owned_by_a = node_a.owned_partitions
+    assert owned_by_a
+    assert owned_by_a != set(range(16))
+
+    # b 离开后 a 占用新分区时与其他进程冲突，已持有分区的续约不受影响
+    await node_b.leave()
+    now = shard._utcnow() + timedelta(seconds=20)
+    mocker.patch.object(shard, "_utcnow", return_value=now)
+    mocker.patch.object(node_a, "_claim_partitions", side_effect=IntegrityError("insert", {}, Exception()))
+    await node_a.heartbeat()
+    assert node_a.owned_partitions == owned_by_a
+    async with create_session() as sess:
+        leases = (await sess.scalars(select(ShardLease).where(ShardLease.owner == "a"))).all()
+    assert {lease.partition for lease in leases} == owned_by_a
+    assert all(lease.expires_at == now + timedelta(seconds=30) for lease in leases)
+
+
+async def test_scheduler_only_fetch_owned_target(init_scheduler, mocker: MockerFixture):
+    from nonebot_plugin_saa import TargetQQGroup
+
+    from nonebot_bison.config import config
+    from nonebot_bison.platform.ncm import NcmSite
+    from nonebot_bison.plugin_config import plugin_config
+    from nonebot_bison.scheduler import scheduler_dict
+    from nonebot_bison.scheduler.manager import init_scheduler
+    from nonebot_bison.scheduler.shard import get_partition, get_shard_manager
+    from nonebot_bison.types import Target as T_Target
+
+    mocker.patch.object(plugin_config, "bison_shard_enable", True)
+    mocker.patch.object(plugin_config, "bison_shard_node_id", "a")
+    await config.add_subscribe(TargetQQGroup(group_id=123), T_Target("t1"), "target1", "ncm-artist", [], [])
+    await config.add_subscribe(TargetQQGroup(group_id=123), T_Target("t2"), "target2", "ncm-artist", [], [])
+    await init_scheduler()
+
+    shard_manager = get_shard_manager()
+    assert shard_manager
+    assert len(shard_manager.owned_partitions) == plugin_config.bison_shard_partitions
+
+    scheduler = scheduler_dict[NcmSite]
+    shard_manager.owned_partitions = {get_partition("ncm-artist", T_Target("t1"), shard_manager.partition_count)}
+    for _ in range(3):
+        schedulable = await scheduler.get_next_schedulable()
+        assert schedulable
+        assert schedulable.target == T_Target("t1")
+
+
+async def test_shard_sync_targets(init_scheduler, mocker: MockerFixture):
+    from nonebot_plugin_saa import TargetQQGroup
+
+    from nonebot_bison.config import config
+    from nonebot_bison.config.db_model import Target
+    from nonebot_bison.platform.ncm import NcmSite
+    from nonebot_bison.plugin_config import plugin_config
+    from nonebot_bison.scheduler import scheduler_dict
+    from nonebot_bison.scheduler.manager import init_scheduler, shard_heartbeat, shard_sync_targets
+    from nonebot_bison.types import Target as T_Target
+
+    mocker.patch.object(plugin_config, "bison_shard_enable", True)
+    await config.add_subscribe(TargetQQGroup(group_id=123), T_Target("t1"), "target1", "ncm-artist", [], [])
+    await init_scheduler()
+    scheduler = scheduler_dict[NcmSite]
+
+    # 模拟其他进程新增的订阅，不会触发本进程的 hook
+    mocker.patch.object(
+        config,
+        "get_platform_target",
+        side_effect=lambda platform_name: (
+            [Target(platform_name="ncm-artist", target="t2", target_name="target2")]
+            if platform_name == "ncm-artist"
+            else []
+        ),
+    )
+    # 心跳只续约，不查询 target
+    await shard_heartbeat()
+    assert {(s.platform_name, s.target) for s in scheduler.schedulable_list} == {("ncm-artist", T_Target("t1"))}
+
+    await shard_sync_targets()
+    assert {(s.platform_name, s.target) for s in scheduler.schedulable_list} == {("ncm-artist", T_Target("t2"))}
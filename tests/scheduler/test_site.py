@@ -68,6 +68,7 @@ async def test_scheduler_batch_api(init_scheduler, mocker: MockerFixture):
     await config.add_subscribe(TargetQQGroup(group_id=123), T_Target("t2"), "target2", "bilibili-live", [], [])
 
     mocker.patch.object(BililiveSite, "client_mgr", DefaultClientManager)
+    mocker.patch("nonebot_bison.scheduler.scheduler.is_reachable", return_value=True)
 
     await init_scheduler()
 
@@ -238,3 +239,144 @@ async def test_scheduler_no_skip_not_require_browser(mocker: MockerFixture):
     await init_scheduler()
 
     assert MockSite in scheduler_dict.keys()
+
+
+async def test_scheduler_reuse_platform_obj(init_scheduler, mocker: MockerFixture):
+    from nonebot_plugin_saa import TargetQQGroup
+
+    from nonebot_bison.config import config
+    from nonebot_bison.platform import platform_manager
+    from nonebot_bison.platform.arknights import Arknights, ArknightsSite
+    from nonebot_bison.scheduler import scheduler_dict
+    from nonebot_bison.scheduler.manager import init_scheduler
+    from nonebot_bison.types import Target as T_Target
+
+    await config.add_subscribe(TargetQQGroup(group_id=123), T_Target(""), "target1", "arknights", [], [])
+    await init_scheduler()
+
+    contexts = []
+
+    async def fetch_new_post(self, sub_unit):
+        contexts.append(self.ctx)
+        return []
+
+    mocker.patch.object(platform_manager["arknights"], "fetch_new_post", fetch_new_post)
+    mocker.patch("nonebot_bison.scheduler.scheduler.is_reachable", return_value=True)
+
+    scheduler = scheduler_dict[ArknightsSite]
+    await scheduler.exec_fetch()
+    platform_obj = scheduler.platform_obj_cache["arknights"]
+    await scheduler.exec_fetch()
+
+    assert scheduler.platform_obj_cache["arknights"] is platform_obj
+    assert len(contexts) == 2
+    assert contexts[0] is not contexts[1]
+    # 组内成员同样使用本次抓取的 context
+    member = next(x for x in platform_obj.platform_obj_list if isinstance(x, Arknights))  # type: ignore
+    assert member.ctx is contexts[1]
+
+
+async def test_scheduler_stagger(init_scheduler, mocker: MockerFixture):
+    from datetime import datetime, timedelta, timezone
+
+    from nonebot_bison.platform.bilibili import BiliBangumiSite
+    from nonebot_bison.platform.ncm import NcmSite
+    from nonebot_bison.scheduler import scheduler_dict
+    from nonebot_bison.scheduler.manager import init_scheduler
+
+    mocker.patch.object(NcmSite, "schedule_offset", 10)
+    await init_scheduler()
+
+    ncm_job = scheduler_dict[NcmSite].job
+    assert ncm_job.trigger.jitter is None
+    start_offset = ncm_job.trigger.start_date - datetime.now(timezone.utc)
+    assert timedelta(seconds=8) < start_offset <= timedelta(seconds=10)
+
+    bangumi_job = scheduler_dict[BiliBangumiSite].job
+    assert bangumi_job.trigger.jitter == BiliBangumiSite.schedule_jitter
+    # 未指定时由站点名得到 [0, 间隔) 内的固定相位
+    start_offset = bangumi_job.trigger.start_date - datetime.now(timezone.utc)
+    assert start_offset < timedelta(seconds=30)
+    assert scheduler_dict[BiliBangumiSite]._get_stagger_kwargs()["start_date"] - bangumi_job.trigger.start_date < (
+        timedelta(seconds=2)
+    )
+
+
+async def test_scheduler_park_undeliverable(init_scheduler, mocker: MockerFixture):
+    from nonebot_plugin_saa import TargetQQGroup
+
+    from nonebot_bison.config import config
+    from nonebot_bison.metrics import request_counter
+    from nonebot_bison.platform import platform_manager
+    from nonebot_bison.platform.ncm import NcmSite
+    from nonebot_bison.scheduler import scheduler_dict
+    from nonebot_bison.scheduler.manager import init_scheduler
+    from nonebot_bison.types import Target as T_Target
+
+    def request_count(success: bool) -> float:
+        return request_counter.labels(
+            platform_name="ncm-artist", site_name=NcmSite.name, target=T_Target("t1"), success=success
+        )._value.get()
+
+    await config.add_subscribe(TargetQQGroup(group_id=123), T_Target("t1"), "target1", "ncm-artist", [], [])
+    await init_scheduler()
+
+    reachable = False
+    mocker.patch("nonebot_bison.scheduler.scheduler.is_reachable", side_effect=lambda _: reachable)
+    fetch_mock = mocker.patch.object(platform_manager["ncm-artist"], "fetch_new_post", return_value=[])
+
+    scheduler = scheduler_dict[NcmSite]
+    failed_before = request_count(False)
+    await scheduler.exec_fetch()
+    fetch_mock.assert_not_called()
+    assert ("ncm-artist", T_Target("t1")) in scheduler.parked_targets
+    # 停放的 target 不计入请求指标
+    assert request_count(False) == failed_before
+    # 停放期间不再调度该 target
+    assert await scheduler.get_next_schedulable() is None
+
+    reachable = True
+    scheduler.unpark_all()
+    await scheduler.exec_fetch()
+    fetch_mock.assert_called_once()
+    assert not scheduler.parked_targets
+    assert request_count(False) == failed_before
+
+
+async def test_scheduler_insert_new_targets(init_scheduler, mocker: MockerFixture):
+    from nonebot_bison.platform.bilibili import BililiveSite
+    from nonebot_bison.scheduler import handle_insert_new_targets, scheduler_dict
+    from nonebot_bison.scheduler.manager import init_scheduler
+    from nonebot_bison.types import Target as T_Target
+    from nonebot_bison.utils import DefaultClientManager
+
+    mocker.patch.object(BililiveSite, "client_mgr", DefaultClientManager)
+    await init_scheduler()
+    scheduler = scheduler_dict[BililiveSite]
+    refresh_spy = mocker.spy(scheduler, "_refresh_batch_api_target_cache")
+
+    await handle_insert_new_targets([("bilibili-live", T_Target("t1")), ("bilibili-live", T_Target("t2"))])
+
+    refresh_spy.assert_called_once()
+    assert {s.target for s in scheduler.schedulable_list} == {T_Target("t1"), T_Target("t2")}
+    assert scheduler.batch_api_target_cache["bilibili-live"][T_Target("t1")] == [T_Target("t1"), T_Target("t2")]
+
+
+async def test_scheduler_delete_targets(init_scheduler, mocker: MockerFixture):
+    from nonebot_bison.platform.bilibili import BililiveSite
+    from nonebot_bison.scheduler import handle_delete_targets, handle_insert_new_targets, scheduler_dict
+    from nonebot_bison.scheduler.manager import init_scheduler
+    from nonebot_bison.types import Target as T_Target
+    from nonebot_bison.utils import DefaultClientManager
+
+    mocker.patch.object(BililiveSite, "client_mgr", DefaultClientManager)
+    await init_scheduler()
+    scheduler = scheduler_dict[BililiveSite]
+    await handle_insert_new_targets([("bilibili-live", T_Target(f"t{i}")) for i in range(3)])
+    refresh_spy = mocker.spy(scheduler, "_refresh_batch_api_target_cache")
+
+    await handle_delete_targets([("bilibili-live", T_Target("t0")), ("bilibili-live", T_Target("t2"))])
+
+    refresh_spy.assert_called_once()
+    assert [s.target for s in scheduler.schedulable_list] == [T_Target("t1")]
+    assert scheduler.batch_api_target_cache["bilibili-live"] == {T_Target("t1"): [T_Target("t1")]}
@@ -182,3 +182,51 @@ async def test_sub_import_v2(app: App, tmp_path):
     result = await run_sync(runner.invoke)(cli, ["import", "-p", str(mock_file2), "--format=yml"])
     assert result.exit_code == 0
     assert len(await config.list_subs_with_all_info()) == 6
+
+
+async def test_subs_export_stream(app: App, tmp_path: Path):
+    import json
+
+    from anyio import open_file
+    from nonebot.compat import model_dump
+    from nonebot_plugin_saa import TargetQQGroup
+    import yaml
+
+    from nonebot_bison.config.db_config import config
+    from nonebot_bison.config.db_model import Cookie
+    from nonebot_bison.config.subs_io import iter_sub_packs, subscribes_export
+    from nonebot_bison.script.cli import write_json_stream, write_yaml_stream
+    from nonebot_bison.types import Target as TTarget
+
+    async def export_stream(writer, *args) -> str:
+        file_path = tmp_path / "export"
+        async with await open_file(file_path, "w", encoding="utf-8") as f:
+            await writer(f, *args)
+        return file_path.read_text(encoding="utf-8")
+
+    async def expected_json() -> str:
+        return json.dumps(model_dump(await subscribes_export(lambda x: x)), ensure_ascii=False, indent=4)
+
+    async def expected_yaml() -> str:
+        export_data = await subscribes_export(lambda x: x)
+        yaml_data = json.loads(json.dumps(model_dump(export_data), ensure_ascii=False))
+        return yaml.safe_dump(yaml_data, sort_keys=False)
+
+    # 没有订阅与 Cookie
+    assert await export_stream(write_json_stream) == await expected_json()
+    assert await export_stream(write_yaml_stream, yaml) == await expected_yaml()
+
+    for group_id in (123, 234, 345):
+        for target in ("weibo_id", "weibo_id2"):
+            await config.add_subscribe(TargetQQGroup(group_id=group_id), TTarget(target), "名称", "weibo", [1], ["tag"])
+    cookie_id = await config.add_cookie(Cookie(site_name="weibo.com", content="{}", cookie_name="cookie"))
+    await config.add_cookie_target(TTarget("weibo_id"), "weibo", cookie_id)
+    await config.add_cookie_target(TTarget("weibo_id2"), "weibo", cookie_id)
+    await config.add_cookie(Cookie(site_name="weibo.com", content="{}", cookie_name="unlinked cookie"))
+
+    assert await export_stream(write_json_stream) == await expected_json()
+    assert await export_stream(write_yaml_stream, yaml) == await expected_yaml()
+
+    # 每次只读取一行时，同一用户的订阅仍被合并到同一个 SubPack
+    sub_packs = [sub_pack async for sub_pack in iter_sub_packs(lambda x: x, chunk_size=1)]
+    assert [len(sub_pack.subs) for sub_pack in sub_packs] == [2, 2, 2]
@@ -0,0 +1,119 @@
+import json
+
+from click.testing import CliRunner
+from nonebug.app import App
+import pytest
+
+from .utils import get_file, get_json
+
+
+@pytest.mark.parametrize("version", ["v1", "v2", "v3"])
+def test_iter_json_items(app: App, tmp_path, version: str):
+    from unittest.mock import patch
+
+    from nonebot_bison.config.subs_io import iter_json_items
+
+    nbesf_data = get_json(f"{version}/subs_export.json")
+    file = tmp_path / "export.json"
+    file.write_text(json.dumps(nbesf_data, ensure_ascii=False), encoding="utf-8")
+
+    # 使用很小的读取块，覆盖值被截断在缓冲区边界的情况
+    with patch("nonebot_bison.config.subs_io.stream.STREAM_READ_SIZE", 7), file.open(encoding="utf-8") as f:
+        items = list(iter_json_items(f))
+
+    assert items[0] == ("version", nbesf_data["version"])
+    assert [value for key, value in items if key == "groups"] == nbesf_data["groups"]
+    assert [value for key, value in items if key == "cookies"] == nbesf_data.get("cookies", [])
+
+
+@pytest.mark.parametrize("version", ["v1", "v2", "v3"])
+def test_iter_yaml_items(app: App, tmp_path, version: str):
+    import yaml
+
+    from nonebot_bison.config.subs_io import iter_yaml_items
+
+    file = tmp_path / "export.yaml"
+    file.write_text(get_file(f"{version}/subs_export.yaml"), encoding="utf-8")
+    nbesf_data = yaml.safe_load(get_file(f"{version}/subs_export.yaml"))
+
+    with file.open(encoding="utf-8") as f:
+        items = list(iter_yaml_items(f, yaml))
+
+    assert items[0] == ("version", nbesf_data["version"])
+    assert [value for key, value in items if key == "groups"] == nbesf_data["groups"]
+    assert [value for key, value in items if key == "cookies"] == nbesf_data.get("cookies", [])
+
+
+def test_iter_json_items_truncated(app: App, tmp_path):
+    from nonebot_bison.config.subs_io import iter_json_items
+    from nonebot_bison.config.subs_io.utils import NBESFParseErr
+
+    file = tmp_path / "export.json"
+    file.write_text(get_file("v3/subs_export.json")[:-50], encoding="utf-8")
+
+    with file.open(encoding="utf-8") as f, pytest.raises(NBESFParseErr):
+        list(iter_json_items(f))
+
+
+async def test_subs_import_stream_resume(app: App, tmp_path):
+    from nonebot_bison.config.db_config import config
+    from nonebot_bison.script.cli import cli, run_sync
+
+    nbesf_data = get_json("v3/subs_export.json")
+    broken_data = json.loads(json.dumps(nbesf_data))
+    broken_data["groups"][1]["subs"] = "broken"
+
+    import_file = tmp_path / "export.json"
+    progress_file = tmp_path / "export.json.progress"
+    import_file.write_text(json.dumps(broken_data), encoding="utf-8")
+
+    runner = CliRunner()
+
+    # 第二个订阅组格式错误，第一个订阅组已提交
+    result = await run_sync(runner.invoke)(cli, ["import", "-p", str(import_file), "--batch-size", "1"])
+    assert result.exit_code != 0
+    assert json.loads(progress_file.read_text(encoding="utf-8")) == {"groups": 1, "cookies": 0}
+    assert len(await config.list_subs_with_all_info()) == 1
+
+    # 修复后从断点继续导入，不重复导入已提交的订阅组
+    import_file.write_text(json.dumps(nbesf_data), encoding="utf-8")
+    result = await run_sync(runner.invoke)(cli, ["import", "-p", str(import_file), "--batch-size", "1", "--resume"])
+    assert result.exit_code == 0
+    assert not progress_file.exists()
+    assert len(await config.list_subs_with_all_info()) == 3
+    assert len(await config.get_cookie(is_anonymous=False)) == 1
+
+
+async def test_subs_import_stream_version_after_groups(app: App):
+    from nonebot_bison.config.subs_io import subscribes_import_stream
+    from nonebot_bison.config.subs_io.utils import NBESFParseErr
+
+    nbesf_data = get_json("v3/subs_export.json")
+    items = iter([("groups", nbesf_data["groups"][0]), ("version", 3)])
+
+    with pytest.raises(NBESFParseErr):
+        await subscribes_import_stream(items)
+
+
+async def test_subs_import_stream_resume_after_uncommitted_progress(app: App):
+    from nonebot_bison.config.db_config import config
+    from nonebot_bison.config.subs_io import ImportProgress, subscribes_import_stream
+
+    nbesf_data = get_json("v3/subs_export.json")
+    items = [("version", 3)] + [("groups", group) for group in nbesf_data["groups"]]
+    items += [("cookies", cookie) for cookie in nbesf_data["cookies"]]
+
+    async def crash_on_cookies(progress: ImportProgress):
+        if progress.cookies:
+            raise RuntimeError("crash before saving progress")
+
+    # Cookie 已提交但断点未保存
+    with pytest.raises(RuntimeError):
+        await subscribes_import_stream(iter(items), on_commit=crash_on_cookies)
+    assert len(await config.get_cookie(is_anonymous=False)) == 1
+
+    # 从旧断点继续导入时不会重复添加已提交的 Cookie
+    groups_count = len(nbesf_data["groups"])
+    await subscribes_import_stream(iter(items), progress=ImportProgress(groups=groups_count))
+    assert len(await config.get_cookie(is_anonymous=False)) == 1
+    assert len(await config.get_cookie_target()) == len(nbesf_data["cookies"][0]["targets"])
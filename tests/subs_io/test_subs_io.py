@@ -155,3 +155,59 @@ async def test_subs_import_all_fail(app: App, init_scheduler):
 
     with pytest.raises(NBESFParseErr):
         v3.nbesf_parser(get_json("v3/subs_export_all_illegal.json"))
+
+
+async def test_subs_import_bulk(app: App, init_scheduler, mocker):
+    from nonebot_plugin_saa import TargetQQGroup
+
+    from nonebot_bison.config.db_config import config
+    from nonebot_bison.config.subs_io import subscribes_import
+    from nonebot_bison.config.subs_io.nbesf_model import v3
+    from nonebot_bison.types import Target as TTarget
+
+    # 已存在的订阅会被跳过，已存在的 target 会更新名称
+    await config.add_subscribe(TargetQQGroup(group_id=1232), TTarget("weibo_id"), "old_name", "weibo", [], [])
+    add_subscribe = mocker.spy(config, "add_subscribe")
+    targets_hook = mocker.AsyncMock()
+    mocker.patch.object(config, "add_targets_hook", [targets_hook])
+
+    await subscribes_import(v3.nbesf_parser(get_json("v3/subs_export.json")))
+
+    add_subscribe.assert_not_called()
+    targets_hook.assert_awaited_once_with([("bilibili", TTarget("bilibili_id"))])
+    data = await config.list_subs_with_all_info()
+    assert len(data) == 3
+    assert {sub.target.target_name for sub in data} == {"weibo_name", "bilibili_name"}
+    cookies = await config.get_cookie(target=TTarget("weibo_id"), is_anonymous=False)
+    assert [cookie.cookie_name for cookie in cookies] == ["test cookie"]
+
+    # 重复导入不会新增订阅与 target
+    targets_hook.reset_mock()
+    await subscribes_import(v3.nbesf_parser(get_json("v3/subs_export.json")))
+    targets_hook.assert_not_awaited()
+    assert len(await config.list_subs_with_all_info()) == 3
+
+
+async def test_subs_import_skip_invalid_receipt(app: App, init_scheduler):
+    from nonebot_plugin_saa import TargetQQGroup
+
+    from nonebot_bison.config.db_config import config
+    from nonebot_bison.config.subs_io.nbesf_model.base import SubReceipt, bulk_add_receipts
+
+    def receipt(target: str, platform_name: str = "weibo", target_name: str = "name") -> SubReceipt:
+        return SubReceipt(
+            user=TargetQQGroup(group_id=123),
+            target=target,
+            target_name=target_name,
+            platform_name=platform_name,
+            cats=[],
+            tags=[],
+        )
+
+    # 无效的条目被跳过，不影响其他条目导入
+    res = await bulk_add_receipts(
+        [receipt("t1"), receipt("t2", platform_name="no_such_platform"), receipt("t3", target_name="x" * 2000)]
+    )
+    assert res == (1, 0, 2)
+    data = await config.list_subs_with_all_info()
+    assert [sub.target.target for sub in data] == ["t1"]
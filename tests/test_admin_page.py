@@ -61,3 +61,78 @@ async def test_log(app: App, tmp_path: Path):
         log = f.read()
         assert "Nonebot Bison frontend will be running at" in log
         assert "该页面不能被直接访问，请私聊bot 后台管理 以获取可访问地址" in log
+
+
+async def test_get_subs_info(app: App, init_scheduler):
+    from fastapi.exceptions import HTTPException
+    from nonebot_plugin_saa import TargetQQGroup
+
+    from nonebot_bison.admin_page.api import get_subs_info
+    from nonebot_bison.config import config
+    from nonebot_bison.types import Target as T_Target
+
+    await config.add_subscribe(TargetQQGroup(group_id=1), T_Target("weibo_id"), "weibo_name", "weibo", [1], ["tag"])
+    await config.add_subscribe(TargetQQGroup(group_id=2), T_Target("bili_id"), "bili_name", "bilibili", [], [])
+    jwt_obj = {
+        "groups": [
+            {"id": 1, "name": "group one"},
+            {"id": 2, "name": "group two"},
+            {"id": 3, "name": "empty group"},
+        ]
+    }
+
+    res = await get_subs_info(jwt_obj, offset=0, limit=None, platformName=None, keyword=None)
+    assert list(res) == [1, 2, 3]
+    assert res[1].name == "group one"
+    assert [(sub.target, sub.cats, sub.tags) for sub in res[1].subscribes] == [("weibo_id", [1], ["tag"])]
+    assert [sub.target for sub in res[2].subscribes] == ["bili_id"]
+    assert res[3].subscribes == []
+
+    res = await get_subs_info(jwt_obj, offset=1, limit=1, platformName=None, keyword=None)
+    assert list(res) == [2]
+
+    res = await get_subs_info(jwt_obj, offset=0, limit=None, platformName="weibo", keyword="group")
+    assert list(res) == [1, 2, 3]
+    assert res[2].subscribes == []
+
+    res = await get_subs_info(jwt_obj, offset=0, limit=None, platformName=None, keyword="two")
+    assert list(res) == [2]
+
+    with pytest.raises(HTTPException):
+        await get_subs_info(jwt_obj, offset=-1, limit=None, platformName=None, keyword=None)
+
+
+async def test_bulk_modify_group_subs(app: App, init_scheduler):
+    from fastapi.exceptions import HTTPException
+    from nonebot_plugin_saa import TargetQQGroup
+
+    from nonebot_bison.admin_page.api import bulk_modify_group_subs
+    from nonebot_bison.admin_page.types import BulkDelSubscribeItem, BulkSubscribeItem, BulkSubscribeReq
+    from nonebot_bison.config import config
+    from nonebot_bison.types import Target as T_Target
+
+    await config.add_subscribe(TargetQQGroup(group_id=1), T_Target("old_id"), "old_name", "weibo", [], [])
+    jwt_obj = {"groups": [{"id": 1, "name": "group one"}, {"id": 2, "name": "group two"}]}
+
+    def add_item(group_id: int) -> BulkSubscribeItem:
+        return BulkSubscribeItem(
+            groupNumber=group_id, platformName="weibo", target="new_id", targetName="new_name", cats=[], tags=[]
+        )
+
+    res = await bulk_modify_group_subs(
+        BulkSubscribeReq(
+            add=[add_item(1), add_item(2)],
+            delete=[BulkDelSubscribeItem(groupNumber=1, platformName="weibo", target="old_id")],
+        ),
+        jwt_obj,
+    )
+    assert (res.ok, res.added, res.updated, res.deleted) == (True, 2, 0, 1)
+    assert {sub.target.target for sub in await config.list_subs_with_all_info()} == {"new_id"}
+
+    with pytest.raises(HTTPException) as e:
+        await bulk_modify_group_subs(BulkSubscribeReq(add=[add_item(1)]), jwt_obj)
+    assert e.value.status_code == 400
+
+    with pytest.raises(HTTPException) as e:
+        await bulk_modify_group_subs(BulkSubscribeReq(add=[add_item(3)]), jwt_obj)
+    assert e.value.status_code == 403
@@ -0,0 +1,101 @@
+import httpx
+from nonebug.app import App
+import pytest
+from pytest_mock import MockerFixture
+import respx
+
+
+async def test_circuit_breaker_state(app: App, mocker: MockerFixture):
+    from nonebot_bison.metrics import circuit_breaker_state_gauge
+    from nonebot_bison.utils import circuit_breaker
+    from nonebot_bison.utils.circuit_breaker import CircuitBreaker, CircuitState
+
+    now = 1000.0
+    mocker.patch.object(circuit_breaker.time, "monotonic", side_effect=lambda: now)
+
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=60)
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert circuit_breaker_state_gauge.labels(key="test")._value.get() == CircuitState.OPEN
+    assert not breaker.allow_request()
+
+    # 超时后只放行一次探测请求
+    now += 61
+    assert breaker.allow_request()
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert not breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow_request()
+
+    now += 61
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert circuit_breaker_state_gauge.labels(key="test")._value.get() == CircuitState.CLOSED
+    assert breaker.allow_request()
+
+
+@respx.mock
+async def test_host_circuit_breaker(app: App, mocker: MockerFixture):
+    from nonebot_bison.platform.platform import catch_network_error
+    from nonebot_bison.plugin_config import plugin_config
+    from nonebot_bison.utils import DefaultClientManager, ProcessContext, http_client
+    from nonebot_bison.utils.circuit_breaker import CircuitState, get_host_circuit_breaker
+    from nonebot_bison.utils.site import SkipRequestException
+
+    mocker.patch.object(plugin_config, "bison_circuit_breaker_threshold", 2)
+
+    route = respx.get("https://down.example.com/")
+    route.mock(side_effect=httpx.ConnectError("down"))
+
+    ctx = ProcessContext(DefaultClientManager())
+    async with http_client() as client:
+        ctx._register_to_client(client)
+        for _ in range(2):
+            assert await catch_network_error(client.get, "https://down.example.com/") is None
+        assert get_host_circuit_breaker("down.example.com").state == CircuitState.OPEN
+
+        with pytest.raises(SkipRequestException):
+            await client.get("https://down.example.com/")
+        assert route.call_count == 2
+
+        # 其他域名不受影响
+        respx.get("https://up.example.com/").mock(httpx.Response(200))
+        assert (await client.get("https://up.example.com/")).status_code == 200
+
+
+async def test_scheduler_skip_open_site(init_scheduler, mocker: MockerFixture):
+    from nonebot_plugin_saa import TargetQQGroup
+
+    from nonebot_bison.config import config
+    from nonebot_bison.platform import platform_manager
+    from nonebot_bison.platform.ncm import NcmSite
+    from nonebot_bison.plugin_config import plugin_config
+    from nonebot_bison.scheduler import scheduler_dict
+    from nonebot_bison.scheduler.manager import init_scheduler
+    from nonebot_bison.types import Target as T_Target
+    from nonebot_bison.utils.circuit_breaker import CircuitState, get_site_circuit_breaker
+
+    mocker.patch.object(plugin_config, "bison_circuit_breaker_threshold", 2)
+    await config.add_subscribe(TargetQQGroup(group_id=123), T_Target("t1"), "target1", "ncm-artist", [], [])
+    await init_scheduler()
+    mocker.patch("nonebot_bison.scheduler.scheduler.is_reachable", return_value=True)
+
+    fetch_mock = mocker.patch.object(
+        platform_manager["ncm-artist"],
+        "fetch_new_post",
+        side_effect=httpx.ConnectError("down", request=httpx.Request("GET", "https://music.163.com/")),
+    )
+
+    scheduler = scheduler_dict[NcmSite]
+    await scheduler.exec_fetch()
+    await scheduler.exec_fetch()
+    assert get_site_circuit_breaker(NcmSite.name).state == CircuitState.OPEN
+    assert fetch_mock.call_count == 2
+
+    await scheduler.exec_fetch()
+    assert fetch_mock.call_count == 2
@@ -0,0 +1,57 @@
+import httpx
+from nonebug.app import App
+from pytest_mock import MockerFixture
+import respx
+
+
+async def test_token_bucket(app: App, mocker: MockerFixture):
+    from nonebot_bison.utils import rate_limit
+    from nonebot_bison.utils.rate_limit import TokenBucket
+
+    now = 1000.0
+    mocker.patch.object(rate_limit.time, "monotonic", side_effect=lambda: now)
+    sleep_mock = mocker.patch.object(rate_limit.asyncio, "sleep")
+
+    bucket = TokenBucket(rate=2, capacity=2)
+    assert await bucket.acquire() == 0
+    assert await bucket.acquire() == 0
+    # 令牌用尽后按到达顺序排队等待
+    assert await bucket.acquire() == 0.5
+    assert await bucket.acquire() == 1
+    assert [call.args[0] for call in sleep_mock.call_args_list] == [0.5, 1]
+
+    now += 10
+    assert await bucket.acquire() == 0
+
+
+@respx.mock
+async def test_host_rate_limit_shared(app: App, mocker: MockerFixture):
+    from nonebot_bison.plugin_config import plugin_config
+    from nonebot_bison.utils import http_client, rate_limit
+
+    mocker.patch.object(plugin_config, "bison_host_rate_limit", {"bilibili.com": 1})
+    sleep_mock = mocker.patch.object(rate_limit.asyncio, "sleep")
+
+    respx.get("https://api.bilibili.com/").mock(httpx.Response(200))
+    respx.get("https://api.live.bilibili.com/").mock(httpx.Response(200))
+    respx.get("https://example.com/").mock(httpx.Response(200))
+
+    async with http_client() as client_1, http_client() as client_2:
+        await client_1.get("https://api.bilibili.com/")
+        await client_2.get("https://example.com/")
+        assert not sleep_mock.called
+        # 不同 client 访问同一域名的子域名共享令牌桶
+        await client_2.get("https://api.live.bilibili.com/")
+        assert sleep_mock.call_count == 1
+        assert sleep_mock.call_args.args[0] > 0.9
+
+
+async def test_cookie_client_keep_rate_limit(app: App):
+    from nonebot_bison.utils.rate_limit import limit_host_rate
+    from nonebot_bison.utils.site import CookieClientManager
+
+    client_mgr = CookieClientManager.from_name("example.com")()
+    await client_mgr.refresh_client()
+    client = await client_mgr.get_client(None)
+    assert limit_host_rate in client.event_hooks["request"]
+    assert client.event_hooks["response"]
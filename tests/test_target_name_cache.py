@@ -0,0 +1,123 @@
+import asyncio
+
+from nonebug.app import App
+import pytest
+from pytest_mock import MockerFixture
+
+
+async def test_ttl_cache_single_flight(app: App, mocker: MockerFixture):
+    from nonebot_bison.utils import ttl_cache
+    from nonebot_bison.utils.ttl_cache import SingleFlightTTLCache
+
+    now = 1000.0
+    mocker.patch.object(ttl_cache.time, "monotonic", side_effect=lambda: now)
+    cache: SingleFlightTTLCache[str, str | None] = SingleFlightTTLCache(ttl=60, negative_ttl=10)
+    release = asyncio.Event()
+    loader = mocker.AsyncMock()
+
+    async def load():
+        await release.wait()
+        return await loader()
+
+    # 同时进行的加载请求只请求一次
+    loader.return_value = "name"
+    tasks = [asyncio.create_task(cache.get_or_load("key", load)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*tasks) == ["name"] * 5
+    loader.assert_awaited_once()
+
+    assert await cache.get_or_load("key", load) == "name"
+    loader.assert_awaited_once()
+    assert await cache.get_or_load("key", load, use_cache=False) == "name"
+    assert loader.await_count == 2
+
+    now += 61
+    assert cache.get("key") == (False, None)
+
+    # 查询不到的结果使用较短的有效期
+    loader.return_value = None
+    assert await cache.get_or_load("missing", load) is None
+    assert cache.get("missing") == (True, None)
+    now += 11
+    assert cache.get("missing") == (False, None)
+
+
+async def test_ttl_cache_error_not_cached(app: App, mocker: MockerFixture):
+    from nonebot_bison.utils.ttl_cache import SingleFlightTTLCache
+
+    cache: SingleFlightTTLCache[str, str] = SingleFlightTTLCache(ttl=60)
+    loader = mocker.AsyncMock(side_effect=[RuntimeError("upstream error"), "name"])
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_load("key", loader)
+    assert await cache.get_or_load("key", loader) == "name"
+    assert loader.await_count == 2
+
+
+async def test_ttl_cache_cancel_caller(app: App, mocker: MockerFixture):
+    from nonebot_bison.utils.ttl_cache import SingleFlightTTLCache
+
+    cache: SingleFlightTTLCache[str, str] = SingleFlightTTLCache(ttl=60)
+    release = asyncio.Event()
+
+    async def load():
+        await release.wait()
+        return "name"
+
+    first = asyncio.create_task(cache.get_or_load("key", load))
+    second = asyncio.create_task(cache.get_or_load("key", load))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    # 一个调用者被取消时，共享的加载请求继续执行
+    assert await second == "name"
+    assert cache.get("key") == (True, "name")
+
+
+async def test_check_sub_target_cached(app: App, init_scheduler, mocker: MockerFixture):
+    from nonebot_plugin_saa import TargetQQGroup
+
+    from nonebot_bison import apis
+    from nonebot_bison.config import config
+    from nonebot_bison.types import Target as T_Target
+
+    await config.add_subscribe(TargetQQGroup(group_id=1), T_Target("weibo_id"), "old_name", "weibo", [], [])
+    query = mocker.patch.object(apis, "_query_target_name", return_value="new_name")
+
+    names = await asyncio.gather(*[apis.check_sub_target("weibo", T_Target("weibo_id")) for _ in range(3)])
+    assert names == ["new_name"] * 3
+    assert await apis.check_sub_target("weibo", T_Target("weibo_id")) == "new_name"
+    query.assert_awaited_once_with("weibo", T_Target("weibo_id"))
+
+    # 查询到的名称同步到数据库
+    subs = await config.list_subscribe(TargetQQGroup(group_id=1))
+    assert subs[0].target.target_name == "new_name"
+
+
+async def test_refresh_target_names(app: App, init_scheduler, mocker: MockerFixture):
+    from nonebot_plugin_saa import TargetQQGroup
+
+    from nonebot_bison import apis
+    from nonebot_bison.config import config
+    from nonebot_bison.types import Target as T_Target
+
+    await config.add_subscribe(TargetQQGroup(group_id=1), T_Target("renamed"), "old_name", "weibo", [], [])
+    await config.add_subscribe(TargetQQGroup(group_id=1), T_Target("failed"), "failed_name", "weibo", [], [])
+
+    async def query_target_name(platform_name: str, target: T_Target):
+        if target == "failed":
+            raise RuntimeError("upstream error")
+        return "new_name"
+
+    mocker.patch.object(apis, "_query_target_name", side_effect=query_target_name)
+
+    await apis.refresh_target_names()
+
+    subs = await config.list_subscribe(TargetQQGroup(group_id=1))
+    assert {sub.target.target: sub.target.target_name for sub in subs} == {
+        "renamed": "new_name",
+        "failed": "failed_name",
+    }
+    assert apis.get_target_name_cache().get(("weibo", T_Target("renamed"))) == (True, "new_name")